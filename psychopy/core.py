@@ -71,7 +71,7 @@ def quit():
     """Close everything and exit nicely (ending the experiment)
     """
     # pygame.quit()  # safe even if pygame was never initialised
-    logging.flush()
+    logging.flush(block=True)
 
     # properly shutdown ioHub server
     from psychopy.iohub.client import ioHubConnection
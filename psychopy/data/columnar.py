@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+"""Column-based storage for the entries of an ExperimentHandler, for when
+there are too many entries to comfortably keep each one as a dict.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+# dtype to store each (exact) Python type as, anything else is an object
+_columnTypes = {
+    bool: np.bool_,
+    int: np.int64,
+    float: np.float64,
+}
+_int64Info = np.iinfo(np.int64)
+
+
+def _dtypeFor(value):
+    """Get the dtype which a column should have to store the given value
+    without changing how it's represented.
+    """
+    valueType = type(value)
+    if valueType is int and not _int64Info.min <= value <= _int64Info.max:
+        return np.dtype(object)
+    return np.dtype(_columnTypes.get(valueType, object))
+
+
+class _Column:
+    """A single column of data, stored as a NumPy array which grows as
+    needed, with a mask marking which rows actually have a value.
+    """
+
+    def __init__(self, dtype, capacity):
+        self.values = np.empty(capacity, dtype=dtype)
+        if self.values.dtype == object:
+            self.values[:] = None
+        self.present = np.zeros(capacity, dtype=bool)
+
+    def resize(self, capacity):
+        values = np.empty(capacity, dtype=self.values.dtype)
+        if values.dtype == object:
+            values[:] = None
+        n = min(capacity, self.values.size)
+        values[:n] = self.values[:n]
+        present = np.zeros(capacity, dtype=bool)
+        present[:n] = self.present[:n]
+        self.values = values
+        self.present = present
+
+    def set(self, row, value):
+        dtype = _dtypeFor(value)
+        if dtype != self.values.dtype and self.values.dtype != object:
+            # column can no longer be typed, so fall back to objects
+            self.values = self.values.astype(object)
+            self.values[~self.present] = None
+        self.values[row] = value
+        self.present[row] = True
+
+    def get(self, row):
+        if not self.present[row]:
+            raise KeyError(row)
+        value = self.values[row]
+        if self.values.dtype != object:
+            # give back the Python type it was added as
+            value = value.item()
+        return value
+
+    def unset(self, row):
+        self.present[row] = False
+        if self.values.dtype == object:
+            self.values[row] = None
+
+    def copy(self):
+        dupe = _Column.__new__(_Column)
+        dupe.values = self.values.copy()
+        dupe.present = self.present.copy()
+        return dupe
+
+    def toSeries(self, nRows):
+        """Get the first `nRows` values of this column as a pandas Series,
+        with missing values left empty.
+        """
+        values = self.values[:nRows]
+        present = self.present[:nRows]
+        if present.all():
+            return pd.Series(values.copy())
+        kind = values.dtype.kind
+        if kind == 'i':
+            return pd.Series(pd.arrays.IntegerArray(values.copy(), ~present))
+        if kind == 'b':
+            return pd.Series(pd.arrays.BooleanArray(values.copy(), ~present))
+        if kind == 'f':
+            return pd.Series(np.where(present, values, np.nan))
+        return pd.Series(values.copy())
+
+
+class _ColumnarRow(MutableMapping):
+    """A view of a single row in a ColumnarEntries object, which behaves like
+    the dict which would otherwise store the entry.
+    """
+
+    def __init__(self, entries, row):
+        self._entries = entries
+        self._row = row
+
+    def __getitem__(self, name):
+        index = self._entries._index.get(name)
+        if index is None:
+            raise KeyError(name)
+        try:
+            return self._entries._columns[index].get(self._row)
+        except KeyError:
+            raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        self._entries._setValue(self._row, name, value)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._entries._columns[self._entries._index[name]].unset(self._row)
+
+    def __contains__(self, name):
+        index = self._entries._index.get(name)
+        if index is None:
+            return False
+        return bool(self._entries._columns[index].present[self._row])
+
+    def __iter__(self):
+        row = self._row
+        for name, index in self._entries._index.items():
+            if self._entries._columns[index].present[row]:
+                yield name
+
+    def __len__(self):
+        return sum(1 for name in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnarEntries:
+    """Stores the entries of an
+    :class:`~psychopy.data.ExperimentHandler` as one NumPy array per column,
+    rather than a dict per entry.
+
+    Columns holding only bools, ints or floats are stored as arrays of that
+    type, any other column is stored as an array of objects. Arrays grow
+    geometrically, so adding an entry is O(1) amortised regardless of how
+    many entries there are, and the whole table can be converted to a
+    :class:`pandas.DataFrame` without looping over each cell.
+
+    Behaves like a list of dicts: entries can be appended as dicts, and
+    indexing or iterating gives dict-like views of each entry which can
+    also be written to.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of rows to allocate space for initially.
+    """
+
+    def __init__(self, capacity=64):
+        self._index = {}  # column name -> index in self._columns
+        self._columns = []
+        self._capacity = max(int(capacity), 1)
+        self._nRows = 0
+
+    @property
+    def names(self):
+        """Names of all columns, in the order they were added.
+        """
+        return list(self._index)
+
+    def _getColumn(self, name, value):
+        """Get the column for a given name, creating it (with a dtype suited
+        to the given value) if needed.
+        """
+        index = self._index.get(name)
+        if index is None:
+            index = self._index[name] = len(self._columns)
+            self._columns.append(_Column(_dtypeFor(value), self._capacity))
+        return self._columns[index]
+
+    def _setValue(self, row, name, value):
+        self._getColumn(name, value).set(row, value)
+
+    def append(self, entry):
+        """Add an entry to the end.
+
+        Parameters
+        ----------
+        entry : dict
+            Dict of column names to values.
+        """
+        if self._nRows == self._capacity:
+            self._capacity *= 2
+            for column in self._columns:
+                column.resize(self._capacity)
+        row = self._nRows
+        self._nRows += 1
+        for name, value in entry.items():
+            self._setValue(row, name, value)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def copy(self):
+        """Make a copy of these entries which doesn't share any data with
+        the original.
+        """
+        dupe = ColumnarEntries.__new__(ColumnarEntries)
+        dupe._index = dict(self._index)
+        dupe._columns = [column.copy() for column in self._columns]
+        dupe._capacity = self._capacity
+        dupe._nRows = self._nRows
+        return dupe
+
+    def getColumn(self, name, start=0, stop=None, missing=u''):
+        """Get the values of a single column as an array of objects.
+
+        Parameters
+        ----------
+        name : str
+            Name of the column.
+        start, stop : int or None
+            Range of entries to get values from, defaults to all entries.
+        missing : object
+            Value to give for entries which don't have a value in this
+            column.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        start, stop, _ = slice(start, stop).indices(self._nRows)
+        index = self._index.get(name)
+        if index is None:
+            values = np.empty(stop - start, dtype=object)
+            values[:] = missing
+            return values
+        column = self._columns[index]
+        # converting to object gives back the original Python types
+        values = column.values[start:stop].astype(object)
+        values[~column.present[start:stop]] = missing
+        return values
+
+    def __len__(self):
+        return self._nRows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self._nRows))]
+        if row < 0:
+            row += self._nRows
+        if not 0 <= row < self._nRows:
+            raise IndexError("entry index out of range")
+        return _ColumnarRow(self, row)
+
+    def __iter__(self):
+        for row in range(self._nRows):
+            yield _ColumnarRow(self, row)
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return False
+        return all(dict(a) == dict(b) for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def toDataFrame(self, columns=None):
+        """Get these entries as a :class:`pandas.DataFrame`, with one row per
+        entry.
+
+        Parameters
+        ----------
+        columns : list of str or None
+            Columns to include, in order. Any which haven't been added are
+            left empty. Use None to include all columns, in the order they
+            were added.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        if columns is None:
+            columns = self.names
+        data = {}
+        for name in columns:
+            index = self._index.get(name)
+            if index is None:
+                data[name] = pd.Series([None] * self._nRows, dtype=object)
+            else:
+                data[name] = self._columns[index].toSeries(self._nRows)
+
+        return pd.DataFrame(data, columns=columns, index=range(self._nRows))
@@ -1,10 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import os
 import json
 import sys
 import copy
+import array
+import codecs
 import pickle
 import atexit
+from concurrent.futures import CancelledError, Future, wait as waitForFutures
 import pandas as pd
 
 from psychopy import constants, clock
@@ -15,6 +19,239 @@ from psychopy.tools.filetools import (openOutputFile, genDelimiter,
 from psychopy.localization import _translate
 from .utils import checkValidFilePath
 from .base import _ComparisonMixin
+from .columnar import ColumnarEntries
+
+
+def _wideTextCell(value):
+    """Format a single value as a cell of a wide text file, quoting it if it
+    contains a comma or a line break.
+    """
+    value = str(value)
+    if ',' in value or '\n' in value:
+        return u'"%s"' % value
+    return value
+
+
+def _wideTextColumn(values):
+    """Format a whole column of values as wide text cells.
+    """
+    cells = list(map(str, values))
+    # most columns never need quoting, so check them all at once first
+    joined = u''.join(cells)
+    if ',' in joined or '\n' in joined:
+        cells = [_wideTextCell(cell) for cell in cells]
+    return cells
+
+
+def _wideTextRows(entries, names, delim, start, stop):
+    """Format a block of entries as the rows of a wide text file, a column at
+    a time, returning them as a single string.
+
+    Parameters
+    ----------
+    entries : list of dict or ColumnarEntries
+        Entries to take rows from.
+    names : list of str
+        Names of the columns to write, in order.
+    delim : str
+        Delimiter to place after each cell.
+    start, stop : int
+        Indices of the first and last (exclusive) entries to write.
+    """
+    if isinstance(entries, ColumnarEntries):
+        columns = [
+            _wideTextColumn(entries.getColumn(name, start, stop))
+            for name in names
+        ]
+    else:
+        block = entries[start:stop]
+        columns = [
+            _wideTextColumn([entry.get(name, u'') for entry in block])
+            for name in names
+        ]
+    if not columns:
+        return u'\n' * (stop - start)
+    end = delim + u'\n'
+    return u''.join([delim.join(row) + end for row in zip(*columns)])
+
+
+class _WideTextStream:
+    """Appends the entries of an ExperimentHandler to a wide text file as
+    they are completed, rather than writing the whole file in one go when the
+    experiment ends.
+
+    Rows are encoded and appended to a buffered binary file, and the byte
+    length and column count of each row is kept so that, if new columns
+    appear after the header was written, :meth:`sync` can rewrite the header
+    (and pad the earlier rows) without needing to format any of the data
+    again. Only rows changed after being written (see :meth:`updateRow`) are
+    formatted again.
+
+    Parameters
+    ----------
+    fileName : str
+        Name of the file to write to, including extension.
+    delim : str
+        Delimiter to place after each cell.
+    encoding : str
+        Encoding to write the file in.
+    fileCollisionMethod : str
+        Collision method passed to
+        :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+    """
+
+    def __init__(self, fileName, delim=',', encoding='utf-8-sig',
+                 fileCollisionMethod='rename'):
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(
+                fileName, fileCollisionMethod=fileCollisionMethod)
+        self.fileName = fileName
+        self.delim = delim
+        self.encoding = encoding
+        self.names = []  # column names, in the order they appear in the file
+        self._nameSet = set()
+        self._headerWidth = None  # number of columns in the written header
+        self._headerLength = 0  # length of the written header in bytes
+        self._rowLengths = array.array('Q')  # bytes per row, minus newline
+        self._rowWidths = array.array('L')  # columns per row
+        self._changedRows = {}  # index:entry of rows changed since written
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        self._file = open(fileName, 'wb')
+        # length of an encoded line break once any byte order mark is written
+        newline = codecs.getincrementalencoder(encoding)()
+        newline.encode(u'')
+        self._newline = newline.encode(u'\n')
+
+    def addNames(self, names):
+        """Add any column names which aren't already in the file to the end
+        of the header.
+        """
+        for name in names:
+            if name not in self._nameSet:
+                self._nameSet.add(name)
+                self.names.append(name)
+
+    def _encodeHeader(self, encoder):
+        return encoder.encode(
+            u''.join(u'%s%s' % (name, self.delim) for name in self.names)
+            + u'\n'
+        )
+
+    def _encodeRow(self, entry, encoder):
+        delim = self.delim
+        cells = []
+        for name in self.names:
+            if name in entry:
+                cells.append(_wideTextCell(entry[name]))
+            else:
+                cells.append(u'')
+
+        return encoder.encode(delim.join(cells) + delim), len(cells)
+
+    def writeRow(self, entry):
+        """Append a single entry (a dict of column names to values) to the
+        file, writing the header first if this is the first row.
+        """
+        # any column we haven't seen yet goes on the end
+        self.addNames(entry)
+        if self._headerWidth is None:
+            header = self._encodeHeader(self._encoder)
+            self._file.write(header)
+            self._headerLength = len(header)
+            self._headerWidth = len(self.names)
+        row, width = self._encodeRow(entry, self._encoder)
+        self._file.write(row)
+        self._file.write(self._newline)
+        self._rowLengths.append(len(row))
+        self._rowWidths.append(width)
+        # hand the row over to the OS so it survives a crash
+        self._file.flush()
+
+    def updateRow(self, index, entry):
+        """Replace a row which has already been written with the values now in
+        `entry`. The file isn't changed until the next :meth:`sync`.
+        """
+        self.addNames(entry)
+        self._changedRows[index] = entry
+
+    def sync(self):
+        """Make sure the file on disk is complete and readable, rewriting it
+        if columns have been added since the header was written or rows have
+        changed since they were written.
+
+        Returns
+        -------
+        str
+            Name of the file being written to.
+        """
+        if self._headerWidth is None:
+            # nothing written yet, so just write the header
+            header = self._encodeHeader(self._encoder)
+            self._file.write(header)
+            self._headerLength = len(header)
+            self._headerWidth = len(self.names)
+        elif self._headerWidth < len(self.names) or self._changedRows:
+            self._rewrite()
+        self._file.flush()
+
+        return self.fileName
+
+    def _rewrite(self):
+        """Copy the file with a new header, padding each row out to the full
+        number of columns and formatting changed rows again as it goes.
+        """
+        self._file.close()
+        nCols = len(self.names)
+        tmpName = self.fileName + '.tmp'
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        rowLengths = array.array('Q')
+        with open(self.fileName, 'rb') as src, open(tmpName, 'wb') as dst:
+            header = self._encodeHeader(encoder)
+            dst.write(header)
+            src.seek(self._headerLength)
+            # padding only depends on how many columns a row is missing
+            padding = {}
+            rows = enumerate(zip(self._rowLengths, self._rowWidths))
+            for index, (length, width) in rows:
+                if index in self._changedRows:
+                    row, _ = self._encodeRow(self._changedRows[index], encoder)
+                    src.seek(length, os.SEEK_CUR)
+                    dst.write(row)
+                    length = len(row)
+                else:
+                    if width not in padding:
+                        padding[width] = encoder.encode(
+                            self.delim * (nCols - width))
+                    dst.write(src.read(length))
+                    dst.write(padding[width])
+                    length += len(padding[width])
+                dst.write(self._newline)
+                src.seek(len(self._newline), os.SEEK_CUR)
+                rowLengths.append(length)
+        os.replace(tmpName, self.fileName)
+        # carry on appending to the new file
+        self._encoder = encoder
+        self._file = open(self.fileName, 'ab')
+        self._headerLength = len(header)
+        self._headerWidth = nCols
+        self._rowLengths = rowLengths
+        self._rowWidths = array.array('L', [nCols] * len(rowLengths))
+        self._changedRows = {}
+
+    def close(self):
+        """Sync the file and close it.
+
+        Returns
+        -------
+        str
+            Name of the file written to.
+        """
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+            logging.info('saved data to %r' % self.fileName)
+
+        return self.fileName
 
 
 class ExperimentHandler(_ComparisonMixin):
@@ -40,7 +277,9 @@ class ExperimentHandler(_ComparisonMixin):
                  sortColumns=False,
                  dataFileName='',
                  autoLog=True,
-                 appendFiles=False):
+                 appendFiles=False,
+                 streamWideText=False,
+                 columnar=False):
         """
         :parameters:
 
@@ -82,6 +321,26 @@ class ExperimentHandler(_ComparisonMixin):
 
 
             autoLog : True (default) or False
+
+            streamWideText : True or False (default)
+                If True (and `saveWideText` is True), each entry is appended
+                to the wide text file as soon as nextEntry() is called,
+                rather than the whole file being written when the experiment
+                ends. The file on disk is then always up to date and saving
+                at the end only needs to finish off the header. Columns in a
+                streamed file are kept in the order they first appear, so
+                `sortColumns` is not applied to it. Values added with
+                `addData(row=...)` to an entry which was already written
+                aren't in the file until the data are saved, when the file is
+                rewritten to include them.
+
+            columnar : True or False (default)
+                If True, completed entries are stored as one NumPy array per
+                column (see :class:`~psychopy.data.columnar.ColumnarEntries`)
+                rather than as a dict per entry. This uses much less memory
+                for experiments with many entries and lets the data be
+                converted to a DataFrame (see `getDataFrame`) without looping
+                over every value.
         """
         self.loops = []
         self.loopsUnfinished = []
@@ -98,9 +357,14 @@ class ExperimentHandler(_ComparisonMixin):
         self.dataFileName = handleFileCollision(dataFileName, "rename")
         self.sortColumns = sortColumns
         self.thisEntry = {}
-        self.entries = []  # chronological list of entries
+        # chronological list of entries
+        if columnar:
+            self.entries = ColumnarEntries()
+        else:
+            self.entries = []
         self._paramNamesSoFar = []
         self.dataNames = ['thisRow.t', 'notes']  # names of all the data (eg. resp.keys)
+        self._dataNameSet = set(self.dataNames)  # for quick lookup of the above
         self.columnPriority = {
             'thisRow.t': constants.priority.CRITICAL - 1,
             'notes': constants.priority.MEDIUM - 1,
@@ -112,6 +376,17 @@ class ExperimentHandler(_ComparisonMixin):
         self._nextSaveCollision = {}
         # list of call profiles for connected save methods
         self.connectedSaveMethods = []
+        # number of entries to format at once when saving wide text
+        self.wideTextChunkSize = 10000
+        # wide text file to write entries to as they're completed (if any)
+        self.streamWideText = streamWideText
+        self._wideTextStream = None
+        self._rowsStreamed = 0
+        # values added as futures which haven't been filled in yet, as
+        # (row, name, future)
+        self._pendingData = []
+        # seconds to wait for them when saving, before leaving them blank
+        self.pendingDataTimeout = 60.0
 
         if dataFileName in ['', None]:
             logging.warning('ExperimentHandler created with no dataFileName'
@@ -125,6 +400,24 @@ class ExperimentHandler(_ComparisonMixin):
     def __del__(self):
         self.close()
 
+    def __getstate__(self):
+        # an open file can't be pickled, so leave the stream behind
+        state = self.__dict__.copy()
+        state['_wideTextStream'] = None
+        state['_pendingData'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # handlers saved by older versions won't have these
+        self.__dict__.setdefault('streamWideText', False)
+        self.__dict__.setdefault('_wideTextStream', None)
+        self.__dict__.setdefault('_rowsStreamed', 0)
+        self.__dict__.setdefault('_pendingData', [])
+        self.__dict__.setdefault('wideTextChunkSize', 10000)
+        self.__dict__.setdefault('pendingDataTimeout', 60.0)
+        self._dataNameSet = set(self.dataNames)
+
     @property
     def currentLoop(self):
         """
@@ -245,7 +538,12 @@ class ExperimentHandler(_ComparisonMixin):
         name : str
             Name of the column to add data as.
         value : any
-            Value to add
+            Value to add. If this is a `concurrent.futures.Future` (e.g. from
+            an asynchronous transcription), its result is filled in once it's
+            done. Until then the value is left blank. When the data are
+            saved, values still to arrive are waited for, for up to
+            `pendingDataTimeout` seconds (60 by default), after which they're
+            left blank.
         row : int or None
             Row in which to add this data. Leave as None to add to the current entry.
         priority : int
@@ -258,8 +556,12 @@ class ExperimentHandler(_ComparisonMixin):
             - EXCLUDE: Always at the end of the data file, actively marked as unimportant
 
         """
-        if name not in self.dataNames:
-            self.dataNames.append(name)
+        self._addDataName(name)
+        # fill in the result of a future once it's done
+        if isinstance(value, Future):
+            self._pendingData.append(
+                (len(self.entries) if row is None else row, name, value))
+            value = u''
         # could just copy() every value, but not always needed, so check:
         try:
             hash(value)
@@ -276,11 +578,62 @@ class ExperimentHandler(_ComparisonMixin):
         if row is not None:
             entry = self.entries[row]
         entry[name] = value
+        # an entry which was already streamed needs writing again
+        if row is not None and self._wideTextStream is not None:
+            if row < 0:
+                row += len(self.entries)
+            if row < self._rowsStreamed:
+                self._wideTextStream.updateRow(row, entry)
 
         # set priority if given
         if priority is not None:
             self.setPriority(name, priority)
 
+    def _resolvePendingData(self, wait=False):
+        """Fill in values which were added as futures and are now done.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for the futures to be done, for up to `pendingDataTimeout`
+            seconds in all, so every value is filled in. Any which still
+            aren't done are left blank.
+        """
+        if wait and self._pendingData:
+            waitForFutures([future for _, _, future in self._pendingData],
+                           timeout=self.pendingDataTimeout)
+        stillPending = []
+        for row, name, future in self._pendingData:
+            if not future.done():
+                if wait:
+                    logging.error(
+                        "Gave up waiting for value of '%s' for row %i after "
+                        "%s s, leaving it blank" % (
+                            name, row, self.pendingDataTimeout))
+                else:
+                    stillPending.append((row, name, future))
+                continue
+            try:
+                value = future.result()
+            except (Exception, CancelledError) as err:
+                logging.error(
+                    "Could not get value of '%s' for row %i: %s" % (
+                        name, row, err))
+                continue
+            # the row may still be the current entry
+            if row < len(self.entries):
+                self.entries[row][name] = value
+            else:
+                self.thisEntry[name] = value
+        self._pendingData = stillPending
+
+    def _addDataName(self, name):
+        """Add a name to `dataNames`, if it isn't there already.
+        """
+        if name not in self._dataNameSet:
+            self._dataNameSet.add(name)
+            self.dataNames.append(name)
+
     def getPriority(self, name):
         """
         Get the priority value for a given column. If no priority value is
@@ -388,8 +741,7 @@ class ExperimentHandler(_ComparisonMixin):
             Format in which to return time, see clock.Timestamp.resolve() for more info. Defaults to `float`.
         """
         # make sure the name is used when writing the datafile
-        if name not in self.dataNames:
-            self.dataNames.append(name)
+        self._addDataName(name)
         # tell win to record timestamp on flip
         win.timeOnFlip(self.thisEntry, name, format=format)
 
@@ -573,6 +925,8 @@ class ExperimentHandler(_ComparisonMixin):
         to the next trial.
         """
         this = self.thisEntry
+        # fill in any values which have arrived
+        self._resolvePendingData()
         # fetch data from each (potentially-nested) loop
         for thisLoop in self.loopsUnfinished:
             self.updateEntryFromLoop(thisLoop)
@@ -580,6 +934,10 @@ class ExperimentHandler(_ComparisonMixin):
         if type(self.extraInfo) == dict:
             this.update(self.extraInfo)
         self.entries.append(this)
+        # write the entry straight to file if streaming
+        stream = self._getWideTextStream()
+        if stream is not None:
+            self._streamEntries(stream)
         # add new entry with its
         self.thisEntry = {}
 
@@ -598,8 +956,73 @@ class ExperimentHandler(_ComparisonMixin):
             # add/update value
             self.thisEntry[name] = vals[n]
             # make sure name is in data names
-            if name not in self.dataNames:
-                self.dataNames.append(name)
+            self._addDataName(name)
+
+    def _getWideTextNames(self):
+        """Returns the names of all columns in a wide text file of this
+        experiment's data, in the order they were added.
+        """
+        names = self._getAllParamNames()
+        for name in self.dataNames:
+            if name not in names:
+                names.append(name)
+        # names from the extraInfo dictionary
+        names.extend(self._getExtraInfo()[0])
+
+        return names
+
+    def _getWideTextStream(self):
+        """Returns the stream which entries are written to as they're
+        completed, creating it if needed. Returns None if not streaming.
+        """
+        if self._wideTextStream is not None:
+            return self._wideTextStream
+        if not (self.streamWideText and self.saveWideText):
+            return None
+        if self.dataFileName in ['', None]:
+            return None
+        if self.appendFiles:
+            logging.warning(
+                "ExperimentHandler can't stream data to a file it's appending "
+                "to, so data will be saved at the end of the experiment "
+                "instead."
+            )
+            self.streamWideText = False
+            return None
+        fileName = self.dataFileName + '.csv'
+        self._wideTextStream = _WideTextStream(
+            fileName,
+            delim=genDelimiter(fileName),
+            fileCollisionMethod=self._nextSaveCollision.pop(fileName, 'rename')
+        )
+        # start off with the columns we already know about
+        self._wideTextStream.addNames(self._getWideTextNames())
+
+        return self._wideTextStream
+
+    def _streamEntries(self, stream):
+        """Write completed entries which haven't been streamed yet. An entry
+        with values still pending is held back, along with those after it, so
+        rows stay in order.
+        """
+        stop = len(self.entries)
+        if self._pendingData:
+            stop = min([stop] + [row for row, _, _ in self._pendingData])
+        for row in range(self._rowsStreamed, stop):
+            stream.writeRow(self.entries[row])
+        self._rowsStreamed = max(self._rowsStreamed, stop)
+
+    def _isStreamedFile(self, fileName, delim):
+        """Is the given file name and delimiter the same file that entries
+        are being streamed to?
+        """
+        if self._wideTextStream is None:
+            return False
+        return (
+            genFilenameFromDelimiter(fileName, delim) ==
+            genFilenameFromDelimiter(self.dataFileName + '.csv', delim) and
+            delim == self._wideTextStream.delim
+        )
 
     def getAllEntries(self):
         """Fetches a copy of all the entries including a final (orphan) entry
@@ -608,12 +1031,37 @@ class ExperimentHandler(_ComparisonMixin):
 
         :return: copy (not pointer) to entries
         """
+        self._resolvePendingData()
         # check for orphan final data (not committed as a complete entry)
-        entries = copy.copy(self.entries)
+        if isinstance(self.entries, ColumnarEntries):
+            entries = self.entries.copy()
+        else:
+            entries = copy.copy(self.entries)
         if self.thisEntry:  # thisEntry is not empty
             entries.append(self.thisEntry)
         return entries
 
+    def getDataFrame(self, columns=None):
+        """Get all entries (including a final orphan entry, if there is one)
+        as a :class:`pandas.DataFrame`, with one row per entry.
+
+        Parameters
+        ----------
+        columns : list of str or None
+            Columns to include, in order. Use None to include every column
+            which would be in a wide text file of this data.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        if columns is None:
+            columns = self._getWideTextNames()
+        entries = self.getAllEntries()
+        if isinstance(entries, ColumnarEntries):
+            return entries.toDataFrame(columns=columns)
+        return pd.DataFrame(entries, columns=columns)
+
     def queueNextCollision(self, fileCollisionMethod, fileName=None):
         """
         Tell this ExperimentHandler than, next time the named file is saved, it should handle 
@@ -668,6 +1116,8 @@ class ExperimentHandler(_ComparisonMixin):
         saveAsPickle, etc.)
         """
         savedNames = []
+        # values still to arrive have to be in the saved data
+        self._resolvePendingData(wait=True)
         if self.dataFileName not in ['', None]:
             if self.autoLog:
                 msg = 'Saving data for %s ExperimentHandler' % self.name
@@ -712,6 +1162,11 @@ class ExperimentHandler(_ComparisonMixin):
         which can be handy if you want to append data to an existing file
         of the same format.
 
+        If this ExperimentHandler is streaming its entries (see
+        `streamWideText`) to the requested file, the file is already up to
+        date, so only its header is updated and the other parameters are
+        ignored.
+
         Parameters
         ----------
 
@@ -761,6 +1216,12 @@ class ExperimentHandler(_ComparisonMixin):
         elif delim in delimOptions:
             delim = delimOptions[delim]
 
+        # if entries are already being streamed to this file, just sync it
+        if self._isStreamedFile(fileName, delim):
+            self._nextSaveCollision.pop(fileName, None)
+            self._wideTextStream.addNames(self._getWideTextNames())
+            return self._wideTextStream.sync()
+
         if appendFile is None:
             appendFile = self.appendFiles
         # check for queued collision methods if using default, fallback to rename
@@ -775,12 +1236,7 @@ class ExperimentHandler(_ComparisonMixin):
                            fileCollisionMethod=fileCollisionMethod,
                            encoding=encoding)
 
-        names = self._getAllParamNames()
-        for name in self.dataNames:
-            if name not in names:
-                names.append(name)
-        # names from the extraInfo dictionary
-        names.extend(self._getExtraInfo()[0])
+        names = self._getWideTextNames()
         if len(names) < 1:
             logging.error("No data was found, so data file may not look as expected.")
         # if sort columns not specified, use default from self
@@ -804,18 +1260,10 @@ class ExperimentHandler(_ComparisonMixin):
             f.write('\n')
 
         # write the data for each entry
-        for entry in self.getAllEntries():
-            for name in names:
-                if name in entry:
-                    ename = str(entry[name])
-                    if ',' in ename or '\n' in ename:
-                        fmt = u'"%s"%s'
-                    else:
-                        fmt = u'%s%s'
-                    f.write(fmt % (entry[name], delim))
-                else:
-                    f.write(delim)
-            f.write('\n')
+        entries = self.getAllEntries()
+        for start in range(0, len(entries), self.wideTextChunkSize):
+            stop = min(start + self.wideTextChunkSize, len(entries))
+            f.write(_wideTextRows(entries, names, delim, start, stop))
         if f != sys.stdout:
             f.close()
         logging.info('saved data to %r' % f.name)
@@ -881,6 +1329,74 @@ class ExperimentHandler(_ComparisonMixin):
 
         return fileName
 
+    def saveAsParquet(self, fileName, fileCollisionMethod=None):
+        """Save all entries as a Parquet file (requires `pyarrow` or
+        `fastparquet` to be installed).
+
+        Parameters
+        ----------
+        fileName : str
+            Name of the file to save, '.parquet' will be appended if not
+            already present.
+        fileCollisionMethod : str
+            Collision method passed to
+            :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+
+        Returns
+        -------
+        str
+            Final filename which data was saved as
+        """
+        return self._saveDataFrame(
+            fileName, '.parquet', 'to_parquet', fileCollisionMethod)
+
+    def saveAsFeather(self, fileName, fileCollisionMethod=None):
+        """Save all entries as a Feather file (requires `pyarrow` to be
+        installed).
+
+        Parameters
+        ----------
+        fileName : str
+            Name of the file to save, '.feather' will be appended if not
+            already present.
+        fileCollisionMethod : str
+            Collision method passed to
+            :func:`~psychopy.tools.fileerrortools.handleFileCollision`
+
+        Returns
+        -------
+        str
+            Final filename which data was saved as
+        """
+        return self._saveDataFrame(
+            fileName, '.feather', 'to_feather', fileCollisionMethod)
+
+    def _saveDataFrame(self, fileName, ext, method, fileCollisionMethod=None):
+        """Save all entries using one of the `to_...` methods of a
+        :class:`pandas.DataFrame`.
+        """
+        if not fileName.endswith(ext):
+            fileName += ext
+        # check for queued collision methods if using default, fallback to rename
+        if fileCollisionMethod is None and fileName in self._nextSaveCollision:
+            fileCollisionMethod = self._nextSaveCollision.pop(fileName)
+        elif fileCollisionMethod is None:
+            fileCollisionMethod = "rename"
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(
+                fileName, fileCollisionMethod=fileCollisionMethod)
+
+        df = self.getDataFrame()
+        # columns of mixed types can't be stored, so store them as text
+        for name in df.columns:
+            if df[name].dtype == object:
+                df[name] = df[name].map(
+                    lambda val: val if val is None else str(val))
+        getattr(df, method)(fileName)
+        logging.info('saved data to %r' % fileName)
+
+        return fileName
+
     def getJSON(self, priorityThreshold=constants.priority.EXCLUDE+1):
         """
         Get the experiment data as a JSON string.
@@ -903,7 +1419,11 @@ class ExperimentHandler(_ComparisonMixin):
         # get columns which meet threshold
         cols = [col for col in self.dataNames if self.getPriority(col) >= priorityThreshold]
         # convert just relevant entries to a DataFrame
-        trials = pd.DataFrame(self.entries, columns=cols).fillna(value="")
+        if isinstance(self.entries, ColumnarEntries):
+            trials = self.entries.toDataFrame(columns=cols).astype(object)
+        else:
+            trials = pd.DataFrame(self.entries, columns=cols)
+        trials = trials.fillna(value="")
         # put in context
         context = {
             'type': "trials_data",
@@ -916,6 +1436,20 @@ class ExperimentHandler(_ComparisonMixin):
         return json.dumps(context, indent=True, allow_nan=False, default=str)
         
     def close(self):
+        self._resolvePendingData(wait=True)
+        if self._wideTextStream is not None:
+            stream = self._wideTextStream
+            if self.saveWideText:
+                # write any entries held back, then any orphan entry
+                self._streamEntries(stream)
+                if self.thisEntry:
+                    stream.writeRow(self.thisEntry)
+                stream.addNames(self._getWideTextNames())
+                # it's complete, so don't write it again
+                self.saveWideText = False
+            stream.close()
+            self._wideTextStream = None
+            self.streamWideText = False
         self.save()
         self.abort()
         self.autoLog = False
@@ -26,10 +26,12 @@ __all__ = [
     'CAMERA_API_ANY',
     'CAMERA_API_UNKNOWN',
     'CAMERA_API_NULL',
+    'CAMERA_API_VIRTUAL',
     'CAMERA_LIB_FFPYPLAYER',
     'CAMERA_LIB_OPENCV',
     'CAMERA_LIB_UNKNOWN',
     'CAMERA_LIB_NULL',
+    'CAMERA_LIB_VIRTUAL',
     'CameraError',
     'CameraNotReadyError',
     'CameraNotFoundError',
@@ -40,6 +42,7 @@ __all__ = [
     'PlayerNotAvailableError',
     'CameraInterfaceFFmpeg',
     'CameraInterfaceOpenCV',
+    'CameraInterfaceVirtual',
     'Camera',
     'CameraInfo',
     'getCameras',
@@ -56,6 +59,8 @@ import os.path
 import sys
 import math
 import uuid
+import shutil
+import tempfile
 import threading
 import queue
 import time
@@ -96,12 +101,14 @@ CAMERA_API_VIDEO4LINUX2 = u'Video4Linux2'  # linux
 CAMERA_API_ANY = u'Any'                    # any API (OpenCV only)
 CAMERA_API_UNKNOWN = u'Unknown'            # unknown API
 CAMERA_API_NULL = u'Null'                  # empty field
+CAMERA_API_VIRTUAL = u'Virtual'            # video file or test pattern
 
 # camera libraries for playback nad recording
 CAMERA_LIB_FFPYPLAYER = u'FFPyPlayer'
 CAMERA_LIB_OPENCV = u'OpenCV'
 CAMERA_LIB_UNKNOWN = u'Unknown'
 CAMERA_LIB_NULL = u'Null'
+CAMERA_LIB_VIRTUAL = u'Virtual'
 
 # special values
 CAMERA_FRAMERATE_NOMINAL_NTSC = '30.000030'
@@ -205,11 +212,11 @@ class CameraInfo:
         stream formats.
     cameraLib : str
         Library used to access the camera. This can be either, 'ffpyplayer',
-        'opencv'.
+        'opencv' or 'virtual'.
     cameraAPI : str
         API used to access the camera. This relates to the external interface
         being used by `cameraLib` to access the camera. This value can be: 
-        'AVFoundation', 'DirectShow' or 'Video4Linux2'.
+        'AVFoundation', 'DirectShow', 'Video4Linux2' or 'Virtual'.
 
     """
     __slots__ = [
@@ -1422,6 +1429,465 @@ class CameraInterfaceOpenCV(CameraInterface):
 _openCameras = {}
 
 
+class _VirtualPatternSource:
+    """Generate frames of a moving test pattern in real time.
+
+    Frames are produced on the camera's clock, a frame is only available once
+    its presentation time has passed. If frames are not read in time, they are
+    skipped as they would be by a real camera.
+
+    Parameters
+    ----------
+    frameSize : tuple
+        Size of the frames `(w, h)` in pixels.
+    frameRate : float
+        Frames per second.
+
+    """
+    def __init__(self, frameSize, frameRate):
+        self.frameSize = tuple(frameSize)
+        self.frameRate = float(frameRate)
+
+        # horizontal and vertical gradients, scrolled horizontally each frame
+        width, height = self.frameSize
+        self._pattern = np.empty((height, width, 3), dtype=np.uint8)
+        self._pattern[:, :, 0] = np.linspace(0, 255, width)[np.newaxis, :]
+        self._pattern[:, :, 1] = np.linspace(0, 255, height)[:, np.newaxis]
+        self._pattern[:, :, 2] = 128
+
+        self._startTime = time.perf_counter()
+        self._lastIndex = -1
+
+    def read(self):
+        """Get the most recent frame if it has not been read yet.
+
+        Returns
+        -------
+        tuple or None
+            Image data as a flat `ndarray`, presentation timestamp and the
+            index of the frame since the stream started. `None` if no new frame 
+            is available.
+
+        """
+        elapsed = time.perf_counter() - self._startTime
+        frameIndex = int(elapsed * self.frameRate)
+        if frameIndex <= self._lastIndex:
+            return None
+
+        self._lastIndex = frameIndex
+        colorData = np.roll(self._pattern, frameIndex * 4, axis=1)
+
+        return colorData.ravel(), frameIndex / self.frameRate, frameIndex
+
+    def close(self):
+        pass
+
+
+class _VirtualFileSource:
+    """Play frames from a video file in real time, looping at the end.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the video file.
+
+    """
+    def __init__(self, filename):
+        from ffpyplayer.player import MediaPlayer
+
+        ff_opts = {
+            'an': True,  # no audio
+            'sync': 'video',
+            'loop': 0,  # loop forever
+            'out_fmt': 'rgb24'}
+        self._player = MediaPlayer(filename, ff_opts=ff_opts)
+
+        # wait for the first frame to get the stream format
+        while True:
+            frame, val = self._player.get_frame()
+            if val == CAMERA_STATUS_EOF:
+                raise CameraError(
+                    "Cannot read frames from video file '{}'.".format(filename))
+            if frame is not None:
+                break
+            time.sleep(0.001)
+
+        metadata = self._player.get_metadata()
+        numer, divisor = metadata['frame_rate']
+        self.frameRate = float(numer) / float(divisor)
+        self.frameSize = tuple(frame[0].get_size())
+
+        self._firstFrame = frame
+        self._frameIndex = -1
+        self._lastPTS = -1.0
+        self._ptsOffset = 0.0  # added to timestamps after looping
+
+    def read(self):
+        """Get the next frame from the file if it is due.
+
+        Returns
+        -------
+        tuple or None
+            Image data as a flat `ndarray`, presentation timestamp and the
+            index of the frame since the stream started. `None` if no new frame 
+            is available.
+
+        """
+        if self._firstFrame is not None:
+            frame, self._firstFrame = self._firstFrame, None
+        else:
+            frame, val = self._player.get_frame()
+            if frame is None or val in (CAMERA_STATUS_EOF, 
+                                        CAMERA_STATUS_PAUSED):
+                return None
+
+        image, pts = frame
+        # keep timestamps increasing when the file loops
+        if pts + self._ptsOffset <= self._lastPTS:
+            self._ptsOffset = self._lastPTS + 1.0 / self.frameRate - pts
+        self._lastPTS = pts + self._ptsOffset
+        self._frameIndex += 1
+
+        colorData = np.frombuffer(image.to_bytearray()[0], dtype=np.uint8)
+
+        return colorData, self._lastPTS, self._frameIndex
+
+    def close(self):
+        self._player.close_player()
+
+
+class CameraInterfaceVirtual(CameraInterface):
+    """Camera interface which plays a video file or generates a test pattern.
+
+    This behaves like a camera attached to the system, frames are made 
+    available at the native frame rate of the source with presentation 
+    timestamps relative to when the stream was opened. It can be used to test 
+    and benchmark recording without camera hardware, e.g., on a headless 
+    machine.
+
+    Parameters
+    ----------
+    device : CameraInfo
+        Camera device to open a stream with. If the `name` of the device is
+        `'pattern'`, a moving test pattern is generated using the `frameSize`
+        and `frameRate` of the device. Otherwise, `name` is the path to a video 
+        file which is played on a loop. Playing files requires `ffpyplayer`.
+    mic : MicrophoneInterface or None
+        Microphone interface to use for audio recording. If `None`, no audio
+        recording is performed.
+
+    """
+    _cameraLib = u'virtual'
+
+    # name of the device for the test pattern
+    PATTERN = u'pattern'
+
+    def __init__(self, device, mic=None):
+        super().__init__(device=device)
+
+        self._cameraInfo = device
+        self._mic = mic  # microphone interface
+        self._frameQueue = queue.Queue()
+        self._enableEvent = threading.Event()
+        self._enableEvent.clear()
+        self._exitEvent = threading.Event()
+        self._exitEvent.clear()
+        self._warmUpBarrier = None
+        self._recordBarrier = None  # created in `open()`
+        self._playerThread = None
+        self._streamStartTime = None
+
+    def _assertMediaPlayer(self):
+        return self._playerThread is not None
+
+    @staticmethod
+    def getCameras():
+        """Get a list of devices this interface can open.
+
+        Returns
+        -------
+        dict
+            Mapping of camera names to `CameraInfo` objects for the formats the
+            test pattern can be generated with. 
+
+        """
+        formats = []
+        for frameSize in ((640, 480), (1280, 720), (1920, 1080)):
+            for frameRate in (30.0, 60.0):
+                formats.append(CameraInfo(
+                    index=0,
+                    name=CameraInterfaceVirtual.PATTERN,
+                    frameSize=frameSize,
+                    frameRate=frameRate,
+                    pixelFormat='rgb24',
+                    cameraLib=CameraInterfaceVirtual._cameraLib,
+                    cameraAPI=CAMERA_API_VIRTUAL))
+
+        return {CameraInterfaceVirtual.PATTERN: formats}
+
+    @property
+    def frameRate(self):
+        """Frame rate of the camera stream (`float`).
+        """
+        return self._cameraInfo.frameRate
+
+    @property
+    def frameSize(self):
+        """Frame size of the camera stream (`tuple`).
+        """
+        return self._cameraInfo.frameSize
+
+    @property
+    def streamTime(self):
+        """Time in seconds since the stream was opened (`float`).
+        """
+        if self._streamStartTime is None:
+            return -1.0
+
+        return time.perf_counter() - self._streamStartTime
+
+    @property
+    def framesWaiting(self):
+        """Get the number of frames currently buffered (`int`).
+
+        Returns the number of frames which have been pulled from the stream and
+        are waiting to be processed. This value is decremented by calls to 
+        `_enqueueFrame()`.
+
+        """
+        return self._frameQueue.qsize()
+
+    def isOpen(self):
+        """Check if the camera stream is open (`bool`).
+        """
+        if self._playerThread is not None:
+            return self._playerThread.is_alive()
+
+        return False
+
+    def open(self):
+        """Open the stream and start producing frames.
+
+        If the device is a video file, the frame rate and size of the device 
+        are set from the file.
+
+        """
+        if self._playerThread is not None:
+            raise RuntimeError('Cannot open virtual camera, already opened.')
+
+        self._exitEvent.clear()
+
+        def _frameGetterAsync(source, frameQueue, exitEvent, recordEvent,
+                              warmUpBarrier, recordingBarrier, audioCapture):
+            """Get frames from the source asynchronously.
+
+            Parameters
+            ----------
+            source : _VirtualPatternSource or _VirtualFileSource
+                Source of the frames. This object will be under direct control 
+                of this function.
+            frameQueue : queue.Queue
+                Queue to put frames into.
+            exitEvent : threading.Event
+                Event used to signal the thread to stop.
+            recordEvent : threading.Event
+                Event used to signal the thread to pass frames along to the main 
+                thread.
+            warmUpBarrier : threading.Barrier
+                Barrier which is used hold until the source is ready.
+            recordingBarrier : threading.Barrier
+                Barrier which is used to synchronize audio and video recording.
+            audioCapture : psychopy.sound.Microphone or None
+                Microphone object to use for audio capture. If `None`, no audio
+                will be captured.
+
+            """
+            # poll interval is half the frame period, as for a real camera
+            pollInterval = (1.0 / source.frameRate) * 0.5
+
+            warmUpBarrier.wait()  # wait for main thread to be ready
+
+            isRecording = False
+            while not exitEvent.is_set():
+                frame = source.read()
+                if frame is not None and isRecording:
+                    frameQueue.put((frame, CAMERA_STATUS_OK, None))
+
+                if recordEvent.is_set() and not isRecording:
+                    if audioCapture is not None:
+                        audioCapture.start(waitForStart=1)
+                    recordingBarrier.wait()
+                    isRecording = True
+                elif not recordEvent.is_set() and isRecording:
+                    if audioCapture is not None:
+                        audioCapture.stop(blockUntilStopped=1)
+                    recordingBarrier.wait()
+                    isRecording = False
+
+                if isRecording and audioCapture is not None:
+                    if audioCapture.isRecording:
+                        audioCapture.poll()
+
+                time.sleep(pollInterval)
+
+            source.close()
+
+            if audioCapture is not None:
+                audioCapture.stop(blockUntilStopped=1)
+
+        _cameraInfo = self._cameraInfo
+        if _cameraInfo.name == self.PATTERN:
+            source = _VirtualPatternSource(
+                _cameraInfo.frameSize, _cameraInfo.frameRate)
+        else:
+            if not os.path.isfile(_cameraInfo.name):
+                raise CameraNotFoundError(
+                    "Cannot find video file '{}'.".format(_cameraInfo.name))
+            source = _VirtualFileSource(_cameraInfo.name)
+            # use the format of the file
+            _cameraInfo.frameRate = source.frameRate
+            _cameraInfo.frameSize = source.frameSize
+
+        self._warmUpBarrier = threading.Barrier(2)
+        self._recordBarrier = threading.Barrier(2)
+
+        self._playerThread = threading.Thread(
+            target=_frameGetterAsync,
+            args=(source,
+                  self._frameQueue,
+                  self._exitEvent,
+                  self._enableEvent,
+                  self._warmUpBarrier,
+                  self._recordBarrier,
+                  self._mic))
+        self._playerThread.daemon = True
+        self._playerThread.start()
+
+        self._warmUpBarrier.wait()
+        self._streamStartTime = time.perf_counter()
+
+    def _enqueueFrame(self):
+        """Grab the latest frame from the stream.
+
+        Returns
+        -------
+        bool
+            `True` if a frame has been enqueued. Returns `False` if the camera 
+            has not acquired a new frame yet.
+
+        """
+        self._assertMediaPlayer()
+
+        try:
+            frameData = self._frameQueue.get_nowait()
+        except queue.Empty:
+            return False
+
+        frame, val, _ = frameData
+
+        if val != CAMERA_STATUS_OK or frame is None:
+            return False
+
+        colorData, pts, frameIndex = frame
+
+        self._lastFrame = MovieFrame(
+            frameIndex=frameIndex,
+            absTime=pts,
+            size=self._cameraInfo.frameSize,
+            colorFormat='rgb24',
+            colorData=colorData,
+            audioChannels=0,
+            audioSamples=None,
+            metadata=None,
+            movieLib=self._cameraLib,
+            userData=None)
+
+        return True
+
+    def close(self):
+        """Close the stream and release resources. 
+        
+        This blocks until the stream thread is no longer alive.
+
+        """
+        if self._playerThread is None:  # not opened or already closed
+            return
+
+        self._exitEvent.set()  # signal the thread to stop
+        self._playerThread.join()  # wait for the thread to stop
+
+        self._playerThread = None
+        self._streamStartTime = None
+
+    @property
+    def isEnabled(self):
+        """`True` if the camera is enabled.
+        """
+        return self._enableEvent.is_set()
+
+    def enable(self, state=True):
+        """Start passing frames to the frame queue.
+
+        This method returns when the video and audio stream are both starting to
+        record or stop recording.
+
+        Parameters
+        ----------
+        state : bool
+            `True` to enable recording frames to the queue, `False` to disable.
+            On state change, the audio interface will be started or stopped.
+
+        """
+        if state:
+            self._enableEvent.set()
+        else:
+            self._enableEvent.clear()
+
+        self._recordBarrier.wait()
+        self._enqueueFrame()
+
+    def disable(self):
+        """Stop passing frames to the frame queue.
+        
+        Calling this is equivalent to calling `enable(False)`.
+
+        """
+        self.enable(False)
+
+    def getFrames(self):
+        """Get all frames from the stream which are waiting to be processed. 
+
+        Returns
+        -------
+        list
+            List of `MovieFrame` objects. The most recent frame is the last one 
+            in the list.
+
+        """
+        self._assertMediaPlayer()
+
+        frames = []
+        while self._enqueueFrame():
+            frames.append(self._lastFrame)
+
+        return frames
+
+    def getRecentFrame(self):
+        """Get the most recent frame captured from the stream, discarding all 
+        others.
+
+        Returns
+        -------
+        MovieFrame
+            The most recent frame from the stream.
+
+        """
+        while self._enqueueFrame():
+            pass
+
+        return self._lastFrame
+
+
 class Camera:
     """Class for displaying and recording video from a USB/PCI connected camera.
 
@@ -1467,7 +1933,10 @@ class Camera:
         be `ffpyplayer` or `opencv`. If `None`, the default library for the
         recommended by the PsychoPy developers will be used. Switching camera 
         libraries could help resolve issues with camera compatibility. More 
-        camera libraries may be installed via extension packages.
+        camera libraries may be installed via extension packages. Use 
+        `virtual` to play a video file given as `device`, or a generated test
+        pattern if `device` is `'pattern'` or `None`, instead of opening a
+        camera.
     bufferSecs : float
         Size of the real-time camera stream buffer specified in seconds (only
         valid on Windows and MacOS). This is not the same as the recording
@@ -1480,6 +1949,28 @@ class Camera:
         safely ignored.
     name : str
         Label for the camera for logging purposes.
+    liveEncode : bool
+        Encode frames to disk while recording instead of keeping them in memory
+        until `save()` is called. Frames are passed to a movie writer running in
+        a separate thread as they are pulled from the stream by `update()`, so
+        memory use stays flat over long recordings and `save()` only needs to
+        finalize the file (and merge audio). Frame timestamps reported by the
+        camera are used as presentation timestamps when available.
+    encoderLib : str or None
+        Encoder library used to write videos, either `'ffpyplayer'` or
+        `'opencv'`. If `None`, the same library as `cameraLib` is used. This 
+        can be overridden by `save()` when `liveEncode=False`.
+    encoderOpts : dict or None
+        Options to pass to the encoder. See the documentation for
+        `~psychopy.tools.movietools.MovieFileWriter` for more details.
+    maxQueueSize : int or None
+        Maximum number of frames waiting to be encoded when `liveEncode=True`.
+        If `None`, the queue holds one second of frames. 
+    queuePolicy : str
+        What to do with a new frame when `liveEncode=True` and the encoder 
+        queue is full. Use `'block'` to wait for the encoder to catch up, or 
+        `'drop'` to discard the frame. Dropped frames are counted by 
+        `framesDropped`.
 
     Examples
     --------
@@ -1513,10 +2004,23 @@ class Camera:
 
         cam = Camera(0, frameRate=30, frameSize=(640, 480), cameraLib=u'opencv')
 
+    Encoding frames to disk during long recordings, dropping frames rather 
+    than stalling if the encoder cannot keep up::
+
+        cam = Camera(0, liveEncode=True, queuePolicy='drop')
+        cam.open()
+        cam.record()
+        while cam.recordingTime < 1800.0:  # 30 minutes
+            cam.update()  # frames are passed to the encoder here
+        cam.stop()  # waits for queued frames to be written
+        cam.save('myVideo.mp4')  # quick, just moves the file
+        print(cam.framesDropped)
+
     """
     def __init__(self, device=0, mic=None, cameraLib=u'ffpyplayer',
                  frameRate=None, frameSize=None, bufferSecs=4, win=None,
-                 name='cam'):
+                 name='cam', liveEncode=False, encoderLib=None, 
+                 encoderOpts=None, maxQueueSize=None, queuePolicy='block'):
         # add attributes for setters
         self.__dict__.update(
             {'_device': None,
@@ -1597,6 +2101,30 @@ class Camera:
             
             self._device = self._cameraInfo.description()
 
+        elif self._cameraLib == u'virtual':
+            if isinstance(device, CameraInfo):
+                self._cameraInfo = device
+            else:
+                if device in (None, 0, "None", "none", "Default", "default"):
+                    device = CameraInterfaceVirtual.PATTERN
+                if not isinstance(device, str):
+                    raise TypeError(
+                        "Incorrect type for `device`, expected a video file "
+                        "path or 'pattern' but received {}".format(
+                            repr(device)))
+
+                # frame rate and size are taken from the file when opened
+                self._cameraInfo = CameraInfo(
+                    index=0,
+                    name=device,
+                    frameRate=frameRate or 30.0,
+                    frameSize=frameSize or (640, 480),
+                    pixelFormat='rgb24',
+                    cameraLib=cameraLib,
+                    cameraAPI=CAMERA_API_VIRTUAL)
+
+            self._device = self._cameraInfo.description()
+
         elif self._cameraLib == u'ffpyplayer':
             supportedCameraSettings = CameraInterfaceFFmpeg.getCameras()
 
@@ -1714,14 +2242,15 @@ class Camera:
 
         _requestedMic = mic
         # if not given a Microphone or MicrophoneDevice, get it from DeviceManager
-        if not isinstance(mic, (Microphone, MicrophoneDevice)):
-            mic = DeviceManager.getDevice(mic)
-        # if not known by name, try index
-        if mic is None:
-            mic = DeviceManager.getDeviceBy("index", mic, deviceClass="microphone")
-        # if not known by name or index, raise error
-        if mic is None:
-            raise SystemError(f"Could not find microphone {_requestedMic}")
+        if mic is not None and not isinstance(mic, (Microphone, MicrophoneDevice)):
+            mic = DeviceManager.getDevice(_requestedMic)
+            # if not known by name, try index
+            if mic is None:
+                mic = DeviceManager.getDeviceBy(
+                    "index", _requestedMic, deviceClass="microphone")
+            # if not known by name or index, raise error
+            if mic is None:
+                raise SystemError(f"Could not find microphone {_requestedMic}")
 
         # current camera frame since the start of recording
         self._player = None  # media player instance
@@ -1753,6 +2282,21 @@ class Camera:
         # keep track of the last video file saved
         self._lastVideoFile = None
 
+        # settings for encoding frames while recording
+        if queuePolicy not in ('block', 'drop'):
+            raise ValueError(
+                "Invalid value for `queuePolicy`, expected 'block' or 'drop'.")
+        self._liveEncode = bool(liveEncode)
+        self._encoderLib = encoderLib
+        self._encoderOpts = encoderOpts
+        self._maxQueueSize = maxQueueSize
+        self._queuePolicy = queuePolicy
+        self._liveVideoFile = None  # file written to while recording
+        self._liveFrameCount = 0  # frames passed to the writer
+        self._framesDropped = 0
+        self._ptsOrigin = None  # timestamp of the first frame recorded
+        self._lastPts = -1.0
+
     def authorize(self):
         """Get permission to access the camera. Not implemented locally yet.
         """
@@ -1891,6 +2435,8 @@ class Camera:
                 Camera._getCamerasCache['ffpyplayer'] = \
                     CameraInterfaceFFmpeg.getCameras()
             return Camera._getCamerasCache['ffpyplayer']
+        elif cameraLib == 'virtual':
+            return CameraInterfaceVirtual.getCameras()
         else:
             raise ValueError("Invalid value for parameter `cameraLib`")
 
@@ -2009,11 +2555,35 @@ class Camera:
         if not self._isRecording:
             return 0
 
-        totalFramesBuffered = (
-            len(self._captureFrames) + self._captureThread.framesWaiting)
+        if self._movieWriter is not None:  # frames are not kept in memory
+            nFrames = self._liveFrameCount
+        else:
+            nFrames = len(self._captureFrames)
+
+        totalFramesBuffered = nFrames + self._captureThread.framesWaiting
         
         return totalFramesBuffered
 
+    @property
+    def liveEncode(self):
+        """`True` if frames are encoded to disk while recording (`bool`).
+        """
+        return self._liveEncode
+
+    @property
+    def framesDropped(self):
+        """Number of frames discarded in the present or last recording because
+        the encoder queue was full (`int`). 
+        
+        This is only ever non-zero if `liveEncode=True` and 
+        `queuePolicy='drop'`.
+
+        """
+        if self._movieWriter is not None:
+            return self._movieWriter.framesDropped
+
+        return self._framesDropped
+
     @property
     def streamTime(self):
         """Current stream time in seconds (`float`). This time increases
@@ -2088,14 +2658,128 @@ class Camera:
         if not newFrames:
             return False
         
-        # add frames the the buffer
-        self._captureFrames.extend(newFrames)
+        if self._movieWriter is not None:
+            # pass frames straight to the encoder, these are not kept
+            for frame in newFrames:
+                self._writeFrame(frame)
+        else:
+            # add frames the the buffer
+            self._captureFrames.extend(newFrames)
         
         # set the last frame in the buffer as the most recent
-        self._lastFrame = self._captureFrames[-1]
+        self._lastFrame = newFrames[-1]
 
         return True
 
+    def _writeFrame(self, frame):
+        """Pass a frame to the movie writer when encoding while recording.
+
+        The presentation timestamp of the frame is taken from the time the
+        camera reported for it, relative to the first frame of the recording.
+        Frames from a later recording written to the same file follow on one
+        frame interval after the last frame of the previous one. If the camera
+        library does not provide a timestamp later than that of the previous 
+        frame, the frame is placed one frame interval after it instead so 
+        timestamps always increase.
+
+        Parameters
+        ----------
+        frame : MovieFrame
+            Frame to write.
+
+        """
+        if self._lastPts < 0.0:  # first frame written to the file
+            pts = 0.0
+        else:
+            pts = self._lastPts + 1.0 / self._cameraInfo.frameRate
+
+        if frame.absTime is not None:
+            if self._ptsOrigin is None:  # first frame of this recording
+                self._ptsOrigin = frame.absTime - pts
+            framePts = frame.absTime - self._ptsOrigin
+            if framePts > self._lastPts:
+                pts = framePts
+
+        self._lastPts = pts
+        self._movieWriter.addFrame(frame.colorData, pts=pts)
+        self._liveFrameCount += 1
+
+    def _getEncoderLib(self):
+        """Get the encoder library to use if none is specified (`str`).
+
+        This is the `encoderLib` given when creating the camera, otherwise the
+        library used to open the camera stream. The virtual camera has no 
+        encoder of its own so `'ffpyplayer'` is used.
+
+        """
+        if self._encoderLib is not None:
+            return self._encoderLib
+
+        if self._cameraLib in ('ffpyplayer', 'opencv'):
+            return self._cameraLib
+
+        return 'ffpyplayer'
+
+    def _openLiveWriter(self):
+        """Open a movie writer to encode frames to a temporary file while
+        recording. The writer is kept open across recordings until `save()`
+        closes it and moves the file to its final location.
+        """
+        tempPrefix = (uuid.uuid4().hex)[:16]   # 16 char prefix
+        self._liveVideoFile = os.path.join(
+            tempfile.gettempdir(), "{}_video.mp4".format(tempPrefix))
+
+        maxQueueSize = self._maxQueueSize
+        if maxQueueSize is None:  # one second of frames
+            maxQueueSize = int(math.ceil(self._cameraInfo.frameRate))
+
+        encoderLib = self._getEncoderLib()
+        logging.debug(
+            "Encoding video to file while recording: {}".format(
+                self._liveVideoFile))
+        self._movieWriter = movietools.MovieFileWriter(
+            filename=self._liveVideoFile,
+            size=self._cameraInfo.frameSize,  # match camera params
+            fps=self._cameraInfo.frameRate,
+            codec=None,  # mp4
+            pixelFormat='rgb24',
+            encoderLib=encoderLib,
+            encoderOpts=self._encoderOpts,
+            maxQueueSize=maxQueueSize,
+            queuePolicy=self._queuePolicy)
+        self._movieWriter.open()  # blocks main thread until opened and ready
+
+        self._liveFrameCount = 0
+        self._framesDropped = 0
+        self._lastPts = -1.0
+
+    def _closeLiveWriter(self):
+        """Close the movie writer used while recording, waiting for any queued
+        frames to be written.
+        """
+        if self._movieWriter is None:
+            return
+
+        self._movieWriter.close()
+        self._framesDropped = self._movieWriter.framesDropped
+        if self._framesDropped:
+            logging.warning(
+                "Dropped {} frame(s) while encoding video, the encoder could "
+                "not keep up.".format(self._framesDropped))
+        self._movieWriter = None
+
+    def _discardLiveVideoFile(self):
+        """Remove a video file encoded while recording which was not saved.
+        """
+        if self._liveVideoFile is None:
+            return
+
+        if os.path.exists(self._liveVideoFile):
+            logging.debug(
+                "Removing unsaved video file: {}".format(self._liveVideoFile))
+            os.remove(self._liveVideoFile)
+        self._liveVideoFile = None
+
     def open(self):
         """Open the camera stream and begin decoding frames (if available).
 
@@ -2124,10 +2808,16 @@ class Camera:
             self._captureThread = CameraInterfaceOpenCV(
                 device=self._cameraInfo, 
                 mic=self._mic)
+        elif self._cameraLib == u'virtual':
+            logging.debug(
+                "Opening virtual camera stream. (device={})".format(desc))
+            self._captureThread = CameraInterfaceVirtual(
+                device=self._cameraInfo, 
+                mic=self._mic)
         else:
             raise ValueError(
                 "Invalid value for parameter `cameraLib`, expected one of "
-                "`'ffpyplayer'` or `'opencv'`.")
+                "`'ffpyplayer'`, `'opencv'` or `'virtual'`.")
         
         self._captureThread.open()
 
@@ -2149,10 +2839,10 @@ class Camera:
         automatically. This is not recommended as it may incur a longer than
         expected delay in the recording start time.
 
-        Warnings
-        --------
-        If a recording has been previously made without calling `save()` it will
-        be discarded if `record()` is called again.
+        Frames from each recording are kept until `save()` is called, so 
+        calling `record()` again before `save()` adds to the previous recording 
+        rather than replacing it. This is the case whether or not the camera 
+        encodes frames while recording (`liveEncode`).
 
         """
         if self.isNotStarted:
@@ -2166,6 +2856,12 @@ class Camera:
         self._audioTrack = None
         self._lastFrame = None
 
+        # open the movie writer first so frames can be passed to it right away,
+        # if one is open already this recording is added to the same file
+        if self._liveEncode and self._movieWriter is None:
+            self._openLiveWriter()
+        self._ptsOrigin = None
+
         # start recording audio if available
         if self._mic is not None:
             logging.debug(
@@ -2225,12 +2921,15 @@ class Camera:
              encoderLib=None, encoderOpts=None):
         """Save the last recording to file.
 
-        This will write frames to `filename` acquired since the last call of 
-        `record()` and subsequent `stop()`. If `record()` is called again before 
-        `save()`, the previous recording will be deleted and lost.
+        This will write frames to `filename` acquired by all calls of `record()`
+        and subsequent `stop()` since the last `save()`.
 
         This is a slow operation and will block for some time depending on the 
         length of the video. This can be sped up by setting `useThreads=True`.
+        If the camera was created with `liveEncode=True`, the video was already 
+        encoded while recording and this only moves it to `filename` (merging 
+        the audio track if needed), so `encoderLib` and `encoderOpts` are 
+        ignored.
 
         Parameters
         ----------
@@ -2248,12 +2947,14 @@ class Camera:
             audio track will be saved to a separate file. Default is `True`.
         encoderLib : str or None
             Encoder library to use for saving the video. This can be either
-            `'ffpyplayer'` or `'opencv'`. If `None`, the same library that was
+            `'ffpyplayer'` or `'opencv'`. If `None`, the library given when 
+            creating the camera is used, otherwise the same library that was
             used to open the camera stream. Default is `None`.
-        encoderOpts : dict
+        encoderOpts : dict or None
             Options to pass to the encoder. This is a dictionary of options
             specific to the encoder library being used. See the documentation
             for `~psychopy.tools.movietools.MovieFileWriter` for more details.
+            If `None`, the options given when creating the camera are used.
 
         """
         if self._isRecording:
@@ -2269,7 +2970,9 @@ class Camera:
 
         # determine if the `encoderLib` to use
         if encoderLib is None:
-            encoderLib = self._cameraLib
+            encoderLib = self._getEncoderLib()
+        if encoderOpts is None:
+            encoderOpts = self._encoderOpts
             
         logging.debug(
             "Using encoder library '{}' to save video.".format(encoderLib))
@@ -2301,29 +3004,41 @@ class Camera:
         if audioFileName is not None:
             audioFileName = os.path.abspath(audioFileName)
 
-        # flush outstanding frames from the camera queue
-        self._enqueueFrame()
-
-        # contain video and not audio
-        logging.debug("Saving video to file: {}".format(videoFileName))
-        self._movieWriter = movietools.MovieFileWriter(
-            filename=videoFileName,
-            size=self._cameraInfo.frameSize,  # match camera params
-            fps=self._cameraInfo.frameRate,
-            codec=None,  # mp4
-            pixelFormat='rgb24',
-            encoderLib=encoderLib,
-            encoderOpts=encoderOpts)
-        self._movieWriter.open()  # blocks main thread until opened and ready
-
-        # flush remaining frames to the writer thread, this is really fast since
-        # frames are not copied and don't require much conversion
-        for frame in self._captureFrames:
-            self._movieWriter.addFrame(frame.colorData)
-        
-        # push all frames to the queue for the movie recorder
-        self._movieWriter.close()  # thread-safe call
-        self._movieWriter = None
+        if self._liveVideoFile is not None:
+            # frames were encoded while recording, finish writing them, then the 
+            # file only needs moving unless it is merged with the audio track
+            self._closeLiveWriter()
+            if hasAudio and mergeAudio:
+                videoFileName = self._liveVideoFile
+            else:
+                logging.debug("Moving video to file: {}".format(videoFileName))
+                shutil.move(self._liveVideoFile, videoFileName)
+            self._liveVideoFile = None
+        else:
+            # flush outstanding frames from the camera queue
+            self._enqueueFrame()
+
+            # contain video and not audio
+            logging.debug("Saving video to file: {}".format(videoFileName))
+            self._movieWriter = movietools.MovieFileWriter(
+                filename=videoFileName,
+                size=self._cameraInfo.frameSize,  # match camera params
+                fps=self._cameraInfo.frameRate,
+                codec=None,  # mp4
+                pixelFormat='rgb24',
+                encoderLib=encoderLib,
+                encoderOpts=encoderOpts)
+            # blocks main thread until opened and ready
+            self._movieWriter.open()  
+
+            # flush remaining frames to the writer thread, this is really fast 
+            # since frames are not copied and don't require much conversion
+            for frame in self._captureFrames:
+                self._movieWriter.addFrame(frame.colorData)
+            
+            # push all frames to the queue for the movie recorder
+            self._movieWriter.close()  # thread-safe call
+            self._movieWriter = None
 
         # save audio track if available
         if hasAudio:
@@ -2420,6 +3135,14 @@ class Camera:
                 except AttributeError:
                     pass
 
+        # remove a video encoded while recording which was never saved
+        if getattr(self, '_liveVideoFile', None) is not None:
+            try:
+                self._closeLiveWriter()
+                self._discardLiveVideoFile()
+            except (AttributeError, OSError):
+                pass
+
         # close the microphone during teardown too
         if hasattr(self, '_mic'):
             if self._mic is not None:
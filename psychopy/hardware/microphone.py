@@ -310,7 +310,7 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
             - "ignore": When full, just don't record any new samples
             - "warn"/"warning": Same as ignore, but will log a warning
             - "error": When full, will raise an error
-            - "roll"/"rolling": When full, clears the start of the buffer to make room for new samples
+            - "roll"/"rolling": When full, the oldest samples are overwritten by new samples
         """
         return self._recording._policyWhenFull
     
@@ -982,7 +982,7 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         self.poll()
         # get last 0.1sas a clip
         clip = self._recording.getSegment(
-            max(self._recording.lastSample / self._sampleRateHz - timeframe, 0)
+            max(self._recording.samplesRecorded / self._sampleRateHz - timeframe, 0)
         )
         # get average volume
         rms = clip.rms() * 10
@@ -1087,8 +1087,10 @@ class RecordingBuffer:
         What to do when the recording buffer is full and cannot accept any more
         samples. If 'ignore', samples will be silently dropped and the `isFull`
         property will be set to `True`. If 'warn', a warning will be logged and
-        the `isFull` flag will be set. Finally, if 'error' the application will
-        raise an exception.
+        the `isFull` flag will be set. If 'error' the application will raise an
+        exception. Finally, if 'roll' (or 'rolling') the buffer is used as a
+        ring buffer where the oldest samples are overwritten by new ones, so
+        the last `bufferSecs` seconds of the recording are always available.
 
     """
     def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
@@ -1101,6 +1103,7 @@ class RecordingBuffer:
         self._lastSample = 0  # offset of the last sample from stream
         self._spaceRemaining = None  # set in `_allocRecBuffer`
         self._totalSamples = None  # set in `_allocRecBuffer`
+        self._samplesRecorded = 0  # samples written since the recording began
 
         self._policyWhenFull = policyWhenFull
         self._warnedRecBufferFull = False
@@ -1122,6 +1125,8 @@ class RecordingBuffer:
         assert self._samples.nbytes == nBytes
         self._totalSamples = len(self._samples)
         self._spaceRemaining = self._totalSamples
+        self._offset = self._lastSample = self._samplesRecorded = 0
+        self._loops = 0
 
     @property
     def samples(self):
@@ -1171,14 +1176,24 @@ class RecordingBuffer:
     def lastSample(self):
         """Index of the last sample recorded (`int`). This can be used to slice
         the recording buffer, only getting data from the beginning to place
-        where the last sample was written to.
+        where the last sample was written to. If the buffer is rolling, this is
+        the number of samples in the buffer, use `getSamples()` to get them in
+        order.
         """
         return self._lastSample
 
+    @property
+    def samplesRecorded(self):
+        """Number of samples written since the recording started (`int`). Keeps
+        counting when a rolling buffer wraps around, so `samplesRecorded /
+        sampleRateHz` is the time of the last sample in the recording.
+        """
+        return self._samplesRecorded
+
     @property
     def loopCount(self):
-        """Number of times the recording buffer restarted (`int`). Only valid if
-        `loopback` is ``True``."""
+        """Number of times the recording buffer wrapped around (`int`). Only
+        non-zero if the buffer is rolling."""
         return self._loops
 
     @property
@@ -1210,6 +1225,14 @@ class RecordingBuffer:
         self._maxRecordingSize = value
         self._allocRecBuffer()
 
+    @property
+    def isRolling(self):
+        """`True` if the buffer is used as a ring buffer, overwriting the
+        oldest samples when full (`bool`). This is the case when
+        `policyWhenFull` is 'roll' or 'rolling'.
+        """
+        return self._policyWhenFull in ('rolling', 'roll')
+
     def seek(self, offset, absolute=False):
         """Set the write offset.
 
@@ -1229,10 +1252,54 @@ class RecordingBuffer:
         if not absolute:
             self._offset += offset
         else:
-            self._offset = absolute
+            self._offset = offset
 
         assert 0 <= self._offset < self._totalSamples
         self._spaceRemaining = self._totalSamples - self._offset
+        # samples before the offset count as recorded, none have been lost
+        self._samplesRecorded = self._lastSample = self._offset
+        self._loops = 0
+        self._warnedRecBufferFull = False
+
+    def _writeRolling(self, samples):
+        """Write samples to the buffer, wrapping around to overwrite the oldest
+        samples once the end of the buffer is reached. Called by `write()` if
+        the buffer is rolling, never overflows.
+        """
+        nSamples = len(samples)
+        if not nSamples:
+            return 0
+
+        # anything older than the last `totalSamples` would be overwritten
+        # within this write anyway
+        if nSamples > self._totalSamples:
+            samples = samples[-self._totalSamples:]
+        nWrite = len(samples)
+
+        writeStart = (self._samplesRecorded + nSamples - nWrite) % \
+            self._totalSamples
+        nFirst = min(nWrite, self._totalSamples - writeStart)
+        self._samples[writeStart:writeStart + nFirst, :] = samples[:nFirst]
+        if nFirst < nWrite:  # wrap around to the start of the buffer
+            self._samples[:nWrite - nFirst, :] = samples[nFirst:]
+
+        self._samplesRecorded += nSamples
+        self._offset = self._samplesRecorded % self._totalSamples
+        self._lastSample = min(self._samplesRecorded, self._totalSamples)
+        self._spaceRemaining = max(
+            self._totalSamples - self._samplesRecorded, 0)
+        self._loops = self._samplesRecorded // self._totalSamples
+
+        if self._loops and not self._warnedRecBufferFull:
+            logging.warning(
+                f"Microphone buffer reached, as policy when full is "
+                f"'roll'/'rolling' the oldest samples will be overwritten by "
+                f"new samples. Only the last {round(self.bufferSecs, 6)} "
+                f"seconds of the recording are kept.")
+            logging.flush()
+            self._warnedRecBufferFull = True
+
+        return 0
 
     def write(self, samples):
         """Write samples to the recording buffer.
@@ -1248,8 +1315,12 @@ class RecordingBuffer:
         int
             Number of samples overflowed. If this is zero then all samples have
             been recorded, if not, the number of samples rejected is given.
+            Always zero if the buffer is rolling.
 
         """
+        if self.isRolling:
+            return self._writeRolling(samples)
+
         nSamples = len(samples)
         if self.isFull:
             if self._policyWhenFull in ('warn', 'warning'):
@@ -1267,23 +1338,6 @@ class RecordingBuffer:
                 # if policy is error, we fully error
                 raise AudioRecordingBufferFullError(
                     "Cannot write samples, recording buffer is full.")
-            elif self._policyWhenFull == ('rolling', 'roll'):
-                # if policy is rolling, we clear the first half of the buffer
-                toSave = self._totalSamples - len(samples)
-                # get last 0.1s so we still have enough for volume measurement
-                savedSamples = self._recording._samples[-toSave:, :]
-                # log
-                if not self._warnedRecBufferFull:
-                    logging.warning(
-                        f"Microphone buffer reached, as policy when full is 'roll'/'rolling' the "
-                        f"oldest samples will be cleared to make room for new samples."
-                    )
-                    logging.flush()
-                self._warnedRecBufferFull = True
-                # clear samples
-                self._recording.clear()
-                # reassign saved samples
-                self._recording.write(savedSamples)
             else:
                 # if policy is to ignore, we simply don't write new samples
                 return nSamples
@@ -1298,28 +1352,63 @@ class RecordingBuffer:
             self._lastSample = self._offset + self._spaceRemaining
             audioData = samples[:self._spaceRemaining, :]
 
+        nWritten = self._lastSample - self._offset
         self._samples[self._offset:self._lastSample, :] = audioData
-        self._offset += nSamples
-
-        self._spaceRemaining -= nSamples
+        self._samplesRecorded += nWritten
+        self._offset = self._lastSample
 
-        # Check if the recording buffer is now full. Next call to `poll` will
-        # not record anything.
-        if self._spaceRemaining <= 0:
-            self._spaceRemaining = 0
+        # If the recording buffer is now full, the next call to `poll` will not
+        # record anything.
+        self._spaceRemaining -= nWritten
 
-        d = nSamples - self._spaceRemaining
-        return 0 if d < 0 else d
+        return nSamples - nWritten
 
     def clear(self):
-        # reset all live attributes
-        self._samples = None
-        self._offset = 0
-        self._lastSample = 0
-        self._spaceRemaining = None
-        self._totalSamples = None
-        # reallocate buffer
-        self._allocRecBuffer()
+        """Discard all samples in the buffer. The buffer is not reallocated,
+        samples are overwritten by the next recording.
+        """
+        self.seek(0, absolute=True)
+
+    def getSamples(self, start=0, end=None):
+        """Get samples recorded between two times.
+
+        Times are relative to the start of the recording, which is counted
+        through wrap-arounds if the buffer is rolling. Only the last
+        `totalSamples` samples are kept, so `start` is clipped to the oldest
+        sample still in the buffer.
+
+        Parameters
+        ----------
+        start : float or int
+            Absolute time in seconds for the start of the segment.
+        end : float or int
+            Absolute time in seconds for the end of the segment. If `None` the
+            time at the last sample is used.
+
+        Returns
+        -------
+        ndarray
+            Samples between `start` and `end`. If they are stored contiguously
+            this is a view of the buffer which is only valid until they are
+            overwritten, otherwise it is a copy with the samples either side of
+            the wrap-around joined together.
+
+        """
+        oldest = max(self._samplesRecorded - self._totalSamples, 0)
+        idxStart = max(int(start * self._sampleRateHz), oldest)
+        idxEnd = self._samplesRecorded if end is None else min(
+            int(end * self._sampleRateHz), self._samplesRecorded)
+        idxEnd = max(idxEnd, idxStart)
+
+        # map the sample counter to positions in the buffer
+        bufStart = idxStart % self._totalSamples
+        bufEnd = bufStart + (idxEnd - idxStart)
+        if bufEnd <= self._totalSamples:
+            return self._samples[bufStart:bufEnd, :]
+
+        return np.concatenate(
+            (self._samples[bufStart:, :],
+             self._samples[:bufEnd - self._totalSamples, :]))
 
     def getSegment(self, start=0, end=None):
         """Get a segment of recording data as an `AudioClip`.
@@ -1338,16 +1427,13 @@ class RecordingBuffer:
             Audio clip object with samples between `start` and `end`.
 
         """
-        idxStart = int(start * self._sampleRateHz)
-        idxEnd = self._lastSample if end is None else int(
-            end * self._sampleRateHz)
-        
         if not len(self._samples):
             raise AudioStreamError(
                 "Could not access recording as microphone has sent no samples."
             )
 
-        return AudioClip(
-            np.array(self._samples[idxStart:idxEnd, :],
-                     dtype=np.float32, order='C'),
-            sampleRateHz=self._sampleRateHz)
\ No newline at end of file
+        samples = self.getSamples(start, end)
+        if samples.base is self._samples:  # don't hand out a view
+            samples = samples.copy()
+
+        return AudioClip(samples, sampleRateHz=self._sampleRateHz)
\ No newline at end of file
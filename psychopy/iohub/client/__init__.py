@@ -11,8 +11,10 @@ import subprocess
 import json
 import signal
 from weakref import proxy
+from collections import namedtuple
 
 import psutil
+import numpy as np
 
 try:
     import psychopy.logging as psycho_logging
@@ -23,10 +25,11 @@ from .. import IOHUB_DIRECTORY
 from ..util import yload, yLoader
 from ..errors import print2err, ioHubError, printExceptionDetailsToStdErr
 from ..util import isIterable, updateDict, win32MessagePump
-from ..devices import DeviceEvent, import_device
+from ..devices import DeviceEvent, import_device, eventArraysByType
 from ..devices.computer import Computer
 from ..devices.experiment import MessageEvent, LogEvent
 from ..constants import DeviceConstants, EventConstants
+from .. import sharedmem
 from psychopy import constants
 
 getTime = Computer.getTime
@@ -42,6 +45,15 @@ def windowInfoDict(win):
                                   distance=win.monitor.getDistance())
     return windict
 
+def _logEventArray(logEvents):
+    """Log the events in a NumPy array of LogEvents with psychopy.logging,
+    as is done for LogEvents in list form.
+    """
+    for text, level, ltime in zip(logEvents['text'].tolist(),
+                                  logEvents['log_level'].tolist(),
+                                  logEvents['time'].tolist()):
+        psycho_logging.log(text.decode('utf-8', 'replace'), level, ltime)
+
 def getFullClassName(klass):
     module = klass.__module__
     if module == 'builtins':
@@ -68,10 +80,19 @@ class DeviceRPC():
         return a
 
     def __call__(self, *args, **kwargs):
+        asType = 'namedtuple'
+        if 'asType' in kwargs:
+            asType = kwargs['asType']
+        elif 'as_type' in kwargs:
+            asType = kwargs['as_type']
+        # numpy event arrays are sent as raw bytes, which must not be
+        # decoded as str.
+        convert = not (self.method_name == 'getEvents' and asType == 'numpy')
+
         # Send the device method call request to the ioHub Server and wait
         # for the method return value sent back from the ioHub Server.
         r = self.sendToHub(('EXP_DEVICE', 'DEV_RPC', self.device_class,
-                            self.method_name, args, kwargs))
+                            self.method_name, args, kwargs), convert=convert)
         
         if r is None:
             # print("r is None:",('EXP_DEVICE', 'DEV_RPC', self.device_class,
@@ -88,11 +109,13 @@ class DeviceRPC():
         # The result of a call to an iohub Device getEvents() method
         # gets some special handling, converting the returned events
         # into the desired object type, etc...
-        asType = 'namedtuple'
-        if 'asType' in kwargs:
-            asType = kwargs['asType']
-        elif 'as_type' in kwargs:
-            asType = kwargs['as_type']
+        if asType == 'numpy':
+            r = ioHubConnection.eventArraysFromBytes(r)
+            if self.device_class == 'Experiment':
+                logEvents = r.pop(LogEvent.EVENT_TYPE_ID, None)
+                if logEvents is not None and psycho_logging:
+                    _logEventArray(logEvents)
+            return r
 
         conversionMethod = self._returnarg
         if asType == 'dict':
@@ -141,6 +164,11 @@ class ioHubDeviceView():
         self.name = device_config.get('name', device_class_name.lower())
         self.device_class = device_class_name
         self.device_class_path=device_class_path
+        # Shared memory event ring, when the ioHub Server has been started
+        # with shared_memory_events. Events read from it that have not been
+        # returned yet are kept in _ring_records.
+        self._event_ring = None
+        self._ring_records = None
 
         rpc_request = ('EXP_DEVICE', 'GET_DEV_INTERFACE', device_class_name)
         r = self.hubClient._sendToHubServer(rpc_request)
@@ -148,10 +176,103 @@ class ioHubDeviceView():
 
     def __getattr__(self, name):
         if name in self._methods:
+            if self._event_ring is not None:
+                if name == 'getEvents':
+                    return self._getRingEvents
+                if name == 'clearEvents':
+                    return self._clearRingEvents
             r = DeviceRPC(self.hubClient._sendToHubServer, self.device_class, name)
             return r
         raise AttributeError(self, name)
 
+    def _attachEventRing(self, shm_name):
+        self._event_ring = sharedmem.EventRing(shm_name)
+        self._ring_records = self._event_ring.read()
+
+    def _closeEventRing(self):
+        if self._event_ring is not None:
+            self._event_ring.close()
+            self._event_ring = None
+            self._ring_records = None
+
+    def _readEventRing(self):
+        records = self._event_ring.read()
+        if len(records):
+            if len(self._ring_records):
+                records = np.concatenate((self._ring_records, records))
+            self._ring_records = records
+        return self._ring_records
+
+    def _selectRingRecords(self, event_type=None, filter_id=None):
+        records = self._readEventRing()
+        fields = sharedmem.recordFields(records)
+        selected = np.ones(len(records), dtype=bool)
+        if event_type:
+            selected &= fields['type'] == event_type
+        if filter_id:
+            selected &= fields['filter_id'] == filter_id
+        return records, fields, selected
+
+    def _getRingEvents(self, *args, **kwargs):
+        """
+        Device getEvents(), reading events from the device's shared memory
+        event ring instead of sending a request to the ioHub Server. Takes
+        the same arguments as Device.getEvents(), as well as as_type='numpy'.
+        """
+        event_type = args[0] if args else None
+        if event_type is None:
+            event_type = kwargs.get('event_type_id', kwargs.get('event_type'))
+        clear_events = args[1] if len(args) > 1 else True
+        clear_events = kwargs.get('clearEvents', clear_events)
+        as_type = kwargs.get('asType', kwargs.get('as_type', 'namedtuple'))
+
+        records, fields, selected = self._selectRingRecords(
+            event_type, kwargs.get('filter_id'))
+        if clear_events:
+            self._ring_records = records[~selected]
+        records = records[selected]
+        # events from device filters can arrive out of order
+        records = records[np.argsort(fields['time'][selected],
+                                        kind='stable')]
+
+        if as_type == 'numpy':
+            events = sharedmem.recordsToArrays(records)
+            if self.device_class == 'Experiment':
+                logEvents = events.pop(LogEvent.EVENT_TYPE_ID, None)
+                if logEvents is not None and psycho_logging:
+                    _logEventArray(logEvents)
+            return events
+
+        events = sharedmem.recordsToLists(records)
+        if self.device_class == 'Experiment':
+            EVT_TYPE_IX = DeviceEvent.EVENT_TYPE_ID_INDEX
+            LOG_EVT = LogEvent.EVENT_TYPE_ID
+            for l in [el for el in events if el[EVT_TYPE_IX] == LOG_EVT]:
+                events.remove(l)
+                if psycho_logging:
+                    psycho_logging.log(l[DeviceRPC._log_text_index],
+                                       l[DeviceRPC._log_level_index],
+                                       l[DeviceRPC._log_time_index])
+        if as_type == 'dict':
+            return [ioHubConnection.eventListToDict(el) for el in events]
+        elif as_type == 'object':
+            return [ioHubConnection.eventListToObject(el) for el in events]
+        elif as_type == 'namedtuple':
+            return [ioHubConnection.eventListToNamedTuple(el) for el in events]
+        return events
+
+    def _clearRingEvents(self, *args, **kwargs):
+        """
+        Device clearEvents(), also clearing events in the device's shared
+        memory event ring.
+        """
+        event_type = args[0] if args else kwargs.get('event_type')
+        filter_id = args[1] if len(args) > 1 else kwargs.get('filter_id')
+        records, _, selected = self._selectRingRecords(event_type, filter_id)
+        self._ring_records = records[~selected]
+        return DeviceRPC(self.hubClient._sendToHubServer, self.device_class,
+                         'clearEvents')(*args, **kwargs)
+
     def getName(self):
         """
         Gets the name given to the device in the ioHub configuration file.
@@ -227,6 +348,70 @@ class ioHubDevices():
     def getNames(self):
         return self._devicesByName.keys()
 
+class ioHubEventSubscription():
+    """
+    A subscription to some of the events monitored by the ioHub Server,
+    created by ioHubConnection.subscribeEvents(). The server keeps a queue of
+    the subscribed events for each subscription, so only those events (and
+    only the subscribed fields of them) are sent to the experiment process.
+    """
+
+    def __init__(self, hubClient, sub_id, fields=None):
+        self.hubClient = hubClient
+        self.sub_id = sub_id
+        self.fields = list(fields) if fields else None
+        #: Total number of events dropped by the server because the
+        #: subscription queue was full.
+        self.dropped = 0
+        self._event_tuple_class = None
+        if self.fields:
+            self._event_tuple_class = namedtuple('SubscribedEvent',
+                                                 self.fields)
+
+    def _rpc(self, name):
+        r = self.hubClient._sendToHubServer(('RPC', name, [self.sub_id, ]))
+        return r[2]
+
+    def getEvents(self, as_type='namedtuple'):
+        """Retrieve the subscribed events received by the ioHub Server since
+        the last call to getEvents() or clearEvents(), ordered by hub time.
+
+        Args:
+            as_type (str): Returned event object type, 'namedtuple' (the
+                           default), 'dict', 'list' or 'object'. When the
+                           subscription has fields, 'object' is the same as
+                           'namedtuple', with a field for each subscribed
+                           field.
+
+        Returns:
+            list: event objects; object type controlled by 'as_type'.
+        """
+        events, dropped = self._rpc('getSubscribedEvents')
+        self.dropped += dropped
+        if not events or as_type == 'list':
+            return events
+        if self.fields:
+            if as_type == 'dict':
+                return [dict(zip(self.fields, e)) for e in events]
+            return [self._event_tuple_class(*e) for e in events]
+        if as_type == 'dict':
+            return [ioHubConnection.eventListToDict(e) for e in events]
+        elif as_type == 'object':
+            return [ioHubConnection.eventListToObject(e) for e in events]
+        return [ioHubConnection.eventListToNamedTuple(e) for e in events]
+
+    def clearEvents(self):
+        """Discard any subscribed events that have not been retrieved yet.
+        """
+        self._rpc('clearSubscribedEvents')
+
+    def unsubscribe(self):
+        """Remove the subscription from the ioHub Server. Its events are no
+        longer queued.
+        """
+        return self._rpc('unsubscribeEvents')
+
+
 class ioHubConnection():
     """ioHubConnection is responsible for creating, sending requests to, and
     reading replies from the ioHub Process. This class is also used to
@@ -354,6 +539,12 @@ class ioHubConnection():
             * 'dict': Each event converted to a dict object.
             * 'object': Each event is converted to a DeviceEvent subclass
                         based on the event's type.
+            * 'numpy': Events are returned as a dict of event type id ->
+                       NumPy structured array of all events of that type,
+                       using the NUMPY_DTYPE of the event class. The server
+                       sends each array as a single block of bytes, so this
+                       is the quickest way to get large numbers of events
+                       (eye tracker samples, for example).
 
         Args:
             device_label (str): Name of device to retrieve events for.
@@ -364,7 +555,11 @@ class ioHubConnection():
 
         Returns:
             tuple: List of event objects; object type controlled by 'as_type'.
+                   dict of arrays if as_type is 'numpy'.
         """
+        if as_type == 'numpy':
+            return self._getEventArrays(device_label)
+
         r = None
         if device_label is None:
             events = self._sendToHubServer(('GET_EVENTS',))[1]
@@ -395,6 +590,93 @@ class ioHubConnection():
 
         return []
 
+    def _getEventArrays(self, device_label=None):
+        if device_label is not None:
+            return self.devices.getDevice(device_label).getEvents(
+                as_type='numpy')
+
+        reply = self._sendToHubServer(('GET_EVENTS', 'numpy'), convert=False)
+        arrays = self.eventArraysFromBytes(reply[1] or [])
+        if self.allEvents:
+            # events retrieved while in wait(), not yet returned
+            cached = eventArraysByType(self.allEvents)
+            self.allEvents = []
+            for etype, earray in arrays.items():
+                if etype in cached:
+                    cached[etype] = np.concatenate((cached[etype], earray))
+                else:
+                    cached[etype] = earray
+            arrays = cached
+        return dict(arrays)
+
+    @staticmethod
+    def eventArraysFromBytes(packedArrays):
+        """Convert events received from the ioHub Server with as_type='numpy',
+        a list of [event type id, bytes] pairs, into a dict of event type id ->
+        NumPy structured array. The arrays are read only views of the
+        received bytes.
+        """
+        arrays = dict()
+        for etype, buffer in packedArrays:
+            dtype = EventConstants.getClass(etype).NUMPY_DTYPE
+            arrays[etype] = np.frombuffer(buffer, dtype=dtype)
+        return arrays
+
+    def getStatus(self):
+        """Get the status of the ioHub Server ('RUNNING' once it has
+        started) and how much time it spends on each device.
+
+        Returns:
+            tuple: (status, device_stats), where device_stats is a dict of
+                   device name -> dict of: polls, poll_time and poll_cpu_time
+                   (number of _poll() calls for devices using a device_timer,
+                   and the total time and CPU time they took), wakeups (times
+                   the device was polled because its file descriptor was
+                   readable), events (number of events processed), and
+                   latency_mean, latency_max and latency_total (sec between
+                   each event being received and being processed).
+        """
+        r = self._sendToHubServer(('GET_IOHUB_STATUS', True))
+        return r[1], r[2]
+
+    def subscribeEvents(self, event_types=None, devices=None, fields=None,
+                        max_queue=1024, overflow='drop_oldest'):
+        """Subscribe to some of the events monitored by the ioHub Server. The
+        server queues the subscribed events for the subscription, so only
+        they are sent when the subscription's getEvents() is called,
+        rather than everything in the *Global Event Buffer*. This keeps
+        requests small when, for example, only keyboard events are needed
+        while an eye tracker is recording at 1000 Hz.
+
+        Subscriptions are independent of each other and of the global and
+        device event buffers.
+
+        Args:
+            event_types (list): ioHub event type ids (see EventConstants) to
+                                subscribe to. If None, all event types of
+                                the selected devices.
+            devices (list): Names of the devices to subscribe to events
+                            from. If None, all devices.
+            fields (list): Names of the event attributes to receive. Events
+                           are returned with only these fields (None for
+                           fields the event type does not have). If None,
+                           events have all their attributes.
+            max_queue (int): Maximum number of events queued by the server
+                             between getEvents() calls.
+            overflow (str): What to do with new events when the queue is
+                            full, 'drop_oldest' (the default) or
+                            'drop_newest'.
+
+        Returns:
+            ioHubEventSubscription: used to get the subscribed events.
+        """
+        args = [event_types, devices, fields, max_queue, overflow]
+        r = self._sendToHubServer(('RPC', 'subscribeEvents', args))
+        if not isinstance(r, list) or r[0] != 'RPC_RESULT':
+            raise ioHubError('subscribeEvents failed.', reply=r,
+                             event_types=event_types, devices=devices)
+        return ioHubEventSubscription(self, r[2], fields)
+
     def clearEvents(self, device_label='all'):
         """Clears unread events from the ioHub Server's Event Buffer(s)
         so that unneeded events are not discarded.
@@ -423,6 +705,9 @@ class ioHubConnection():
             if device_label == 'all':
                 self.allEvents = []
                 self._sendToHubServer(('RPC', 'clearEventBuffer', [True, ]))
+                for d in self.devices.getAll():
+                    if getattr(d, '_event_ring', None) is not None:
+                        d._ring_records = d._readEventRing()[:0]
                 try:
                     self.getDevice('keyboard')._clearLocalEvents()
                 except:
@@ -1046,8 +1331,26 @@ class ioHubConnection():
         # >>>> Creating client side iohub device wrappers...
         self._createDeviceList(ioHubConfig['monitor_devices'])
 
+        if ioHubConfig.get('shared_memory_events'):
+            self._attachEventRings()
+
         return 'OK'
 
+    def _attachEventRings(self):
+        """Read device events directly from the shared memory event rings
+        created by the ioHub Server."""
+        rings = self._sendToHubServer(('RPC', 'getSharedEventRings'))[2]
+        for dname, shm_name in rings.items():
+            d = self.devices.getDevice(dname)
+            if d is None:
+                continue
+            try:
+                d._attachEventRing(shm_name)
+            except Exception: # pylint: disable=broad-except
+                print2err('_attachEventRings: Error attaching to event ring '
+                          'of device: ', dname)
+                printExceptionDetailsToStdErr()
+
     def _waitForServerInit(self):
         # >>>> Wait for iohub server ready signal ....
         hubonline = False
@@ -1161,13 +1464,15 @@ class ioHubConnection():
                 r.append(i)
         return r
 
-    def _sendToHubServer(self, tx_data):
+    def _sendToHubServer(self, tx_data, convert=True):
         """General purpose local <-> iohub server process UDP based
         request - reply code. The method blocks until the request is fulfilled
         and and a response is received from the ioHub server.
 
         Args:
             tx_data (tuple): data to send to iohub server
+            convert (bool): decode bytes in the response to str. Set to False
+                            when the response holds raw binary data.
 
         Return (object): response from the ioHub Server process.
         """
@@ -1204,7 +1509,7 @@ class ioHubConnection():
             raise ioHubError(result)
         # Otherwise return the result
         
-        if result is not None:
+        if result is not None and convert:
             # Use recursive conversion funcs                     
             if isinstance(result, list) or  isinstance(result, tuple):
                 result = self._convertList(result)
@@ -1313,6 +1618,9 @@ class ioHubConnection():
                 pass
 
             self._shutdown_attempted = True
+            for d in self.devices.getAll():
+                if getattr(d, '_event_ring', None) is not None:
+                    d._closeEventRing()
             TimeoutError = psutil.TimeoutExpired
             try:
                 if self.udp_client:  # if it isn't already garbage-collected
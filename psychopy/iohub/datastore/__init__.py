@@ -9,6 +9,7 @@ import atexit
 import numpy as np
 from packaging.version import Version
 from ..server import DeviceEvent
+from ..devices import Computer
 from ..constants import EventConstants
 from ..errors import ioHubError, printExceptionDetailsToStdErr, print2err
 
@@ -54,6 +55,7 @@ class DataStoreFile():
             fmode = 'w'
 
         self.settings = iohub_settings
+        self.emrtFile = None
 
         self.active_experiment_id = None
         self.active_session_id = None
@@ -61,6 +63,16 @@ class DataStoreFile():
         self.flushCounter = self.settings.get('flush_interval', 32)
         self._eventCounter = 0
 
+        # events are staged per table and appended in blocks, rather than
+        # one PyTables append per event
+        self.bufferRows = self.settings.get('buffer_rows', 256)
+        self.bufferInterval = self.settings.get('buffer_interval', 0.25)
+        self.bufferOrder = self.settings.get('buffer_order', 'received')
+        if self.bufferOrder not in ('received', 'time'):
+            raise ioHubError("data_store buffer_order must be 'received' or "
+                             "'time', not %r" % (self.bufferOrder,))
+        self._eventBuffers = dict()
+
         self.TABLES = dict()
         self._eventGroupMappings = dict()
         self.emrtFile = open_file(self.filePath, mode=fmode)
@@ -318,6 +330,12 @@ class DataStoreFile():
             event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
             event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
 
+            if self.bufferRows > 0:
+                ebuffer = self._getEventBuffer(eventClass, etable)
+                if ebuffer.add(event):
+                    self.writeEventBuffer(ebuffer)
+                return
+
             np_array = np.array([tuple(event), ], dtype=eventClass.NUMPY_DTYPE)
             etable.append(np_array)
             self.bufferedFlush()
@@ -336,6 +354,15 @@ class DataStoreFile():
             eventClass = EventConstants.getClass(etype)
             etable = self.TABLES[eventClass.IOHUB_DATA_TABLE]
 
+            if self.bufferRows > 0:
+                ebuffer = self._getEventBuffer(eventClass, etable)
+                for event in events:
+                    event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
+                    event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
+                    if ebuffer.add(event):
+                        self.writeEventBuffer(ebuffer)
+                return
+
             np_events = []
             for event in events:
                 event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
@@ -350,6 +377,45 @@ class DataStoreFile():
         except Exception:
             printExceptionDetailsToStdErr()
 
+    def _getEventBuffer(self, eventClass, etable):
+        table_label = eventClass.IOHUB_DATA_TABLE
+        ebuffer = self._eventBuffers.get(table_label)
+        if ebuffer is None:
+            ebuffer = EventTableBuffer(etable, eventClass.NUMPY_DTYPE,
+                                       self.bufferRows, self.bufferInterval)
+            self._eventBuffers[table_label] = ebuffer
+        return ebuffer
+
+    def writeEventBuffer(self, ebuffer):
+        """
+        Append the events staged in an EventTableBuffer to its table,
+        counting them towards the next flush of the file.
+        """
+        count = ebuffer.write(sortByTime=self.bufferOrder == 'time')
+        if count:
+            self.bufferedFlush(count)
+        return count
+
+    def writeEventBuffers(self, force=True):
+        """
+        Append staged events to their tables. If force is False, only the
+        tables whose oldest staged event has been waiting for at least
+        buffer_interval sec. are written. The ioHub Server calls this
+        periodically, so staged events are written even when no new events
+        are arriving.
+        """
+        count = 0
+        try:
+            now = Computer.getTime()
+            for ebuffer in self._eventBuffers.values():
+                if force or ebuffer.isDue(now):
+                    count += self.writeEventBuffer(ebuffer)
+        except tables.ClosedFileError:
+            pass
+        except Exception:
+            printExceptionDetailsToStdErr()
+        return count
+
     def bufferedFlush(self, eventCount=1):
         """
         If flushCounter threshold is >=0 then do some checks. If it is < 0,
@@ -370,6 +436,11 @@ class DataStoreFile():
     def flush(self):
         try:
             if self.emrtFile:
+                # the file is being flushed anyway, so write staged events
+                # directly rather than via bufferedFlush
+                sortByTime = self.bufferOrder == 'time'
+                for ebuffer in self._eventBuffers.values():
+                    ebuffer.write(sortByTime=sortByTime)
                 self.emrtFile.flush()
         except tables.ClosedFileError:
             pass
@@ -388,6 +459,62 @@ class DataStoreFile():
             pass
 
 
+class EventTableBuffer():
+    """
+    Staging area for the rows of one event table. Events are copied into a
+    preallocated NumPy structured array as they arrive, and appended to the
+    table in one block when the buffer is full, when the oldest row has been
+    waiting for maxAge sec., or when the file is flushed.
+
+    Rows only in the buffer are lost if the ioHub Server process dies, so
+    size and maxAge bound how many events a crash can lose.
+    """
+    def __init__(self, table, dtype, size, maxAge):
+        self.table = table
+        self.rows = np.zeros(size, dtype=dtype)
+        self.maxAge = maxAge
+        self.count = 0
+        self.firstTime = None  # when the oldest row in the buffer was added
+
+    def add(self, event):
+        """
+        Stage an event (a list of values in dtype field order). Returns True
+        if the buffer should now be written.
+        """
+        if self.count == 0:
+            self.firstTime = Computer.getTime()
+        self.rows[self.count] = tuple(event)
+        self.count += 1
+        return self.count == len(self.rows) or self.isDue()
+
+    def isDue(self, now=None):
+        """
+        True if the oldest staged row has been waiting for at least maxAge.
+        """
+        if self.count == 0:
+            return False
+        if now is None:
+            now = Computer.getTime()
+        return now - self.firstTime >= self.maxAge
+
+    def write(self, sortByTime=False):
+        """
+        Append the staged rows to the table, optionally ordered by event
+        time rather than the order they were received in. Returns the
+        number of rows written.
+        """
+        count = self.count
+        if count == 0:
+            return 0
+        rows = self.rows[:count]
+        if sortByTime:
+            rows = rows[np.argsort(rows['time'], kind='stable')]
+        self.table.append(rows)
+        self.count = 0
+        self.firstTime = None
+        return count
+
+
 ## -------------------- Utility Functions ------------------------ ##
 
 
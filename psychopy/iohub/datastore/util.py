@@ -538,7 +538,10 @@ class ExperimentDataAccessUtility:
                 return None
 
             result = []
-            where_cls = '(%s == b"%s") & (class_type_id == 1)' % (event_column, event_value)
+            if event_column == 'class_id':
+                where_cls = '(class_id == %d) & (class_type_id == 1)' % (event_value)
+            else:
+                where_cls = '(%s == b"%s") & (class_type_id == 1)' % (event_column, event_value)
             for row in klassTables.where(where_cls):
                 result.append(row.fetch_all_fields())
 
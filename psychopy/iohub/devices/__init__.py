@@ -534,6 +534,20 @@ class Device(ioObject):
     def _addNativeEventToBuffer(self, e):
         if self.isReportingEvents():
             self._native_event_buffer.append(e)
+            if self._iohub_server is not None:
+                self._iohub_server.wakeup()
+
+    def _getWakeupFileno(self):
+        """
+        Devices which read native events from a file descriptor can return
+        it here. When the ioHub Server is event driven, the device's _poll()
+        method is then called when the file descriptor is readable, rather
+        than at the device_timer interval.
+
+        Returns:
+            (int): file descriptor, or None (the default) to always poll.
+        """
+        return None
 
     def _addEventListener(self, event, eventTypeIDs):
         for ei in eventTypeIDs:
@@ -947,6 +961,63 @@ class DeviceEvent(ioObject):
     def createEventAsNamedTuple(cls, valueList):
         return cls.namedTupleClass(*valueList)
 
+    @classmethod
+    def createEventAsRecord(cls, valueList):
+        """Get an event in list form as a tuple which can be stored in a
+        record of the class's NUMPY_DTYPE. NumPy only takes ASCII str values
+        for bytes fields, so str values are encoded as UTF-8, cut to the
+        width of their field.
+        """
+        bytesFields = _bytesFields.get(cls)
+        if bytesFields is None:
+            dtype = np.dtype(cls.NUMPY_DTYPE)
+            bytesFields = _bytesFields[cls] = [
+                (i, dtype[i].itemsize) for i in range(len(dtype.names))
+                if dtype[i].kind == 'S']
+        if not bytesFields:
+            return tuple(valueList)
+        values = list(valueList)
+        for i, width in bytesFields:
+            if isinstance(values[i], str):
+                values[i] = _encodeBytesField(values[i], width)
+        return tuple(values)
+
+    @classmethod
+    def createEventsAsArray(cls, valueLists):
+        return np.array([cls.createEventAsRecord(v) for v in valueLists],
+                        dtype=cls.NUMPY_DTYPE)
+
+
+_bytesFields = {}  # event class -> [(index, width), ...] of its bytes fields
+
+
+def _encodeBytesField(value, width):
+    """Encode a str as UTF-8 for a bytes field of `width` bytes, without
+    leaving part of a character at the end if it has to be cut.
+    """
+    encoded = value.encode('utf-8')
+    if len(encoded) > width:
+        encoded = encoded[:width].decode('utf-8', 'ignore').encode('utf-8')
+    return encoded
+
+
+def eventArraysByType(events):
+    """Convert a list of events, each in list (or namedtuple) form, into one
+    NumPy structured array per event type, using the NUMPY_DTYPE of the
+    event class.
+
+    Returns an OrderedDict of event type id -> array, in the order each type
+    first appears in events. Events of each type keep their order.
+    """
+    from ..constants import EventConstants
+    eventsByType = collections.OrderedDict()
+    etype_index = DeviceEvent.EVENT_TYPE_ID_INDEX
+    for e in events:
+        eventsByType.setdefault(e[etype_index], []).append(e)
+    return collections.OrderedDict(
+        (etype, EventConstants.getClass(etype).createEventsAsArray(elist))
+        for etype, elist in eventsByType.items())
+
 
 #
 # Import Devices and DeviceEvents
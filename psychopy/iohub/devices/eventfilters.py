@@ -189,6 +189,21 @@ class MovingWindowFilter():
         """
         return self._filtering_buffer.mean()
 
+    def filteredValues(self, values):
+        """Returns the filtered value of every complete window in values, the
+        same as filteredValue would give as each value was added, but
+        calculated for all windows at once.
+
+        Sub classes which implement their own filteredValue method should
+        implement this method to match.
+
+        """
+        return self._windows(values).mean(axis=-1)
+
+    def _windows(self, values):
+        return np.lib.stride_tricks.sliding_window_view(
+            values, self._filtering_buffer.max_size)
+
     def add(self, event):
         """Add the given iohub event ( in list form ) to the moving window. The
         value of the specified event attribute when the filter was created is
@@ -200,18 +215,72 @@ class MovingWindowFilter():
 
         """
         if isinstance(event, (list, tuple)):
-            self._filtering_buffer.append(event[self._event_field_index])
-            self._events.append(event)
-            if self.isFull():
-                if self._inplace:
-                    self._events[
-                        self._active_index][
-                        self._event_field_index] = self.filteredValue()
-                return self._events[self._active_index], self.filteredValue()
-        else:
-            self._filtering_buffer.append(event)
+            return self._add(event, event[self._event_field_index])
+        return self._add(None, event)
+
+    def _add(self, event, value):
+        self._filtering_buffer.append(value)
+        if event is None:
             if self.isFull():
                 return None, self.filteredValue()
+            return None
+        self._events.append(event)
+        if self.isFull():
+            if self._inplace:
+                self._events[
+                    self._active_index][
+                    self._event_field_index] = self.filteredValue()
+            return self._events[self._active_index], self.filteredValue()
+
+    def addMany(self, events):
+        """Add a block of iohub events ( in list form ), or of values, to the
+        moving window at once.
+
+        Returns a list of what add would have returned for each event
+        (skipping any None results), and leaves the filter in the same
+        state, but filters the whole block with one NumPy call rather than
+        one per event.
+
+        """
+        if len(events) == 0:
+            return []
+        if isinstance(events[0], (list, tuple)):
+            fi = self._event_field_index
+            values = [event[fi] for event in events]
+        else:
+            values = events
+            events = None
+        return self._addMany(events, values)
+
+    def _addMany(self, events, values):
+        buffer = self._filtering_buffer
+        length = buffer.max_size
+        values = np.asarray(values, dtype=buffer.dtype)
+        # values already in the window which are part of a window ending
+        # with one of the new values
+        nHistory = min(len(buffer), length - 1)
+        values = np.concatenate((buffer.copy()[len(buffer) - nHistory:],
+                                 values))
+        if len(values) >= length:
+            filtered = self.filteredValues(values)
+        else:
+            filtered = []
+        buffer.extend(values[nHistory:])
+
+        if events is None:
+            return [(None, value) for value in filtered]
+
+        windowEvents = list(self._events)[len(self._events) - nHistory:]
+        windowEvents.extend(events)
+        self._events.extend(events)
+        # the event at the knot position of each window
+        windowEvents = windowEvents[self._active_index:]
+        results = list(zip(windowEvents, filtered))
+        if self._inplace:
+            fi = self._event_field_index
+            for event, value in results:
+                event[fi] = value
+        return results
 
     def isFull(self):
         return self._filtering_buffer.isFull()
@@ -238,6 +307,9 @@ class PassThroughFilter(MovingWindowFilter):
     def filteredValue(self):
         return self._filtering_buffer[0]
 
+    def filteredValues(self, values):
+        return values
+
 # ------
 
 
@@ -254,6 +326,9 @@ class MedianFilter(MovingWindowFilter):
     def filteredValue(self):
         return np.median(self._filtering_buffer.getElements())
 
+    def filteredValues(self, values):
+        return np.median(self._windows(values), axis=-1)
+
 # ------
 
 
@@ -279,7 +354,10 @@ class WeightedAverageFilter(MovingWindowFilter):
         return np.convolve(
             self._filtering_buffer.getElements(),
             self._weights,
-            'valid')
+            'valid')[0]
+
+    def filteredValues(self, values):
+        return np.convolve(values, self._weights, 'valid')
 
 
 # ------
@@ -299,7 +377,7 @@ class StampFilter(MovingWindowFilter):
     """
 
     def __init__(self, **kwargs):
-        level = kwargs.get('level')
+        level = kwargs.get('level') or 1
         self._level = level
         kwargs['knot_pos'] = 'center'
         kwargs['length'] = 3
@@ -312,21 +390,39 @@ class StampFilter(MovingWindowFilter):
             self.sub_filter = StampFilter(**kwargs)
 
     def filteredValue(self):
-        if self.sub_filter:
-            return self.sub_filter.filteredValue()
-
         e1, e2, e3 = self._filtering_buffer[0:3]
-        if not(e1 < e2 and e2 < e3) or not (e3 < e2 and e2 < e1):
-            return (e1 + e3) / 2.0
-        return e2
+        if (e1 < e2 and e2 < e3) or (e3 < e2 and e2 < e1):
+            return e2
+        return (e1 + e3) / 2.0
+
+    def filteredValues(self, values):
+        e1, e2, e3 = values[:-2], values[1:-1], values[2:]
+        monotonic = ((e1 < e2) & (e2 < e3)) | ((e3 < e2) & (e2 < e1))
+        return np.where(monotonic, e2, (e1 + e3) / 2.0)
 
     def add(self, event):
+        if self.sub_filter is None:
+            return MovingWindowFilter.add(self, event)
+        # each level filters the values output by the level below it
+        sub_result = self.sub_filter.add(event)
+        if sub_result:
+            return self._add(*sub_result)
+
+    def addMany(self, events):
+        if self.sub_filter is None:
+            return MovingWindowFilter.addMany(self, events)
+        sub_results = self.sub_filter.addMany(events)
+        if not sub_results:
+            return []
+        sub_events, values = zip(*sub_results)
+        if sub_events[0] is None:
+            sub_events = None
+        return self._addMany(sub_events, values)
+
+    def clear(self):
+        MovingWindowFilter.clear(self)
         if self.sub_filter:
-            sub_result = self.sub_filter.add(event)
-            if sub_result:
-                self._filtering_buffer.append(sub_result[1])
-                self._events.append(event)
-        return MovingWindowFilter.add(self, event)
+            self.sub_filter.clear()
 
 # ------
 
@@ -24,6 +24,9 @@ for a sample, the positions are averaged together. If only one of the two eyes
 has valid data, then that eye data is used for the sample. So the only case
 where a sample will be tagged as missing data is when both eyes do not have
 valid eye position / pupil size data.
+* To (re)parse samples which have already been saved to an ioHub DataStore
+file, use EyeSampleBatchParser, which applies the same filters and velocity
+thresholds to all samples at once rather than one sample at a time.
 
 POSITION_FILTER and VELOCITY_FILTER can be set to one of the following event
 field filter types. Example values for any input arguments are given. The filter
@@ -130,6 +133,7 @@ Data is filtered once, similar to what a 'normal' filter level would be in the
   eyelink<tm> system. Level = 2 would be similar to the 'extra' filter level
   setting of eyelink<tm>.
 """
+import warnings
 import numpy as np
 from ....constants import EventConstants
 from ....errors import print2err
@@ -911,3 +915,415 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                                         self.io_event_ix('time')] - existing_start_event[
                                             self.io_event_ix('time')], sample[
                                                 self.io_event_ix('status')]]
+
+
+################### Offline Parsing ##########################
+
+def _filterWindows(eventFilter, values):
+    """Filter every complete window of values with an eventfilters field
+    filter, returning the filtered values and the index of the value the
+    first of them replaces."""
+    start = 0
+    sub_filter = getattr(eventFilter, 'sub_filter', None)
+    if sub_filter is not None:
+        # each level of a Stampe filter filters the output of the one below
+        values, start = _filterWindows(sub_filter, values)
+    if len(values) < eventFilter._filtering_buffer.max_size:
+        return values[:0], start
+    return (np.asarray(eventFilter.filteredValues(values), dtype=np.float64),
+            start + eventFilter._active_index)
+
+
+def filterArray(values, filterSettings=None):
+    """Apply one of the eventfilters field filters to a whole array of
+    values at once.
+
+    The filter is given in the same form as the position_filter and
+    velocity_filter settings of EyeTrackerEventParser, e.g.
+    {'name': 'MedianFilter', 'length': 3, 'knot_pos': 'center'}; length
+    defaults to 3 and knot_pos to 'center'. The values returned are the same
+    as the online parser's filters give when the samples are added one at a
+    time, so values the filter window never reaches are left unfiltered.
+    """
+    if not filterSettings:
+        return values
+    kwargs = dict(filterSettings)
+    name = kwargs.pop('name', 'PassThroughFilter')
+    filterClass = getattr(eventfilters, name, None)
+    if not (isinstance(filterClass, type)
+            and issubclass(filterClass, eventfilters.MovingWindowFilter)):
+        raise ValueError('Unknown eye sample filter: %s' % (name))
+    if filterClass is eventfilters.PassThroughFilter:
+        return values
+    kwargs.setdefault('length', 3)
+    kwargs.setdefault('knot_pos', 'center')
+    values = np.asarray(values, dtype=np.float64)
+    filtered, start = _filterWindows(filterClass(**kwargs), values)
+    values = values.copy()
+    values[start:start + len(filtered)] = filtered
+    return values
+
+
+def adaptiveVelocityThreshold(velocity, blockLength):
+    """Calculate the adaptive velocity threshold used by
+    EyeTrackerEventParser for every sample at once.
+
+    Rather than a moving history of the last `blockLength` velocities, the
+    samples are split into consecutive blocks of `blockLength` samples and
+    each block gets the threshold calculated from its own velocities, with
+    all blocks being iterated together. A final block of less than half
+    `blockLength` samples uses the threshold of the block before it.
+    """
+    n = len(velocity)
+    blockLength = max(int(blockLength), 1)
+    nBlocks = max(-(-n // blockLength), 1)
+    blocks = np.full(nBlocks * blockLength, np.nan)
+    blocks[:n] = velocity
+    blocks = blocks.reshape(nBlocks, blockLength)
+    # as online, only positive velocities count toward the threshold
+    blocks[~(blocks > 0.0)] = np.nan
+
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        thresh = np.nanmin(blocks, axis=1) + np.nanstd(blocks, axis=1) * 3.0
+        active = np.isfinite(thresh)
+        while active.any():
+            below = np.where(blocks < thresh[:, np.newaxis], blocks, np.nan)
+            newThresh = np.nanmean(below, axis=1) + 3.0 * np.nanstd(below, axis=1)
+            newThresh = np.where(active, newThresh, thresh)
+            active &= np.abs(newThresh - thresh) >= 1.0
+            thresh = newThresh
+
+    if nBlocks > 1 and 0 < n % blockLength < blockLength // 2:
+        thresh[-1] = thresh[-2]
+    # blocks with no usable velocities take the threshold of the
+    # nearest block which has one
+    valid = np.flatnonzero(np.isfinite(thresh))
+    if len(valid) == 0:
+        thresh[:] = np.inf
+    elif len(valid) < nBlocks:
+        thresh = np.interp(np.arange(nBlocks), valid, thresh[valid])
+    return np.repeat(thresh, blockLength)[:n]
+
+
+class EyeSampleBatchParser():
+    """Parses fixation, saccade and blink events from a complete set of eye
+    samples, such as those saved to an ioHub DataStore file, using the same
+    heuristics as the online EyeTrackerEventParser.
+
+    Rather than passing one sample at a time through the filters and
+    parser, each step is done over all samples at once with NumPy, so
+    re-parsing a long recording takes seconds rather than as long as
+    replaying it. Filtering gives the same values as online (see
+    filterArray). The differences from online parsing are:
+
+    * Adaptive velocity thresholds are calculated per block of
+      adaptive_vel_thresh_history seconds, rather than from a moving
+      history (see adaptiveVelocityThreshold).
+    * Only complete events are parsed, so any event already in progress at
+      the first sample, or still in progress at the last, is dropped.
+
+    Kwargs are the same as for EyeTrackerEventParser. If display_device is
+    not given, gaze positions are used as they are, rather than being
+    converted to visual angles, so velocities and thresholds are in gaze
+    units per second. sampling_rate is only used to size the velocity
+    threshold blocks, and is estimated from the sample times if not given.
+    """
+    filter_id = 23  # the same as EyeTrackerEventParser
+
+    def __init__(self, **kwargs):
+        self.vel_thresh_history_dur = kwargs.get(
+            'adaptive_vel_thresh_history', 3.0)
+        self.position_filter = kwargs.get('position_filter')
+        self.velocity_filter = kwargs.get('velocity_filter')
+        self.sampling_rate = kwargs.get('sampling_rate')
+        self.pix2deg = None
+        display_device = kwargs.get('display_device')
+        if display_device:
+            mm_size = display_device.get('mm_size')
+            if mm_size:
+                mm_size = mm_size['width'], mm_size['height'],
+            self.pix2deg = VisualAngleCalc(
+                mm_size, display_device.get('pixel_res'),
+                display_device.get('eye_distance')).pix2deg
+
+    @staticmethod
+    def toMonocular(samples):
+        """Get the fields of monocular or binocular eye samples needed for
+        parsing, as a dict of arrays. For binocular samples, the position
+        and pupil size of both eyes are averaged if both are valid, otherwise
+        the valid eye is used (as done online).
+        """
+        fields = samples.dtype.names
+        mono = dict()
+        for field in ('experiment_id', 'session_id', 'device_id', 'event_id',
+                      'device_time', 'logged_time', 'time', 'status'):
+            mono[field] = samples[field]
+        status = samples['status']
+        if 'left_gaze_x' in fields:
+            left = (status == 2)[:, np.newaxis]
+            right = (status == 20)[:, np.newaxis]
+            mono['valid'] = status != 22
+            mono['eye'] = np.full(len(samples), LEFT_EYE, dtype=np.uint8)
+            for field in ('gaze_x', 'gaze_y', 'pupil_measure1'):
+                both = np.column_stack((samples['left_' + field],
+                                        samples['right_' + field]))
+                both = both.astype(np.float64)
+                mono[field] = np.where(
+                    left, both[:, :1], np.where(right, both[:, 1:], both.mean(
+                        axis=1, keepdims=True)))[:, 0]
+            mono['pupil_measure1_type'] = samples['left_pupil_measure1_type']
+        else:
+            mono['valid'] = status == 0
+            mono['eye'] = samples['eye']
+            for field in ('gaze_x', 'gaze_y', 'pupil_measure1'):
+                mono[field] = samples[field].astype(np.float64)
+            mono['pupil_measure1_type'] = samples['pupil_measure1_type']
+        return mono
+
+    def processSamples(self, samples):
+        """Calculate the filtered position, velocity, velocity threshold and
+        sample category (FIX, SAC or MIS) for all samples, which should be
+        from the same session and in time order.
+
+        Returns a dict of arrays, using the same field names as the samples
+        of the online parser (velocity thresholds are in raw_x and raw_y),
+        plus 'category'.
+        """
+        s = self.toMonocular(samples)
+        n = len(s['time'])
+        valid = s['valid']
+        validIx = np.flatnonzero(valid)
+        if len(validIx) == 0:
+            s['category'] = np.full(n, 'MIS', dtype='<U3')
+            return s
+
+        # interpolate over missing data, so that filters and velocity
+        # aren't thrown off by it
+        allIx = np.arange(n)
+        for field in ('gaze_x', 'gaze_y', 'pupil_measure1'):
+            s[field] = np.interp(allIx, validIx, s[field][validIx])
+
+        if self.pix2deg:
+            s['angle_x'], s['angle_y'] = self.pix2deg(s['gaze_x'], s['gaze_y'])
+        else:
+            s['angle_x'], s['angle_y'] = s['gaze_x'], s['gaze_y']
+        s['angle_x'] = filterArray(s['angle_x'], self.position_filter)
+        s['angle_y'] = filterArray(s['angle_y'], self.position_filter)
+
+        dt = np.diff(s['time'])
+        dt[dt <= 0] = np.nan
+        for axis in ('x', 'y'):
+            velocity = np.zeros(n)
+            velocity[1:] = np.abs(np.diff(s['angle_' + axis])) / dt
+            s['velocity_' + axis] = np.nan_to_num(velocity)
+        s['velocity_xy'] = np.hypot(s['velocity_x'], s['velocity_y'])
+        for field in ('velocity_x', 'velocity_y', 'velocity_xy'):
+            s[field] = filterArray(s[field], self.velocity_filter)
+
+        sampling_rate = self.sampling_rate
+        if not sampling_rate:
+            sampling_rate = 1.0 / np.nanmedian(dt) if n > 1 else 1.0
+        blockLength = self.vel_thresh_history_dur * sampling_rate
+        s['raw_x'] = adaptiveVelocityThreshold(
+            np.where(valid, s['velocity_x'], np.nan), blockLength)
+        s['raw_y'] = adaptiveVelocityThreshold(
+            np.where(valid, s['velocity_y'], np.nan), blockLength)
+
+        saccade = (s['velocity_x'] >= s['raw_x']) | (s['velocity_y'] >= s['raw_y'])
+        s['category'] = np.where(
+            valid, np.where(saccade, 'SAC', 'FIX'), 'MIS')
+        return s
+
+    def parseSamples(self, samples):
+        """Parse fixation, saccade and blink events from an array of
+        MonocularEyeSampleEvent or BinocularEyeSampleEvent samples.
+
+        Samples are grouped by session and sorted by time before parsing.
+
+        Returns a dict of event class to a NumPy array of events of that
+        class (using the class NUMPY_DTYPE), sorted by time. The event_id of
+        each event is left as 0.
+        """
+        from ..eye_events import (FixationStartEvent, FixationEndEvent,
+                                  SaccadeStartEvent, SaccadeEndEvent,
+                                  BlinkStartEvent, BlinkEndEvent)
+        eventClasses = (FixationStartEvent, FixationEndEvent,
+                        SaccadeStartEvent, SaccadeEndEvent,
+                        BlinkStartEvent, BlinkEndEvent)
+        parsed = OrderedDict((cls, []) for cls in eventClasses)
+
+        sessions = ((samples['experiment_id'].astype(np.int64) << 32)
+                    | samples['session_id'])
+        sameSession = sessions[1:] == sessions[:-1]
+        # samples are normally saved in order, so only sort if needed
+        if not (np.all(sessions[1:] >= sessions[:-1]) and np.all(
+                np.diff(samples['time'])[sameSession] >= 0)):
+            order = np.lexsort((samples['time'], sessions))
+            samples = samples[order]
+            sessions = sessions[order]
+            sameSession = sessions[1:] == sessions[:-1]
+        sessionStarts = np.flatnonzero(~sameSession) + 1
+        for sessionSamples in np.split(samples, sessionStarts):
+            s = self.processSamples(sessionSamples)
+            for cls, events in self._createEvents(s).items():
+                parsed[cls].append(events)
+
+        for cls in eventClasses:
+            if parsed[cls]:
+                events = np.concatenate(parsed[cls])
+            else:
+                events = np.zeros(0, dtype=cls.NUMPY_DTYPE)
+            parsed[cls] = events[np.argsort(events['time'], kind='stable')]
+        return parsed
+
+    def _createEvents(self, s):
+        """Create the start and end events for every complete run of
+        samples of the same category."""
+        from ..eye_events import (FixationStartEvent, FixationEndEvent,
+                                  SaccadeStartEvent, SaccadeEndEvent,
+                                  BlinkStartEvent, BlinkEndEvent)
+        category = s['category']
+        n = len(category)
+        if n == 0:
+            return dict()
+        runStarts = np.concatenate(
+            ([0], np.flatnonzero(category[1:] != category[:-1]) + 1))
+        runEnds = np.concatenate((runStarts[1:], [n])) - 1
+        runCounts = runEnds - runStarts + 1
+
+        def runMean(field):
+            return np.add.reduceat(s[field], runStarts) / runCounts
+
+        def runMax(field):
+            return np.maximum.reduceat(s[field], runStarts)
+
+        # the first and last runs may be part of longer events
+        complete = np.arange(1, len(runStarts) - 1)
+        events = dict()
+        for cat, startCls, endCls in (
+                ('FIX', FixationStartEvent, FixationEndEvent),
+                ('SAC', SaccadeStartEvent, SaccadeEndEvent),
+                ('MIS', BlinkStartEvent, BlinkEndEvent)):
+            runs = complete[category[runStarts[complete]] == cat]
+            starts = runStarts[runs]
+            ends = runEnds[runs]
+
+            startEvents = self._eventArray(startCls, s, starts)
+            endEvents = self._eventArray(endCls, s, ends)
+            endEvents['duration'] = s['time'][ends] - s['time'][starts]
+            if cat != 'MIS':
+                for field in ('gaze_x', 'gaze_y', 'angle_x', 'angle_y',
+                              'raw_x', 'raw_y', 'pupil_measure1',
+                              'pupil_measure1_type', 'velocity_x',
+                              'velocity_y', 'velocity_xy'):
+                    startEvents[field] = s[field][starts]
+                    endEvents['start_' + field] = s[field][starts]
+                    endEvents['end_' + field] = s[field][ends]
+                for field in ('velocity_x', 'velocity_y', 'velocity_xy'):
+                    endEvents['average_' + field] = runMean(field)[runs]
+                    endEvents['peak_' + field] = runMax(field)[runs]
+            if cat == 'FIX':
+                for field in ('gaze_x', 'gaze_y', 'angle_x', 'angle_y',
+                              'pupil_measure1'):
+                    endEvents['average_' + field] = runMean(field)[runs]
+                endEvents['average_pupil_measure1_type'] = \
+                    s['pupil_measure1_type'][ends]
+            elif cat == 'SAC':
+                xDiff = s['gaze_x'][ends] - s['gaze_x'][starts]
+                yDiff = s['gaze_y'][ends] - s['gaze_y'][starts]
+                endEvents['amplitude_x'] = xDiff
+                endEvents['amplitude_y'] = yDiff
+                endEvents['angle'] = np.rad2deg(np.arctan2(yDiff, xDiff))
+            events[startCls] = startEvents
+            events[endCls] = endEvents
+        return events
+
+    def _eventArray(self, eventCls, s, ix):
+        """Create an array of events of the given class, with the fields
+        common to all eye events taken from the samples at ix."""
+        events = np.zeros(len(ix), dtype=eventCls.NUMPY_DTYPE)
+        for field in ('experiment_id', 'session_id', 'device_id',
+                      'device_time', 'logged_time', 'time', 'eye', 'status'):
+            events[field] = s[field][ix]
+        events['type'] = eventCls.EVENT_TYPE_ID
+        events['filter_id'] = self.filter_id
+        return events
+
+    def parseFile(self, hdfFilePath, hdfFileName, sampleType=None,
+                  replace=False):
+        """Parse the eye samples saved in an ioHub DataStore file, and save
+        the parsed fixation, saccade and blink events back to the file.
+
+        Args:
+            hdfFilePath (str): The path of the directory the DataStore file
+                is in.
+
+            hdfFileName (str): The name of the DataStore file.
+
+            sampleType (str or int): The eye sample event type to parse, e.g.
+                'BinocularEyeSampleEvent'. If None, the first of the
+                binocular or monocular sample types saved to the file is
+                used.
+
+            replace (bool): If True, any events already saved to the
+                fixation, saccade and blink tables are removed first,
+                otherwise parsed events are added to them.
+
+        Returns:
+            dict: The parsed events, as returned by parseSamples, with the
+            event_id set to the id each was saved with.
+        """
+        from ....datastore import DataStoreFile
+        from ....datastore.util import ExperimentDataAccessUtility
+
+        dataAccess = ExperimentDataAccessUtility(hdfFilePath, hdfFileName,
+                                                 mode='a')
+        try:
+            if sampleType is None:
+                available = dataAccess.getAvailableEyeSampleTypes(int)
+                sampleType = [t for t in (BINOCULAR_EYE_SAMPLE,
+                                          MONOCULAR_EYE_SAMPLE)
+                              if t in available]
+                if not sampleType:
+                    raise ValueError('No binocular or monocular eye samples '
+                                     'found in %s' % (hdfFileName))
+                sampleType = sampleType[0]
+            sampleTable = dataAccess.getEventTable(sampleType)
+            if sampleTable is None:
+                raise ValueError('No %s table found in %s' % (sampleType,
+                                                              hdfFileName))
+            parsed = self.parseSamples(sampleTable.read())
+
+            hdfFile = dataAccess.hdfFile
+            eventID = 1 + max(
+                [int(t.col('event_id').max()) for t in hdfFile.walk_nodes(
+                    '/data_collection/events', classname='Table')
+                 if t.nrows and 'event_id' in t.colnames] or [0])
+            for eventCls, events in parsed.items():
+                events['event_id'] = np.arange(eventID, eventID + len(events))
+                eventID += len(events)
+
+                table = dataAccess.getEventTable(eventCls.__name__)
+                if table is None:
+                    table = hdfFile.create_table(
+                        sampleTable._v_parent,
+                        DataStoreFile.eventTableLabel2ClassName(
+                            eventCls.IOHUB_DATA_TABLE),
+                        eventCls.NUMPY_DTYPE,
+                        title='%s Data' % sampleTable._v_parent._v_name)
+                    mapping = hdfFile.root.class_table_mapping.row
+                    mapping['class_id'] = eventCls.EVENT_TYPE_ID
+                    mapping['class_type_id'] = 1
+                    mapping['class_name'] = eventCls.__name__
+                    mapping['table_path'] = table._v_pathname
+                    mapping.append()
+                    hdfFile.root.class_table_mapping.flush()
+                elif replace and table.nrows:
+                    table.remove_rows(0, table.nrows)
+                if len(events):
+                    table.append(events)
+                table.flush()
+        finally:
+            dataAccess.close()
+        return parsed
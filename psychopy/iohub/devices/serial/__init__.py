@@ -288,6 +288,15 @@ class Serial(Device):
         else:
             self._rx_buffer = ''
 
+    def _getWakeupFileno(self):
+        # only posix serial ports have a file descriptor to wait on
+        try:
+            if self._serial is not None and self._serial.is_open:
+                return self._serial.fileno()
+        except Exception:
+            pass
+        return None
+
     def flushInput(self):
         self._serial.flushInput()
 
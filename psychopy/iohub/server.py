@@ -6,6 +6,7 @@ import importlib
 import os
 import sys
 import inspect
+import time
 from operator import itemgetter
 from collections import deque, OrderedDict
 
@@ -13,6 +14,8 @@ import msgpack
 import gevent
 from gevent.server import DatagramServer
 from gevent import Greenlet
+from gevent.event import Event
+import gevent.socket
 
 import numpy
 
@@ -29,8 +32,10 @@ from .util import convertCamelToSnake, win32MessagePump
 from .util import yload, yLoader
 from .constants import DeviceConstants, EventConstants
 from .devices import DeviceEvent, import_device, importDeviceModule
+from .devices import eventArraysByType
 from .devices import Computer
 from .devices.deviceConfigValidation import validateDeviceConfiguration
+from . import sharedmem
 getTime = Computer.getTime
 syncClock = Computer.syncClock
 
@@ -49,6 +54,16 @@ def convertByteStrings(rdict):
         result[k] = i
     return result
 
+def packEventArrays(events):
+    """Pack events for sending with as_type='numpy', as a list of
+    [event type id, bytes] pairs. The bytes of each pair are the events of
+    that type as one contiguous NumPy structured array, using the NUMPY_DTYPE
+    of the event class, so the client can wrap them without converting each
+    event.
+    """
+    return [[etype, earray.tobytes()]
+            for etype, earray in eventArraysByType(events).items()]
+
 class udpServer(DatagramServer):
     client_proc_init_req = None
     def __init__(self, ioHubServer, address):
@@ -103,7 +118,10 @@ class udpServer(DatagramServer):
                                payload, replyTo], replyTo)
             return True
         elif request_type == 'GET_EVENTS':
-            return self.handleGetEvents(replyTo)
+            asType = request.pop(0) if request else None
+            if isinstance(asType, bytes):
+                asType = str(asType, 'utf-8')
+            return self.handleGetEvents(replyTo, asType)
         elif request_type == 'EXP_DEVICE':
             return self.handleExperimentDeviceRequest(request, replyTo)
         elif request_type == 'CUSTOM_TASK':
@@ -162,7 +180,13 @@ class udpServer(DatagramServer):
                 self.sendResponse('RPC_NOT_CALLABLE_ERROR', replyTo)
                 return False
         elif request_type == 'GET_IOHUB_STATUS':
-            self.sendResponse((request_type, self.iohub.getStatus()), replyTo)
+            if request and request.pop(0):
+                # also send the per device stats
+                self.sendResponse((request_type, self.iohub.getStatus(),
+                                   self.iohub.getDeviceStats()), replyTo)
+            else:
+                self.sendResponse((request_type, self.iohub.getStatus()),
+                                  replyTo)
             return True
         elif request_type == 'STOP_IOHUB_SERVER':
             self.shutDown()
@@ -215,16 +239,19 @@ class udpServer(DatagramServer):
         edata = ('CUSTOM_TASK_REPLY', request)
         self.sendResponse(edata, replyTo)
 
-    def handleGetEvents(self, replyTo):
+    def handleGetEvents(self, replyTo, asType=None):
         try:
             self.iohub.processDeviceEvents()
             currentEvents = list(self.iohub.eventBuffer)
-            self.iohub.eventBuffer.clear()
 
             if len(currentEvents) > 0:
                 currentEvents = sorted(
                     currentEvents, key=itemgetter(
                         DeviceEvent.EVENT_HUB_TIME_INDEX))
+                if asType == 'numpy':
+                    currentEvents = packEventArrays(currentEvents)
+                # only once packed, so the events aren't lost if that fails
+                self.iohub.eventBuffer.clear()
                 self.sendResponse(
                     ('GET_EVENTS_RESULT', currentEvents), replyTo)
             else:
@@ -298,6 +325,11 @@ class udpServer(DatagramServer):
                     result = method(**convertByteStrings(kwargs))
                 else:
                     result = method()
+                if dmethod == 'getEvents' and kwargs:
+                    kwargs = convertByteStrings(kwargs)
+                    asType = kwargs.get('as_type', kwargs.get('asType'))
+                    if asType == 'numpy':
+                        result = packEventArrays(result)
                 #print2err("DEV_RPC_RESULT: ", result)
                 self.sendResponse(('DEV_RPC_RESULT', result), replyTo)
                 return True
@@ -502,6 +534,42 @@ class udpServer(DatagramServer):
                 except Exception:
                     pass
 
+    def subscribeEvents(self, event_types=None, devices=None, fields=None,
+                        max_queue=1024, overflow='drop_oldest'):
+        """
+        Subscribe to the events of the given types and / or devices.
+
+        :return: id of the new subscription.
+        """
+        sub = self.iohub.addSubscription(event_types, devices, fields,
+                                         max_queue, overflow)
+        return sub.sub_id
+
+    def unsubscribeEvents(self, sub_id):
+        return self.iohub.removeSubscription(sub_id)
+
+    def getSubscribedEvents(self, sub_id):
+        """
+        Get the events queued for a subscription since the last call.
+
+        :return: [events, number of events dropped since the last call]
+        """
+        self.iohub.processDeviceEvents()
+        return list(self.iohub.subscriptions[sub_id].getEvents())
+
+    def clearSubscribedEvents(self, sub_id):
+        self.iohub.processDeviceEvents()
+        self.iohub.subscriptions[sub_id].clearEvents()
+
+    def getSharedEventRings(self):
+        """
+        Get the shared memory event rings created by the ioHub Server.
+
+        :return: dict of device name -> shared memory name.
+        """
+        return {dname: ring.name
+                for dname, ring in self.iohub.eventRings.items()}
+
     @staticmethod
     def getTime():
         """See Computer.getTime documentation, where current process will be
@@ -544,7 +612,7 @@ class udpServer(DatagramServer):
     def flushIODataStoreFile(self):
         dsfile = self.iohub.dsfile
         if dsfile:
-            dsfile.emrtFile.flush()
+            dsfile.flush()
             return True
         return False
 
@@ -560,26 +628,147 @@ class udpServer(DatagramServer):
             sys.exit(1)
 
 
+class DeviceStats():
+    """
+    How much time the ioHub Server spends polling a device, and how long the
+    device's events wait before being processed.
+    """
+    __slots__ = ['polls', 'poll_time', 'poll_cpu_time', 'wakeups', 'events',
+                 'latency_total', 'latency_max']
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.polls = 0
+        self.poll_time = 0.0
+        self.poll_cpu_time = 0.0
+        self.wakeups = 0
+        self.events = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def addPoll(self, duration, cpu_duration):
+        self.polls += 1
+        self.poll_time += duration
+        self.poll_cpu_time += cpu_duration
+
+    def addEvent(self, latency):
+        self.events += 1
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+    def asDict(self):
+        stats = {k: getattr(self, k) for k in self.__slots__}
+        stats['latency_mean'] = self.latency_total / max(self.events, 1)
+        return stats
+
+
 class DeviceMonitor(Greenlet):
-    def __init__(self, device, sleep_interval):
+    """
+    Calls a device's _poll() method every sleep_interval sec. With
+    event_driven True, if the device has a file descriptor to wait on,
+    _poll() is called whenever it is readable instead (and at least every
+    max_wait sec).
+    """
+    def __init__(self, device, sleep_interval, stats=None, event_driven=False,
+                 max_wait=0.05):
         Greenlet.__init__(self)
         self.device = device
         self.sleep_interval = sleep_interval
+        self.stats = stats or DeviceStats()
+        self.event_driven = event_driven
+        self.max_wait = max_wait
         self.running = False
 
     def _run(self):
         self.running = True
         ctime = Computer.getTime
+        fileno = None
         while self.running is True:
             stime = ctime()
+            cpu_stime = time.thread_time()
             self.device._poll()
-            i = self.sleep_interval - (ctime() - stime)
-            gevent.sleep(max(0,i))
+            self.stats.addPoll(ctime() - stime,
+                               time.thread_time() - cpu_stime)
+            if self.event_driven:
+                fileno = self.device._getWakeupFileno()
+            if fileno is None or not self.device.isReportingEvents():
+                i = self.sleep_interval - (ctime() - stime)
+                gevent.sleep(max(0,i))
+            else:
+                try:
+                    gevent.socket.wait_read(fileno, timeout=self.max_wait)
+                    self.stats.wakeups += 1
+                except gevent.socket.timeout:
+                    pass
 
     def __del__(self):
         self.device = None
 
 
+class EventSubscription():
+    """
+    Events requested by one subscriber in the experiment process, added as an
+    event listener to each device giving events of the subscribed types.
+
+    Each subscription has its own queue, holding at most max_queue events.
+    When the queue is full, the oldest event is dropped if overflow is
+    'drop_oldest' (the default), or the new event if overflow is
+    'drop_newest'. Events are projected to the subscribed fields, if any,
+    when they are sent to the subscriber.
+    """
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+    def __init__(self, sub_id, fields=None, max_queue=1024,
+                 overflow='drop_oldest'):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError('Invalid subscription overflow policy: '
+                             '{}'.format(overflow))
+        self.sub_id = sub_id
+        self.fields = list(fields) if fields else None
+        self.overflow = overflow
+        self.queue = deque(maxlen=max_queue)
+        self.dropped = 0
+        # event type id -> attribute indices of the subscribed fields
+        self._field_indices = dict()
+
+    def _handleEvent(self, event):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            if self.overflow == 'drop_newest':
+                return
+        self.queue.append(event)
+
+    def _project(self, event):
+        etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
+        indices = self._field_indices.get(etype)
+        if indices is None:
+            attr_names = EventConstants.getClass(etype).CLASS_ATTRIBUTE_NAMES
+            indices = self._field_indices[etype] = [
+                attr_names.index(f) if f in attr_names else None
+                for f in self.fields]
+        return [None if i is None else event[i] for i in indices]
+
+    def getEvents(self):
+        """
+        Remove and return the queued events, ordered by hub time, along with
+        the number of events dropped since the last call.
+        """
+        events = sorted(self.queue,
+                        key=itemgetter(DeviceEvent.EVENT_HUB_TIME_INDEX))
+        self.queue.clear()
+        dropped, self.dropped = self.dropped, 0
+        if self.fields:
+            events = [self._project(e) for e in events]
+        return events, dropped
+
+    def clearEvents(self):
+        self.queue.clear()
+        self.dropped = 0
+
+
 class ioServer():
     eventBuffer = None
     deviceDict = {}
@@ -606,6 +795,21 @@ class ioServer():
         self.filterLookupByName = {}
         self._hookDevice = None
         self._all_dev_conf_errors = []
+        self.eventRings = OrderedDict()
+        self.subscriptions = OrderedDict()
+        self._next_subscription_id = 1
+        self.deviceStats = OrderedDict()
+        # In event driven mode, devices wake the event processing tasklet
+        # when they have new events. An async watcher is used since native
+        # event callbacks can be called from other threads.
+        self.event_driven = config.get('event_driven', False)
+        self.event_driven_max_wait = config.get('event_driven_max_wait', 0.05)
+        self._wakeup_event = None
+        self._wakeup_watcher = None
+        if self.event_driven:
+            self._wakeup_event = Event()
+            self._wakeup_watcher = gevent.get_hub().loop.async_()
+            self._wakeup_watcher.start(self._wakeup_event.set)
         ebuf_sz = config.get('global_event_buffer', 2048)
         ioServer.eventBuffer = deque(maxlen=ebuf_sz)
 
@@ -760,6 +964,11 @@ class ioServer():
         else:
             self.log('DataStore Not Enabled. No events will be saved.')
 
+        # add shared memory event ring, read directly by the experiment
+        ring_size = self.config.get('shared_memory_events', 0)
+        if ring_size and devt_ids and dconf.get('stream_events') is True:
+            self._addEventRing(dinstance, dconf['name'], devt_ids, ring_size)
+
         # Add Device Monitor for Keyboard or Mouse device type
         deviceDict = ioServer.deviceDict
         iohub = self
@@ -914,11 +1123,15 @@ class ioServer():
             dev_instance = DeviceClass(dconfig=dev_conf)
             self.devices.append(dev_instance)
             deviceDict[dev_cls_name] = dev_instance
+            self.deviceStats[dev_instance] = DeviceStats()
             self.log('Device Instance Created: %s' % (dev_cls_name,))
 
             if 'device_timer' in dev_conf:
                 interval = dev_conf['device_timer'].get('interval', 0.001)
-                dPoller = DeviceMonitor(dev_instance, interval)
+                dPoller = DeviceMonitor(dev_instance, interval,
+                                        self.deviceStats[dev_instance],
+                                        self.event_driven,
+                                        self.event_driven_max_wait)
                 self.deviceMonitors.append(dPoller)
                 ltxt = '%s timer period: %.3f' % (dev_cls_name, interval)
                 self.log(ltxt)
@@ -947,6 +1160,63 @@ class ioServer():
 
             return dev_instance, dev_conf, monitor_evt_ids, evt_classes
 
+    def _addEventRing(self, device, device_name, event_ids, ring_size):
+        if not sharedmem.isAvailable():
+            self.log('shared_memory_events is not supported by this '
+                     'version of Python.')
+            return None
+        try:
+            event_classes = [EventConstants.getClass(eid) for eid in event_ids]
+            ring = sharedmem.EventRing.create(ring_size, event_classes)
+            device._addEventListener(ring, event_ids)
+            self.eventRings[device_name] = ring
+            self.log('Added Device Event Ring: {}, {}'.format(device_name,
+                                                              ring.name))
+            return ring
+        except Exception:
+            print2err('Error creating shared memory event ring for device: ',
+                      device_name)
+            printExceptionDetailsToStdErr()
+        return None
+
+    def addSubscription(self, event_types=None, devices=None, fields=None,
+                        max_queue=1024, overflow='drop_oldest'):
+        """
+        Add an EventSubscription as a listener to each monitored device which
+        has a name in devices (all devices if None), for the event types in
+        event_types (all the device's event types if None).
+        """
+        sub = EventSubscription(self._next_subscription_id, fields,
+                                max_queue, overflow)
+        listening = False
+        for device in self.devices:
+            if devices and device.name not in devices:
+                continue
+            event_ids = set(
+                getattr(EventConstants, convertCamelToSnake(e[:-5], False))
+                for e in device.getConfiguration().get(
+                    'monitor_event_types') or [])
+            if event_types:
+                event_ids.intersection_update(event_types)
+            if event_ids:
+                device._addEventListener(sub, sorted(event_ids))
+                listening = True
+        if not listening:
+            raise ioHubError('No monitored device gives the subscribed '
+                             'events.', event_types=event_types,
+                             devices=devices)
+        self._next_subscription_id += 1
+        self.subscriptions[sub.sub_id] = sub
+        return sub
+
+    def removeSubscription(self, sub_id):
+        sub = self.subscriptions.pop(sub_id, None)
+        if sub is None:
+            return False
+        for device in self.devices:
+            device._removeEventListener(sub)
+        return True
+
     def log(self, text, level=None):
         try:
             log_time = getTime()
@@ -978,17 +1248,46 @@ class ioServer():
         while self._running:
             stime = Computer.getTime()
             self.processDeviceEvents()
-            dur = sleep_interval - (Computer.getTime() - stime)
-            gevent.sleep(max(0, dur))
+            if self.dsfile:
+                # write events which have been staged for too long
+                self.dsfile.writeEventBuffers(force=False)
+            if self._wakeup_event is not None:
+                self._wakeup_event.wait(self.event_driven_max_wait)
+                self._wakeup_event.clear()
+            else:
+                dur = sleep_interval - (Computer.getTime() - stime)
+                gevent.sleep(max(0, dur))
+
+    def wakeup(self):
+        """
+        Called by devices when they have new native events. In event driven
+        mode this wakes the event processing tasklet. Can be called from any
+        thread.
+        """
+        if self._wakeup_watcher is not None:
+            self._wakeup_watcher.send()
+
+    def getDeviceStats(self):
+        """
+        Get the poll and event latency stats of each device, as a dict of
+        device name -> dict of stats.
+        """
+        return {device.name: stats.asDict()
+                for device, stats in self.deviceStats.items()}
 
     def processDeviceEvents(self):
         for device in self.devices:
             evt = []
+            stats = self.deviceStats.get(device)
             try:
                 events = device._getNativeEventBuffer()
+                ptime = Computer.getTime()
                 while events:
                     evt = device._getIOHubEventObject(events.popleft())
                     if evt:
+                        if stats is not None:
+                            stats.addEvent(
+                                ptime - evt[DeviceEvent.EVENT_LOGGED_TIME_INDEX])
                         etype = evt[DeviceEvent.EVENT_TYPE_ID_INDEX]
                         for l in device._getEventListeners(etype):
                             l._handleEvent(evt)
@@ -1064,6 +1363,13 @@ class ioServer():
 
             while self.devices:
                 self.devices.pop(0)._close()
+
+            while self.eventRings:
+                self.eventRings.popitem()[1].close()
+
+            if self._wakeup_watcher is not None:
+                self._wakeup_watcher.stop()
+                self._wakeup_watcher = None
         except Exception:
             print2err('Error in ioSever.shutdown():')
             printExceptionDetailsToStdErr()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Part of the PsychoPy library
+# Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""
+Shared memory transport of device events from the ioHub Server to the
+experiment process.
+
+Each device gets a single producer / single consumer ring buffer of fixed
+size event records in a multiprocessing.shared_memory block. The ioHub Server
+writes each event as a NumPy record, using the NUMPY_DTYPE of the event class,
+and the experiment process reads them straight from shared memory, without
+sending a request to the server. UDP is still used for everything else.
+
+The block starts with a header of uint64 values (capacity, record size,
+write count, read count and dropped count). Only the server changes the write
+and dropped counts and only the client changes the read count, so no lock is
+needed. When the ring is full new events are dropped (and counted) rather
+than overwriting events the client may be reading.
+"""
+import sys
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+from .devices import DeviceEvent
+from .constants import EventConstants
+from .errors import print2err
+
+HEADER_SIZE = 64
+_CAPACITY, _RECORD_SIZE, _WRITE_COUNT, _READ_COUNT, _DROPPED_COUNT = range(5)
+
+# Fields common to all event types, found at the start of every record.
+BASE_DTYPE = np.dtype(DeviceEvent.NUMPY_DTYPE)
+
+# names of the shared memory blocks created by this process
+_created = set()
+
+
+def isAvailable():
+    return shared_memory is not None
+
+
+class EventRing():
+    """
+    Ring buffer of device event records in shared memory.
+
+    The ioHub Server creates one with EventRing.create() and adds it to a
+    device as an event listener. The experiment process attaches to it by
+    name with EventRing(name) and calls read() to get the new records.
+    """
+    def __init__(self, name, create=False, capacity=0, record_size=0):
+        if shared_memory is None:
+            raise RuntimeError('multiprocessing.shared_memory is not '
+                               'available, Python 3.8 or later is needed.')
+        self._owner = create
+        if create:
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True,
+                size=HEADER_SIZE + capacity * record_size)
+            _created.add(self._shm.name)
+        else:
+            self._shm = _attachSharedMemory(name)
+        self._header = np.ndarray((HEADER_SIZE // 8,), dtype=np.uint64,
+                                  buffer=self._shm.buf)
+        if create:
+            self._header[:] = 0
+            self._header[_CAPACITY] = capacity
+            self._header[_RECORD_SIZE] = record_size
+        self.capacity = int(self._header[_CAPACITY])
+        self.record_size = int(self._header[_RECORD_SIZE])
+        self._data = np.ndarray((self.capacity, self.record_size),
+                                dtype=np.uint8, buffer=self._shm.buf,
+                                offset=HEADER_SIZE)
+        # one record of each event type, reused when writing events
+        self._records = dict()
+
+    @classmethod
+    def create(cls, capacity, event_classes, name=None):
+        """
+        Create a ring buffer able to hold capacity events of any of the
+        given event classes.
+        """
+        record_size = max(np.dtype(ec.NUMPY_DTYPE).itemsize
+                          for ec in event_classes)
+        return cls(name, create=True, capacity=capacity,
+                   record_size=record_size)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def getDroppedCount(self):
+        return int(self._header[_DROPPED_COUNT])
+
+    def __len__(self):
+        return int(self._header[_WRITE_COUNT] - self._header[_READ_COUNT])
+
+    def _handleEvent(self, event):
+        """
+        Write an event, in list form, to the ring. Called by the device on
+        the ioHub Server, as for any other event listener.
+        """
+        header = self._header
+        write_count = int(header[_WRITE_COUNT])
+        if write_count - int(header[_READ_COUNT]) >= self.capacity:
+            header[_DROPPED_COUNT] += 1
+            return
+        etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
+        eventClass = EventConstants.getClass(etype)
+        record = self._records.get(etype)
+        if record is None:
+            record = self._records[etype] = np.zeros(
+                1, dtype=eventClass.NUMPY_DTYPE)
+        try:
+            record[0] = eventClass.createEventAsRecord(event)
+        except Exception:
+            header[_DROPPED_COUNT] += 1
+            print2err('EventRing: could not convert event to a record: ',
+                      event)
+            return
+        record_bytes = record.view(np.uint8)
+        self._data[write_count % self.capacity, :record_bytes.size] = \
+            record_bytes
+        # only publish the event once its record has been written
+        header[_WRITE_COUNT] = write_count + 1
+
+    def read(self):
+        """
+        Read all records written since the last call, oldest first, as a
+        uint8 array with one row per record.
+        """
+        header = self._header
+        read_count = int(header[_READ_COUNT])
+        write_count = int(header[_WRITE_COUNT])
+        slots = np.arange(read_count, write_count) % self.capacity
+        records = self._data[slots]
+        header[_READ_COUNT] = write_count
+        return records
+
+    def close(self):
+        """
+        Release the shared memory, removing it if this is the ring's creator.
+        """
+        if self._shm is None:
+            return
+        # the shared memory can't be closed while arrays use its buffer
+        self._header = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+            _created.discard(self._shm.name)
+        self._shm = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _attachSharedMemory(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if shm.name in _created:
+        return shm
+    # The creator removes the memory. Stop the resource tracker of this
+    # process from removing it (and warning about a leak) on exit.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+def recordFields(records):
+    """
+    Get the fields common to all event types (type, time, filter_id, etc.)
+    from records read from an EventRing, as a structured array.
+    """
+    return np.ascontiguousarray(
+        records[:, :BASE_DTYPE.itemsize]).view(BASE_DTYPE).reshape(-1)
+
+
+def recordsToArrays(records):
+    """
+    Convert records read from an EventRing into a dict of event type id ->
+    NumPy structured array, using the NUMPY_DTYPE of each event class.
+    """
+    etypes = recordFields(records)['type']
+    arrays = dict()
+    for etype in np.unique(etypes):
+        dtype = np.dtype(EventConstants.getClass(int(etype)).NUMPY_DTYPE)
+        rows = records[etypes == etype, :dtype.itemsize]
+        arrays[int(etype)] = np.ascontiguousarray(rows).view(
+            dtype).reshape(-1)
+    return arrays
+
+
+def recordsToLists(records):
+    """
+    Convert records read from an EventRing into a list of events in list
+    form, keeping their order. Byte strings are decoded, as they are for
+    events received over UDP.
+    """
+    etypes = recordFields(records)['type']
+    events = [None] * len(records)
+    for etype, array in recordsToArrays(records).items():
+        indices = np.flatnonzero(etypes == etype)
+        for i, values in zip(indices, array.tolist()):
+            events[i] = [v.decode('utf-8', 'replace') if isinstance(v, bytes)
+                         else v for v in values]
+    return events
@@ -666,6 +666,25 @@ class NumPyRingBuffer():
         self._npa[(i % self.max_size) + self.max_size] = element
         self._index += 1
 
+    def extend(self, elements):
+        """Add each element of a sequence to the end of the RingBuffer, the
+        same as calling append for each one but without looping over them
+        in Python. Only the last max_size elements are actually written,
+        as any before them would be removed anyway.
+
+        :param elements: A sequence of elements to add to the RingBuffer.
+        :returns None:
+
+        """
+        elements = numpy.asarray(elements, dtype=self._dtype)
+        skipped = max(len(elements) - self.max_size, 0)
+        elements = elements[skipped:]
+        self._index += skipped
+        i = (self._index + numpy.arange(len(elements))) % self.max_size
+        self._npa[i] = elements
+        self._npa[i + self.max_size] = elements
+        self._index += len(elements)
+
     def getElements(self):
         """Return the numpy array being used by the RingBuffer, the length of
         which will be equal to the number of elements added to the list, or the
@@ -29,15 +29,20 @@ messages, (which PsychoPy doesn't use) using the commands::
 """
 
 # Much of the code below is based conceptually, if not syntactically, on the
-# python logging module but it's simpler (no threading) and maintaining a
-# stack of log entries for later writing (don't want files written while
-# drawing)
+# python logging module but it's simpler and maintaining a stack of log
+# entries for later writing (don't want files written while drawing). If
+# needed, the writing can be handed to a background thread (see
+# _Logger.setAsync) so that it never happens on the experiment's thread.
 
 from os import path
 import atexit
 import sys
+import threading
 import codecs
 import locale
+import struct
+from collections import deque
+from itertools import islice
 from pathlib import Path
 
 from psychopy import clock
@@ -126,9 +131,13 @@ def setDefaultClock(clock):
 
 
 class _LogEntry():
+    """A single logged message. Uses slots rather than a dict of attributes
+    as there can be a great many of these, but can still be used as a
+    mapping of attribute names to values (e.g. for formatting).
+    """
+    __slots__ = ('t', 't_ms', 'level', 'levelname', 'message', 'obj')
 
     def __init__(self, level, message, t=None, obj=None, levelname=None):
-        super(_LogEntry, self).__init__()
         self.t = t
         self.t_ms = t * 1000
         self.level = level
@@ -138,6 +147,14 @@ class _LogEntry():
         self.message = message
         self.obj = obj
 
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
 
 class LogFile():
     """A text stream to receive inputs from the logging system
@@ -233,6 +250,187 @@ class LogFile():
             pass
 
 
+class BinaryLogFile(LogFile):
+    """A log target which writes entries as fixed-width binary records
+    rather than formatted text, so that logging at very high rates (e.g. on
+    every frame) is cheap and gives much smaller files.
+
+    Each record holds the time (float64), level (uint16) and the index of
+    the message and object (uint32) in a table of strings, with each unique
+    string only stored once. Records are written in chunks, one per flush,
+    so the file is readable up to the last flush even if the experiment
+    crashes. Use :func:`readBinaryLog` to read the file back as a
+    :class:`pandas.DataFrame`.
+    """
+    magic = b'PSYLOG\x00\x01'
+    # record is time, level, message index, object index
+    recordStruct = struct.Struct('<dHII')
+    recordDtype = [('t', '<f8'), ('level', '<u2'), ('message', '<u4'),
+                   ('obj', '<u4')]
+    _chunkHeader = struct.Struct('<cI')
+    _stringHeader = struct.Struct('<I')
+
+    def __init__(self, f, level=DEBUG, filemode='a', logger=None):
+        """Create a binary log file as a target for logged entries of a
+        given level
+
+        :parameters:
+
+            - f:
+                Path of the file to write to, will be created if it doesn't
+                exist
+
+            - level:
+                The minimum level of importance that a message must have
+                to be logged by this target.
+
+            - filemode: 'a', 'w'
+                Append to or overwrite an existing log file
+
+        """
+        if isinstance(f, Path):
+            f = str(f)
+        # index of each string written so far, '' is used for no object
+        self.strings = {'': 0}
+        if filemode == 'a' and path.isfile(f) and path.getsize(f):
+            # carry on from the strings already in the file
+            with open(f, 'rb') as existing:
+                for i, string in enumerate(_readBinaryLogChunks(existing.read())[0]):
+                    self.strings[string] = i
+            self.stream = open(f, 'ab')
+        else:
+            self.stream = open(f, 'wb')
+            self.stream.write(self.magic)
+        self.level = level
+        if logger is None:
+            logger = root
+        self.logger = logger
+        self.logger.addTarget(self)
+
+    def _intern(self, string, newStrings):
+        index = self.strings.get(string)
+        if index is None:
+            index = self.strings[string] = len(self.strings)
+            newStrings.append(string)
+        return index
+
+    def writeEntries(self, entries):
+        """Write a batch of log entries as a chunk of binary records.
+        """
+        if not entries:
+            return
+        newStrings = []
+        size = self.recordStruct.size
+        records = bytearray(size * len(entries))
+        for i, thisEntry in enumerate(entries):
+            if thisEntry.obj is None:
+                obj = 0
+            else:
+                obj = self._intern(str(thisEntry.obj), newStrings)
+            self.recordStruct.pack_into(
+                records, i * size,
+                float(thisEntry.t), thisEntry.level,
+                self._intern(str(thisEntry.message), newStrings), obj
+            )
+        chunks = []
+        # strings must be written before the records which use them
+        if newStrings:
+            table = []
+            for string in newStrings:
+                encoded = string.encode('utf8')
+                table.append(self._stringHeader.pack(len(encoded)))
+                table.append(encoded)
+            table = b''.join(table)
+            chunks.append(self._chunkHeader.pack(b'S', len(table)))
+            chunks.append(table)
+        chunks.append(self._chunkHeader.pack(b'R', len(records)))
+        chunks.append(bytes(records))
+        self.stream.write(b''.join(chunks))
+        self.stream.flush()
+
+    def write(self, txt):
+        """Write directly to the log file (without using logging functions),
+        each line of `txt` is stored as a message at this file's level.
+        """
+        t = defaultClock.getTime()
+        self.writeEntries([
+            _LogEntry(self.level, line, t=t)
+            for line in txt.splitlines() if line
+        ])
+
+
+def _readBinaryLogChunks(data):
+    """Split the contents of a BinaryLogFile into its table of strings and
+    a list of buffers of records.
+    """
+    if not bytes(data[:len(BinaryLogFile.magic)]) == BinaryLogFile.magic:
+        raise ValueError("Not a PsychoPy binary log file")
+    chunkHeader = BinaryLogFile._chunkHeader
+    stringHeader = BinaryLogFile._stringHeader
+    strings = ['']
+    records = []
+    pos = len(BinaryLogFile.magic)
+    while pos + chunkHeader.size <= len(data):
+        kind, length = chunkHeader.unpack_from(data, pos)
+        pos += chunkHeader.size
+        if pos + length > len(data):
+            # last chunk was only partially written
+            break
+        if kind == b'S':
+            end = pos + length
+            while pos < end:
+                nBytes, = stringHeader.unpack_from(data, pos)
+                pos += stringHeader.size
+                strings.append(bytes(data[pos:pos + nBytes]).decode('utf8'))
+                pos += nBytes
+        else:
+            records.append(data[pos:pos + length])
+            pos += length
+
+    return strings, records
+
+
+def readBinaryLog(fileName):
+    """Read a file written by a :class:`BinaryLogFile`.
+
+    :parameters:
+
+        - fileName:
+            Path of the file to read
+
+    :returns:
+
+        A :class:`pandas.DataFrame` with a row per entry and columns t,
+        level, levelname, message and obj
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    data = np.memmap(str(fileName), dtype=np.uint8, mode='r')
+    strings, chunks = _readBinaryLogChunks(data)
+    dtype = np.dtype(BinaryLogFile.recordDtype)
+    if chunks:
+        records = np.concatenate(
+            [np.frombuffer(chunk, dtype=dtype) for chunk in chunks])
+    else:
+        records = np.zeros(0, dtype=dtype)
+    strings = np.array(strings, dtype=object)
+    levels = np.unique(records['level'])
+    levelNames = {level: getLevel(int(level)) for level in levels}
+    df = pd.DataFrame({
+        't': records['t'],
+        'level': records['level'].astype(int),
+        'levelname': pd.Series(records['level']).map(levelNames).values,
+        'message': strings[records['message']],
+        'obj': strings[records['obj']],
+    })
+    # no object is stored as an empty string
+    df.loc[records['obj'] == 0, 'obj'] = None
+
+    return df
+
+
 class _Logger():
     """Maintains a set of log targets (text streams such as files of stdout)
 
@@ -247,18 +445,94 @@ class _Logger():
         """
         super(_Logger, self).__init__()
         self.targets = []
-        self.flushed = []
-        self.toFlush = []
+        # entries waiting to be written (appending to and popping from a
+        # deque are thread-safe, so log() never needs to take a lock)
+        self.toFlush = deque()
         self.format = format
         self.lowestTarget = 50
+        # keep the most recent entries once they've been flushed
+        self.setRetention('ring')
+        # only one thread may write to the targets at a time
+        self._writeLock = threading.RLock()
+        self._writer = None
 
     def __del__(self):
-        self.flush()
+        self.flush(block=True)
         # unicode logged to coder output window can cause logger failure, with
         # error message pointing here. this is despite it being ok to log to
         # terminal or Builder output. proper fix: fix coder unicode bug #97
         # (currently closed)
 
+    def setRetention(self, policy='ring', size=1000, fileName=None):
+        """Set what happens to log entries once they've been flushed to
+        each target. Keeping every entry (as was previously always the
+        case) means memory use grows for as long as the logger is used.
+
+        :parameters:
+
+            - policy: 'none', 'ring', 'disk' or 'all'
+                - 'none': Discard entries once flushed
+                - 'ring': Keep only the last `size` entries
+                - 'disk': Keep the last `size` entries, writing older
+                  entries to `fileName` as they're dropped
+                - 'all': Keep every entry
+
+            - size:
+                How many entries to keep in memory for 'ring' and 'disk'
+
+            - fileName:
+                File to write older entries to for 'disk'
+
+        """
+        if policy == 'none':
+            maxlen = 0
+        elif policy in ('ring', 'disk'):
+            maxlen = size
+        elif policy == 'all':
+            maxlen = None
+        else:
+            raise ValueError(
+                "Log retention policy should be one of 'none', 'ring', "
+                "'disk' or 'all', not {}".format(repr(policy)))
+        # close any previous spill file
+        if getattr(self, '_spillFile', None) is not None:
+            self._spillFile.close()
+        self._spillFile = None
+        if policy == 'disk':
+            if fileName is None:
+                raise ValueError(
+                    "Log retention policy 'disk' needs a fileName to write "
+                    "entries to")
+            self._spillFile = codecs.open(str(fileName), 'a', 'utf8')
+        self.retention = policy
+        # keep whatever we can of what's already been flushed
+        flushed = getattr(self, 'flushed', ())
+        self.flushed = deque(maxlen=maxlen)
+        self._retain(list(flushed))
+
+    def _retain(self, entries, formatted=None):
+        """Add flushed entries to self.flushed, writing any which it can no
+        longer hold to the spill file (if there is one).
+        """
+        maxlen = self.flushed.maxlen
+        if self._spillFile is not None:
+            # work out which entries are about to drop off the end
+            nDropped = len(self.flushed) + len(entries) - maxlen
+            if nDropped > 0:
+                dropped = list(islice(self.flushed, nDropped))
+                dropped += entries[:max(nDropped - len(self.flushed), 0)]
+                if formatted is None:
+                    formatted = {}
+                lines = []
+                for thisEntry in dropped:
+                    if thisEntry not in formatted:
+                        formatted[thisEntry] = self.format.format_map(thisEntry)
+                    lines.append(formatted[thisEntry] + '\n')
+                self._spillFile.write(''.join(lines))
+                self._spillFile.flush()
+        if maxlen != 0:
+            self.flushed.extend(entries)
+
     def addTarget(self, target):
         """Add a target, typically a :class:`~log.LogFile` to the logger
         """
@@ -294,36 +568,149 @@ class _Logger():
         self.toFlush.append(
             _LogEntry(t=t, level=level, levelname=levelname, message=message, obj=obj))
 
-    def flush(self):
+    def flush(self, block=False):
         """Process all current messages to each target
+
+        :parameters:
+
+            - block:
+                Only matters when writing asynchronously (see
+                :meth:`setAsync`). If False, the writer thread is woken to
+                write the messages in the background and this returns
+                straight away. If True, this waits until all current
+                messages have been written (e.g. before quitting).
         """
-        # loop through targets then entries in toFlush
-        # so that stream.flush can be called just once
-        formatted = {}  # keep a dict - so only do the formatting once
-        for target in self.targets:
-            for thisEntry in self.toFlush:
-                if thisEntry.level >= target.level:
-                    if not thisEntry in formatted:
-                        # convert the entry into a formatted string
-                        formatted[thisEntry] = self.format.format(**thisEntry.__dict__)
-                    target.write(formatted[thisEntry] + '\n')
-            if hasattr(target.stream, 'flush'):
-                target.stream.flush()
-        # finished processing entries - move them to self.flushed
-        self.flushed.extend(self.toFlush)
-        self.toFlush = []  # a new empty list
+        if self._writer is not None and not block:
+            self._writer.wake()
+            return
+        self._writeQueued()
+
+    def _writeQueued(self):
+        """Take every entry currently queued and write them to each target,
+        as a single batch.
+        """
+        with self._writeLock:
+            # only take what's there now, more could be added as we go
+            entries = []
+            for i in range(len(self.toFlush)):
+                entries.append(self.toFlush.popleft())
+            if not entries:
+                return
+            # loop through targets then entries so that each target gets
+            # a single write (and stream.flush) per batch
+            formatted = {}  # keep a dict - so only do the formatting once
+            for target in self.targets:
+                # some targets take entries rather than text
+                if hasattr(target, 'writeEntries'):
+                    target.writeEntries([
+                        thisEntry for thisEntry in entries
+                        if thisEntry.level >= target.level
+                    ])
+                    continue
+                lines = []
+                for thisEntry in entries:
+                    if thisEntry.level >= target.level:
+                        if not thisEntry in formatted:
+                            # convert the entry into a formatted string
+                            formatted[thisEntry] = self.format.format_map(thisEntry)
+                        lines.append(formatted[thisEntry] + '\n')
+                if lines:
+                    target.write(''.join(lines))
+            # finished processing entries - move them to self.flushed
+            self._retain(entries, formatted)
+
+    def setAsync(self, value=True, interval=0.1):
+        """Choose whether log entries are written by a background thread,
+        rather than by whichever thread calls :meth:`flush`. When writing
+        asynchronously, logging a message only adds it to a queue and
+        flush() (without `block=True`) only wakes the writer thread, so
+        neither can stall the experiment's thread.
+
+        :parameters:
+
+            - value:
+                True to write asynchronously, False to go back to writing
+                on flush()
+
+            - interval:
+                Maximum time (s) the writer thread waits before writing any
+                queued entries, if not woken by a call to flush()
+
+        """
+        if value and self._writer is None:
+            self._writer = _LogWriterThread(self, interval=interval)
+            self._writer.start()
+        elif value:
+            self._writer.interval = interval
+        elif self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+            # write anything queued while stopping
+            self._writeQueued()
+
+    @property
+    def isAsync(self):
+        return self._writer is not None
+
+
+class _LogWriterThread(threading.Thread):
+    """Background thread which writes entries queued in a _Logger, either
+    when woken or every `interval` seconds.
+    """
+
+    def __init__(self, logger, interval=0.1):
+        threading.Thread.__init__(self, name="PsychoPy logging", daemon=True)
+        self.logger = logger
+        self.interval = interval
+        self._wakeEvent = threading.Event()
+        self._running = True
+
+    def wake(self):
+        self._wakeEvent.set()
+
+    def stop(self):
+        self._running = False
+        self.wake()
+        self.join()
+
+    def run(self):
+        while self._running:
+            self._wakeEvent.wait(self.interval)
+            self._wakeEvent.clear()
+            try:
+                self.logger._writeQueued()
+            except Exception as err:
+                # don't let a bad target kill the thread
+                sys.stderr.write(
+                    "Failed to write log entries: {}\n".format(err))
 
 root = _Logger()
 console = LogFile(level=WARNING)
 
 
-def flush(logger=root):
-    """Send current messages in the log to all targets
+def flush(logger=root, block=False):
+    """Send current messages in the log to all targets. If the logger is
+    writing asynchronously (see :func:`setAsync`) use `block=True` to wait
+    until they have actually been written, e.g. when shutting down.
+    """
+    logger.flush(block=block)
+
+
+def setAsync(value=True, interval=0.1, logger=root):
+    """Write log messages from a background thread, see
+    :meth:`_Logger.setAsync`
+    """
+    logger.setAsync(value, interval=interval)
+
+
+def setRetention(policy='ring', size=1000, fileName=None, logger=root):
+    """Set what happens to messages once they've been sent to all targets,
+    see :meth:`_Logger.setRetention`
     """
-    logger.flush()
+    logger.setRetention(policy, size=size, fileName=fileName)
 
 # make sure this function gets called as python closes
-atexit.register(flush)
+atexit.register(flush, block=True)
 
 
 def critical(msg, t=None, obj=None):
@@ -1013,7 +1013,7 @@ class AudioClip:
         return self
 
     def transcribe(self, engine='whisper', language='en-US', expectedWords=None,
-                   config=None):
+                   config=None, wait=True):
         """Convert speech in audio to text.
 
         This function accepts an audio clip and returns a transcription of the
@@ -1023,7 +1023,8 @@ class AudioClip:
         Speech-to-text conversion blocks the main application thread when used 
         on Python. Don't transcribe audio during time-sensitive parts of your
         experiment! Instead, initialize the transcriber before the experiment
-        begins by calling this function with `audioClip=None`.
+        begins by calling this function with `audioClip=None`, or pass
+        `wait=False` to transcribe in a separate process.
 
         Parameters
         ----------
@@ -1050,11 +1051,19 @@ class AudioClip:
             Additional configuration options for the specified engine. These
             are specified using a dictionary (ex. `config={'pfilter': 1}` will
             enable the profanity filter when using the `'google'` engine).
+        wait : bool
+            Wait for the transcription to complete. If `False`, the clip is
+            queued to be transcribed in a separate process (see
+            :func:`~psychopy.sound.transcribe.submitAsync`) and a future is
+            returned right away. The experiment must then be run from within
+            an ``if __name__ == '__main__':`` block, as the process imports
+            the experiment's script when it starts.
 
         Returns
         -------
-        :class:`~psychopy.sound.transcribe.TranscriptionResult`
-            Transcription result.
+        :class:`~psychopy.sound.transcribe.TranscriptionResult` or Future
+            Transcription result, or a `concurrent.futures.Future` which
+            resolves to it if `wait` is `False`.
 
         Notes
         -----
@@ -1079,8 +1088,20 @@ class AudioClip:
         # avoid circular import
         from psychopy.sound.transcribe import (
             getActiveTranscriber,
+            getTranscriptionWorker,
             setupTranscriber)
 
+        if not wait:
+            # the worker loads its own transcriber, the active one if any
+            worker = getTranscriptionWorker(
+                None if getActiveTranscriber() is not None else engine,
+                config=config)
+            return worker.submit(
+                self,
+                language=language,
+                expectedWords=expectedWords,
+                config=config)
+
         # get the active transcriber
         transcriber = getActiveTranscriber()
         if transcriber is None:
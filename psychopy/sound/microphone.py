@@ -270,7 +270,11 @@ class Microphone:
             transcribe using that engine, or set as `False` to not transcribe.
         kwargs : dict
             Additional keyword arguments to pass to
-            :class:`~psychopy.sound.AudioClip.transcribe()`.
+            :class:`~psychopy.sound.AudioClip.transcribe()`. Pass `wait=False`
+            to transcribe in a separate process, `lastScript` is then a
+            `concurrent.futures.Future` which resolves to the transcription.
+            Passing it to `ExperimentHandler.addData` fills in the value when
+            the transcription completes.
 
         """
         # make sure the tag exists in both clips and transcripts dicts
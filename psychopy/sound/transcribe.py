@@ -21,13 +21,20 @@ __all__ = [
     'setupTranscriber',
     'getActiveTranscriber',
     'getActiveTranscriberEngine',
-    'submit'
+    'submit',
+    'TranscriptionWorker',
+    'getTranscriptionWorker',
+    'submitAsync',
+    'stopTranscriptionWorker'
 ]
 
 import importlib
 import json
 import sys
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import psychopy.logging as logging
 from psychopy.alerts import alert
 from pathlib import Path
@@ -942,6 +949,324 @@ def submit(audioClip, config=None):
     return _activeTranscriber.transcribe(audioClip, config=config)
 
 
+# ------------------------------------------------------------------------------
+# Transcribing in a separate process
+#
+# Transcription takes a while and blocks the thread which calls it, so it can
+# be handed off to a worker process instead. The worker sets up its own
+# transcriber interface when it starts, so the model is loaded once and used
+# for every clip submitted to it.
+#
+
+def _transcriberPath(transcriber):
+    """Get the path to the class of a transcriber interface, which can be
+    passed to `setupTranscriber()` to setup the same interface in another
+    process.
+    """
+    cls = type(transcriber)
+    return "{}:{}".format(cls.__module__, cls.__qualname__)
+
+
+def _setupWorkerTranscriber(engine, config):
+    """Setup the transcriber interface of a worker process. Called once when
+    the worker process starts.
+    """
+    setupTranscriber(engine, config=config)
+
+
+def _workerTranscribe(samples, sampleRateHz, kwargs):
+    """Transcribe audio samples using the transcriber interface of a worker
+    process.
+    """
+    audioClip = AudioClip(samples, sampleRateHz)
+
+    return getActiveTranscriber().transcribe(audioClip, **kwargs)
+
+
+class TranscriptionWorker:
+    """Transcribe audio clips in a separate process.
+
+    Transcription blocks the thread it runs on, which would make the experiment
+    stall until it completes. A worker runs a transcriber interface in its own
+    process instead. Clips submitted to it are queued and transcribed in the
+    order they are submitted, while the experiment carries on. The transcriber
+    is setup once when the worker process starts, so the model is only loaded
+    once.
+
+    Users usually do not create instances of this class themselves, use
+    `submitAsync()` which runs clips on a worker with the same interface as the
+    active transcriber.
+
+    The worker process is always started fresh ("spawn"), rather than forked
+    from the experiment, which may already have audio threads and an OpenGL
+    context. It imports the experiment's script as a module when it starts,
+    so the experiment must be run from within an
+    ``if __name__ == '__main__':`` block (as in scripts compiled by Builder),
+    otherwise the worker would run the experiment again.
+
+    Parameters
+    ----------
+    engine : str or None
+        Name of the transcriber interface to use, or a path to the backend
+        class (e.g. `psychopy_whisper.transcribe:WhisperTranscriber`). If
+        `None`, the same interface and configuration as the active transcriber
+        is used.
+    config : dict or None
+        Options to configure the speech-to-text engine during initialization.
+        Ignored if `engine` is `None`.
+
+    Examples
+    --------
+    Transcribe a recording without waiting for the result::
+
+        worker = TranscriptionWorker('whisper', config={'device': 'cuda'})
+        future = worker.submit(mic.getRecording())
+        ...  # run the next trial
+        result = future.result()  # waits if not done yet
+
+    """
+    def __init__(self, engine=None, config=None):
+        if engine is None:
+            transcriber = getActiveTranscriber()
+            if transcriber is None:
+                raise TranscriberNotSetupError(
+                    "No transcriber interface has been setup, call "
+                    "`setupTranscriber` or specify `engine`.")
+            engine = _transcriberPath(transcriber)
+            config = transcriber._initConf
+
+        self._engine = engine
+        self._config = config
+        self._nPending = 0
+        self._futures = set()  # submitted and not done yet
+        self._lock = threading.Lock()
+
+        # a single process so clips are done in order with one model loaded
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_setupWorkerTranscriber,
+            initargs=(engine, config))
+
+    @property
+    def engine(self):
+        """Name of (or path to) the transcriber interface used by the worker
+        (`str`).
+        """
+        return self._engine
+
+    @property
+    def pending(self):
+        """Number of clips submitted which have not been transcribed yet
+        (`int`).
+        """
+        return self._nPending
+
+    @property
+    def isRunning(self):
+        """`True` until `shutdown()` is called (`bool`)."""
+        return self._executor is not None
+
+    def _onDone(self, future):
+        with self._lock:
+            self._nPending -= 1
+            self._futures.discard(future)
+
+    def submit(self, audioClip, callback=None, **kwargs):
+        """Queue an audio clip for transcription.
+
+        Parameters
+        ----------
+        audioClip : :class:`~psychopy.sound.AudioClip` or tuple
+            Audio clip containing speech to transcribe. Can be either an
+            :class:`~psychopy.sound.AudioClip` object or tuple where the first
+            value is as a Nx1 or Nx2 array of audio samples (`ndarray`) and the
+            second the sample rate (`int`) in Hertz.
+        callback : callable or None
+            Function to call with the `TranscriptionResult` once the clip is
+            transcribed. It is called on a thread used by the worker to collect
+            results, not the one which submitted the clip, so keep it short.
+        **kwargs
+            Keyword arguments passed to the `transcribe()` method of the
+            transcriber interface (e.g. `language`, `expectedWords` and
+            `config`).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future which resolves to the `TranscriptionResult`. Calling its
+            `result()` method waits for the transcription to complete.
+
+        """
+        if not self.isRunning:
+            raise RuntimeError("Transcription worker has been shut down.")
+
+        if isinstance(audioClip, (tuple, list,)):
+            samples, sampleRateHz = audioClip
+        else:
+            samples, sampleRateHz = audioClip.samples, audioClip.sampleRateHz
+
+        with self._lock:
+            self._nPending += 1
+            future = self._executor.submit(
+                _workerTranscribe, samples, sampleRateHz, kwargs)
+            self._futures.add(future)
+        future.add_done_callback(self._onDone)
+
+        if callback is not None:
+            def _callback(f):
+                if f.cancelled() or f.exception() is not None:
+                    logging.error(
+                        "Transcription failed, callback not called: "
+                        "{}".format(f.exception() if not f.cancelled() else
+                                    "cancelled"))
+                    return
+                callback(f.result())
+
+            future.add_done_callback(_callback)
+
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop the worker process.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for all clips submitted to be transcribed. If `False`, clips
+            still waiting in the queue are cancelled.
+
+        """
+        if not self.isRunning:
+            return
+
+        if not wait:
+            # cancel clips not started yet (`cancel_futures` needs Python 3.9)
+            with self._lock:
+                futures = list(self._futures)
+            for future in futures:
+                future.cancel()
+
+        self._executor.shutdown(wait=wait)
+        self._executor = None
+
+
+# worker used by `submitAsync`, started on first use
+_transcriptionWorker = None
+
+
+def getTranscriptionWorker(engine=None, config=None):
+    """Get the worker used by `submitAsync()` to transcribe in a separate
+    process, starting it if needed.
+
+    Starting the worker process loads the model, so call this before any time
+    sensitive part of your experiment.
+
+    Parameters
+    ----------
+    engine : str or None
+        Name of the transcriber interface for the worker to use. If `None`,
+        the interface of the active transcriber is used, or the worker already
+        running if there is no active transcriber.
+    config : dict or None
+        Options to configure the speech-to-text engine, used if a new worker is
+        started for `engine`.
+
+    Returns
+    -------
+    TranscriptionWorker
+        Worker which clips are submitted to.
+
+    """
+    global _transcriptionWorker
+    if engine is None and _activeTranscriber is not None:
+        engine = _transcriberPath(_activeTranscriber)
+        config = _activeTranscriber._initConf
+
+    worker = _transcriptionWorker
+    if worker is not None and worker.isRunning:
+        if engine is None or engine == worker.engine:
+            return worker
+        logging.warning(
+            "Replacing transcription worker using `{}` with one using "
+            "`{}`".format(worker.engine, engine))
+        worker.shutdown()
+
+    logging.debug("Starting transcription worker for `{}`.".format(engine))
+    _transcriptionWorker = TranscriptionWorker(engine, config)
+
+    return _transcriptionWorker
+
+
+def submitAsync(audioClip, callback=None, **kwargs):
+    """Submit an audio clip for transcription without waiting for the result.
+
+    The clip is queued and transcribed in a separate process (see
+    `getTranscriptionWorker()`) using the same interface as the active
+    transcriber, so the experiment can carry on while it is transcribed.
+    The process imports the experiment's script when it starts, so the
+    experiment must be run from within an ``if __name__ == '__main__':``
+    block (see `TranscriptionWorker`).
+
+    Parameters
+    ----------
+    audioClip : :class:`~psychopy.sound.AudioClip` or tuple
+        Audio clip containing speech to transcribe. Can be either an
+        :class:`~psychopy.sound.AudioClip` object or tuple where the first value
+        is as a Nx1 or Nx2 array of audio samples (`ndarray`) and the second
+        the sample rate (`int`) in Hertz.
+    callback : callable or None
+        Function to call with the `TranscriptionResult` once the clip is
+        transcribed.
+    **kwargs
+        Keyword arguments passed to the `transcribe()` method of the
+        transcriber interface (e.g. `language`, `expectedWords` and `config`).
+
+    Returns
+    -------
+    concurrent.futures.Future
+        Future which resolves to the `TranscriptionResult`. It can be passed
+        to :meth:`~psychopy.data.ExperimentHandler.addData`, which fills in the
+        value once the transcription completes.
+
+    Examples
+    --------
+    Transcribe a response without stalling the next trial::
+
+        setupTranscriber('whisper')
+        getTranscriptionWorker()  # start the worker before the experiment
+        ...
+        thisExp.addData('mic.script', submitAsync(mic.getRecording()))
+
+    """
+    if _activeTranscriber is None and (
+            _transcriptionWorker is None or not _transcriptionWorker.isRunning):
+        raise TranscriberNotSetupError(
+            "No transcriber interface has been setup, call `setupTranscriber` "
+            "before calling `submitAsync`.")
+
+    return getTranscriptionWorker().submit(audioClip, callback=callback,
+                                           **kwargs)
+
+
+def stopTranscriptionWorker(wait=True):
+    """Stop the worker used by `submitAsync()`, if running.
+
+    Parameters
+    ----------
+    wait : bool
+        Wait for all clips submitted to be transcribed. If `False`, clips still
+        waiting in the queue are cancelled.
+
+    """
+    global _transcriptionWorker
+    if _transcriptionWorker is None:
+        return
+
+    _transcriptionWorker.shutdown(wait=wait)
+    _transcriptionWorker = None
+
+
 def transcribe(audioClip, engine='whisper', language='en-US', expectedWords=None,
                config=None):
     """Convert speech in audio to text.
@@ -4,6 +4,9 @@ from psychopy import data, logging
 import numpy as np
 import os, glob, shutil
 import io
+import pickle
+import time
+from concurrent.futures import Future
 from tempfile import mkdtemp
 
 from psychopy.tools.filetools import openOutputFile
@@ -100,6 +103,218 @@ class TestExperimentHandler():
             contents = f.read()
         assert contents == "thisRow.t,notes,mutable,\n,,[1],\n,,[9999],\n"
 
+    def test_streamWideText(self):
+        # entries should be on disk as soon as they're completed
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            streamWideText=True,
+            dataFileName=self.tmpDir + 'streamed'
+        )
+        fileName = exp.dataFileName + '.csv'
+        exp.addData('resp.keys', 'left')
+        exp.nextEntry()
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            assert f.read() == "thisRow.t,notes,resp.keys,\n,,left,\n"
+        # columns added late should be added to the header when saved
+        exp.addData('resp.keys', 'right')
+        exp.addData('resp.rt', 0.5)
+        exp.nextEntry()
+        exp.addData('text', 'a, b')
+        exp.nextEntry()
+        assert exp.saveAsWideText(fileName) == fileName
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,resp.keys,resp.rt,text,\n"
+            ",,left,,,\n"
+            ",,right,0.5,,\n"
+            ",,,,\"a, b\",\n"
+        )
+        # orphan entry should be written on close, without making a new file
+        exp.addData('extra', 1)
+        exp.close()
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,resp.keys,resp.rt,text,extra,\n"
+            ",,left,,,,\n"
+            ",,right,0.5,,,\n"
+            ",,,,\"a, b\",,\n"
+            ",,,,,1,\n"
+        )
+        assert not os.path.isfile(exp.dataFileName + '_1.csv')
+
+    def test_streamWideTextRowChanged(self):
+        # values added to entries which were already streamed shouldn't be lost
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            streamWideText=True,
+            dataFileName=self.tmpDir + 'streamedRows'
+        )
+        fileName = exp.dataFileName + '.csv'
+        for n in range(3):
+            exp.addData('n', n)
+            exp.nextEntry()
+        exp.addData('n', 'one', row=1)
+        exp.addData('late', 'two', row=-1)
+        assert exp.saveAsWideText(fileName) == fileName
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,n,late,\n"
+            ",,0,,\n"
+            ",,one,,\n"
+            ",,2,two,\n"
+        )
+        # rows streamed after the file was rewritten are kept
+        exp.addData('n', 3)
+        exp.nextEntry()
+        exp.addData('n', 'zero', row=0)
+        exp.close()
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,n,late,\n"
+            ",,zero,,\n"
+            ",,one,,\n"
+            ",,2,two,\n"
+            ",,3,,\n"
+        )
+
+    def test_futureData(self):
+        # values added as futures are filled in when they arrive, streamed rows
+        # are held back until then
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            streamWideText=True,
+            dataFileName=self.tmpDir + 'futures'
+        )
+        fileName = exp.dataFileName + '.csv'
+        futures = [Future() for n in range(3)]
+        for n, future in enumerate(futures):
+            exp.addData('n', n)
+            exp.addData('script', future)
+            exp.nextEntry()
+        futures[0].set_result('zero')
+        exp.addData('n', 3)
+        exp.nextEntry()
+        assert exp.entries[0]['script'] == 'zero'
+        assert exp.entries[1]['script'] == ''
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            assert f.read() == "thisRow.t,notes,n,script,\n,,0,zero,\n"
+        # a future which fails leaves the value blank
+        futures[1].set_exception(RuntimeError("failed"))
+        futures[2].set_result('two')
+        exp.close()
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == (
+            "thisRow.t,notes,n,script,\n"
+            ",,0,zero,\n"
+            ",,1,,\n"
+            ",,2,two,\n"
+            ",,3,,\n"
+        )
+
+    def test_futureDataTimeout(self):
+        # a future which never completes shouldn't stop the data being saved
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            streamWideText=True,
+            dataFileName=self.tmpDir + 'futureTimeout'
+        )
+        exp.pendingDataTimeout = 0.1
+        fileName = exp.dataFileName + '.csv'
+        exp.addData('n', 0)
+        exp.addData('script', Future())
+        exp.nextEntry()
+        exp.addData('n', 1)
+        exp.nextEntry()
+        t0 = time.time()
+        exp.close()
+        assert time.time() - t0 < 5
+        with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == "thisRow.t,notes,n,script,\n,,0,,\n,,1,,\n"
+
+    def test_columnar(self):
+        # columnar storage should give the same data as storing dicts
+        handlers = {}
+        for columnar in (False, True):
+            exp = handlers[columnar] = data.ExperimentHandler(
+                name='testExp',
+                savePickle=False,
+                saveWideText=False,
+                columnar=columnar,
+                dataFileName=self.tmpDir + 'columnar%s' % columnar
+            )
+            mutant = [1]
+            for n in range(200):
+                exp.addData('n', n)
+                exp.addData('rt', n / 10)
+                exp.addData('correct', n % 2 == 0)
+                exp.addData('mutable', mutant)
+                mutant[0] = n
+                if n % 3:
+                    exp.addData('sometimes', 'a, b')
+                if n > 100:
+                    # column changes type partway through
+                    exp.addData('n', str(n))
+                exp.nextEntry()
+            exp.addData('orphan', 1)
+            # change a value in a previous entry
+            exp.addData('rt', 0.5, row=0)
+            exp.saveAsWideText(exp.dataFileName + '.csv', delim=',')
+        # compare wide text files
+        contents = []
+        for exp in handlers.values():
+            with io.open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+                contents.append(f.read())
+        assert contents[0] == contents[1]
+        # compare entries
+        assert handlers[False].getAllEntries() == handlers[True].getAllEntries()
+        # compare data frames
+        dfs = [exp.getDataFrame() for exp in handlers.values()]
+        assert list(dfs[0].columns) == list(dfs[1].columns)
+        assert dfs[1]['rt'].dtype == np.float64
+        assert dfs[1]['correct'].dtype == 'boolean'
+        assert dfs[1]['orphan'].dtype == 'Int64'
+        assert dfs[1]['orphan'].isna().sum() == 200
+        for name in ('n', 'rt', 'correct', 'sometimes'):
+            assert dfs[0][name].astype(str).tolist() == dfs[1][name].astype(str).tolist()
+
+    def test_unpickleOld(self):
+        # handlers saved before these attributes existed should still load
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=False,
+            dataFileName=self.tmpDir + 'unpickled'
+        )
+        exp.addData('resp.keys', 'left')
+        exp.nextEntry()
+        state = exp.__getstate__()
+        for name in ('_dataNameSet', 'streamWideText', '_wideTextStream',
+                     '_rowsStreamed', '_pendingData', 'wideTextChunkSize',
+                     'pendingDataTimeout'):
+            del state[name]
+        old = data.ExperimentHandler.__new__(data.ExperimentHandler)
+        old.__setstate__(pickle.loads(pickle.dumps(state)))
+        old.addData('resp.keys', 'right')
+        old.addData('resp.rt', 0.5)
+        old.nextEntry()
+        assert old.dataNames == ['thisRow.t', 'notes', 'resp.keys', 'resp.rt']
+        assert [entry['resp.keys'] for entry in old.entries] == ['left', 'right']
+        old.abort()
+
     def test_unicode_conditions(self):
         fileName = self.tmpDir + 'unicode_conds'
 
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Check ExperimentHandler.saveAsWideText writes the same file as the
+cell-by-cell writer it replaced, for large amounts of data. Run this file as a
+script to benchmark the two.
+"""
+
+import io
+import os
+import shutil
+import time
+from tempfile import mkdtemp
+
+import numpy as np
+import pytest
+
+from psychopy import data, logging
+
+
+def _cellByCellWideText(exp, fileName, delim=','):
+    """The previous implementation of ExperimentHandler.saveAsWideText,
+    writing one cell at a time.
+    """
+    names = exp._getWideTextNames()
+    with io.open(fileName, 'w', encoding='utf-8-sig') as f:
+        for heading in names:
+            f.write(u'%s%s' % (heading, delim))
+        f.write('\n')
+        for entry in exp.getAllEntries():
+            for name in names:
+                if name in entry:
+                    ename = str(entry[name])
+                    if ',' in ename or '\n' in ename:
+                        fmt = u'"%s"%s'
+                    else:
+                        fmt = u'%s%s'
+                    f.write(fmt % (entry[name], delim))
+                else:
+                    f.write(delim)
+            f.write('\n')
+
+
+def _makeExperiment(nRows):
+    rng = np.random.RandomState(seed=100)
+    exp = data.ExperimentHandler(
+        name='benchmark',
+        extraInfo={'participant': 'jwp', 'session': 1},
+        savePickle=False,
+        saveWideText=False,
+    )
+    for n in range(nRows):
+        exp.addData('thisRow.t', n * 2.5)
+        exp.addData('trial.ori', int(rng.randint(0, 360)))
+        exp.addData('resp.keys', rng.choice(['left', 'right']))
+        exp.addData('resp.rt', float(rng.rand()))
+        exp.addData('resp.corr', bool(rng.rand() > 0.5))
+        exp.addData('stim.pos', (float(rng.rand()), float(rng.rand())))
+        for col in range(20):
+            exp.addData('extra%i' % col, float(rng.rand()))
+        if n % 10 == 0:
+            exp.addData('notes', 'block start, take a break')
+        exp.nextEntry()
+    return exp
+
+
+def _compareWideText(nRows, tmpDir):
+    """Save the same data with the cell-by-cell writer and saveAsWideText,
+    returning the contents of each file and the time each took to save.
+    """
+    exp = _makeExperiment(nRows)
+    oldName = os.path.join(tmpDir, 'cellByCell.csv')
+    newName = os.path.join(tmpDir, 'columnWise.csv')
+
+    t0 = time.perf_counter()
+    _cellByCellWideText(exp, oldName)
+    oldTime = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    exp.saveAsWideText(newName, fileCollisionMethod='overwrite')
+    newTime = time.perf_counter() - t0
+
+    with io.open(oldName, 'r', encoding='utf-8-sig') as f:
+        old = f.read()
+    with io.open(newName, 'r', encoding='utf-8-sig') as f:
+        new = f.read()
+
+    return old, new, oldTime, newTime
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("nRows", [10000, 100000])
+def test_wideTextExport(nRows):
+    tmpDir = mkdtemp(prefix='psychopy-tests-wideText')
+    level = logging.console.level
+    logging.console.setLevel(logging.WARNING)
+    try:
+        old, new, _, _ = _compareWideText(nRows, tmpDir)
+        # output should be identical
+        assert new == old
+    finally:
+        logging.console.setLevel(level)
+        shutil.rmtree(tmpDir)
+
+
+if __name__ == '__main__':
+    # run as a script to report the speed-up
+    logging.console.setLevel(logging.WARNING)
+    for nRows in (10000, 100000):
+        tmpDir = mkdtemp(prefix='psychopy-tests-wideText')
+        try:
+            _, _, oldTime, newTime = _compareWideText(nRows, tmpDir)
+        finally:
+            shutil.rmtree(tmpDir)
+        print(
+            "saveAsWideText, %i rows: cell by cell %.3fs, column wise "
+            "%.3fs (%.1fx faster)" % (nRows, oldTime, newTime, oldTime / newTime)
+        )
@@ -0,0 +1,108 @@
+"""Test recording with the camera, using the virtual camera so no hardware is
+needed.
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from psychopy.hardware.camera import (
+    Camera, CameraInterfaceVirtual, CameraNotFoundError, getAllCameraInterfaces)
+from psychopy.visual.movies.frame import MovieFrame
+
+
+def recordFor(cam, secs):
+    cam.record()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < secs:
+        cam.update()
+        time.sleep(0.005)
+    cam.stop()
+
+
+def test_virtualCameraRegistered():
+    assert 'CameraInterfaceVirtual' in getAllCameraInterfaces()
+    cameras = Camera.getCameras(cameraLib='virtual')
+    formats = cameras[CameraInterfaceVirtual.PATTERN]
+    assert all(cam.cameraLib == 'virtual' for cam in formats)
+    assert any(cam.frameSize == (1280, 720) for cam in formats)
+
+
+def test_virtualPattern():
+    cam = Camera(None, cameraLib='virtual', frameRate=60, frameSize=(160, 120))
+    cam.open()
+    try:
+        recordFor(cam, 0.5)
+        frames = cam._captureFrames
+        # frames arrive at the frame rate, with timestamps to match
+        assert 20 <= len(frames) <= 32
+        frameIndices = np.array([frame.frameIndex for frame in frames])
+        pts = np.array([frame.absTime for frame in frames])
+        assert np.all(np.diff(frameIndices) >= 1)
+        assert np.allclose(pts, frameIndices / 60.0)
+        assert frames[-1].colorData.size == 160 * 120 * 3
+        assert cam.lastFrame is frames[-1]
+
+        # frames are kept across recordings until they're saved
+        nFrames = len(frames)
+        recordFor(cam, 0.1)
+        assert len(cam._captureFrames) > nFrames
+    finally:
+        cam.close()
+
+
+def test_virtualFileNotFound():
+    cam = Camera('noSuchFile.mp4', cameraLib='virtual')
+    with pytest.raises(CameraNotFoundError):
+        cam.open()
+
+
+def test_livePtsIncrease():
+    class FrameWriter:
+        pts = []
+
+        def addFrame(self, colorData, pts=None):
+            self.pts.append(pts)
+
+    cam = Camera(None, cameraLib='virtual', frameRate=30, frameSize=(32, 24),
+                 liveEncode=True)
+    cam._movieWriter = FrameWriter()
+    # some camera libraries give every frame the same timestamp
+    for absTime in (5.0, 5.1, 5.1, 5.0, 5.5):
+        frame = MovieFrame(absTime=absTime, colorData=np.zeros((24, 32, 3)))
+        cam._writeFrame(frame)
+    assert np.allclose(
+        FrameWriter.pts, [0.0, 0.1, 0.1 + 1 / 30, 0.1 + 2 / 30, 0.5])
+
+
+@pytest.mark.parametrize("liveEncode", [False, True])
+def test_save(tmp_path, liveEncode):
+    pytest.importorskip("ffpyplayer")
+
+    cam = Camera(None, cameraLib='virtual', frameRate=30, frameSize=(320, 240),
+                 liveEncode=liveEncode, maxQueueSize=4)
+    cam.open()
+    try:
+        recordFor(cam, 1.0)
+        if liveEncode:
+            # frames were passed to the writer rather than kept
+            assert cam._captureFrames == []
+            liveVideoFile = cam._liveVideoFile
+            nFrames = cam._liveFrameCount
+        # recording again adds to the unsaved recording
+        recordFor(cam, 0.5)
+        if liveEncode:
+            assert cam._liveVideoFile == liveVideoFile
+            assert cam._liveFrameCount > nFrames
+        filename = str(tmp_path / 'test.mp4')
+        cam.save(filename)
+        assert os.path.getsize(filename) > 0
+        assert cam.lastClip == filename
+        assert cam.framesDropped == 0
+    finally:
+        cam.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
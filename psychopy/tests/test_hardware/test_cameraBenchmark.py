@@ -0,0 +1,80 @@
+"""Check recording from the virtual camera while encoding frames to disk only
+holds the frames waiting to be encoded in memory. Run this file as a script to
+benchmark how many frames are captured, encoded and dropped.
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pytest
+
+from psychopy.hardware.camera import Camera
+
+
+def _recordLive(filename, queuePolicy, secs=10.0):
+    """Record 1080p30 from the virtual camera with live encoding, returning
+    the camera and a dict of measurements.
+    """
+    cam = Camera(None, cameraLib='virtual', frameRate=30,
+                 frameSize=(1920, 1080), liveEncode=True,
+                 queuePolicy=queuePolicy)
+    cam.open()
+    try:
+        tracemalloc.start()
+        cam.record()
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < secs:
+            cam.update()
+            time.sleep(1.0 / 60.0)  # roughly a screen refresh
+        framesCaptured = cam.frameCount
+        t1 = time.perf_counter()
+        cam.stop()
+        stopTime = time.perf_counter() - t1
+        _, peakMemory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        t1 = time.perf_counter()
+        cam.save(filename)
+        saveTime = time.perf_counter() - t1
+    finally:
+        cam.close()
+
+    return cam, {
+        'framesCaptured': framesCaptured,
+        'peakMemory': peakMemory,
+        'stopTime': stopTime,
+        'saveTime': saveTime}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("queuePolicy", ['block', 'drop'])
+def test_cameraLiveEncode(tmp_path, queuePolicy):
+    pytest.importorskip("ffpyplayer")
+
+    filename = str(tmp_path / 'test.mp4')
+    cam, results = _recordLive(filename, queuePolicy)
+    assert results['framesCaptured'] > 0
+    assert os.path.getsize(filename) > 0
+    if queuePolicy == 'block':
+        assert cam.framesDropped == 0
+    # at most the queue of frames is held in memory, not the recording
+    frameBytes = 1920 * 1080 * 3
+    assert results['peakMemory'] < frameBytes * 30 * 3
+
+
+if __name__ == '__main__':
+    # run as a script to report frames captured and dropped, and timings
+    secs = 10.0
+    for queuePolicy in ('block', 'drop'):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'test.mp4')
+            cam, results = _recordLive(filename, queuePolicy, secs)
+            fileSize = os.path.getsize(filename)
+        print("Virtual camera 1080p30, live encoding for %gs (%s):" % (
+            secs, queuePolicy))
+        print("%i frames captured, %i dropped, %.1f MB peak memory" % (
+            results['framesCaptured'], cam.framesDropped,
+            results['peakMemory'] / 1e6))
+        print("stop() %.2fs, save() %.3fs, %.1f MB file" % (
+            results['stopTime'], results['saveTime'], fileSize / 1e6))
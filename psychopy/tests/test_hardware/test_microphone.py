@@ -0,0 +1,94 @@
+"""Test the recording buffer used by the microphone, no hardware is needed.
+"""
+import numpy as np
+import pytest
+
+from psychopy.hardware.microphone import RecordingBuffer
+from psychopy.sound.exceptions import AudioRecordingBufferFullError
+
+
+def makeBuffer(policyWhenFull):
+    # 4 KB of mono float32 samples holds 1000 samples, or 1s at 1 kHz
+    return RecordingBuffer(sampleRateHz=1000, channels=1, maxRecordingSize=4,
+                           policyWhenFull=policyWhenFull)
+
+
+def ramp(start, n):
+    """Samples with values equal to their position in the recording, scaled to
+    stay within the range of an audio clip."""
+    return (np.arange(start, start + n, dtype=np.float32) / 1e4)[:, None]
+
+
+def test_rollingBuffer():
+    buffer = makeBuffer('roll')
+    assert buffer.totalSamples == 1000
+    samples = buffer.samples
+
+    # write 2.5s in uneven chunks, wrapping around twice
+    written = 0
+    for n in [300, 450, 600, 1, 1149]:
+        assert buffer.write(ramp(written, n)) == 0
+        written += n
+    assert buffer.samplesRecorded == 2500
+    assert buffer.loopCount == 2
+    assert buffer.writeOffset == 500
+    # the buffer is never reallocated
+    assert buffer.samples is samples
+
+    # only the last second is kept, earlier times are clipped
+    assert np.array_equal(buffer.getSamples(), ramp(1500, 1000))
+    assert np.array_equal(buffer.getSamples(0, 1.8), ramp(1500, 300))
+    # times are absolute through wrap-arounds
+    assert np.array_equal(buffer.getSamples(2.1, 2.3), ramp(2100, 200))
+
+    # a contiguous segment is a view, one across the wrap is joined up
+    assert buffer.getSamples(2.1, 2.3).base is samples
+    assert buffer.getSamples(1.9, 2.1).base is not samples
+    assert np.array_equal(buffer.getSamples(1.9, 2.1), ramp(1900, 200))
+
+    # clips don't change when the buffer is written to
+    clip = buffer.getSegment(2.1, 2.3)
+    assert clip.duration == pytest.approx(0.2)
+    buffer.write(ramp(written, 1000))
+    assert np.array_equal(clip.samples, ramp(2100, 200))
+
+    # writing more than the buffer holds keeps the newest samples
+    buffer.write(ramp(0, 2200))
+    assert buffer.samplesRecorded == 5700
+    assert np.array_equal(buffer.getSamples(), ramp(1200, 1000))
+
+    buffer.clear()
+    assert buffer.samples is samples
+    assert buffer.samplesRecorded == 0
+    assert buffer.loopCount == 0
+    assert len(buffer.getSamples()) == 0
+
+
+def test_fullBuffer():
+    buffer = makeBuffer('ignore')
+    assert buffer.write(ramp(0, 800)) == 0
+    assert buffer.write(ramp(800, 400)) > 0
+    assert buffer.isFull
+    assert buffer.write(ramp(1200, 10)) == 10
+    # recording stops where the buffer filled
+    assert buffer.samplesRecorded == 1000
+    assert np.array_equal(buffer.getSamples(), ramp(0, 1000))
+
+    buffer = makeBuffer('error')
+    buffer.write(ramp(0, 1000))
+    with pytest.raises(AudioRecordingBufferFullError):
+        buffer.write(ramp(1000, 1))
+
+
+def test_seek():
+    buffer = makeBuffer('roll')
+    buffer.write(ramp(0, 100))
+    buffer.seek(0, absolute=True)
+    assert buffer.writeOffset == 0
+    assert buffer.samplesRecorded == 0
+    buffer.seek(10)
+    assert buffer.writeOffset == 10
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
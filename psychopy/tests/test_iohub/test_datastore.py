@@ -0,0 +1,99 @@
+""" Test writing events to the ioHub DataStore file, without starting the
+ioHub server.
+"""
+import pytest
+
+tables = pytest.importorskip("tables")
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.errors import ioHubError
+from psychopy.iohub.devices.mouse import MouseMoveEvent
+from psychopy.iohub.datastore import DataStoreFile
+
+
+def makeDataStore(folder, **settings):
+    """Create a DataStoreFile with a table for mouse move events, and an
+    active experiment and session.
+    """
+    EventConstants.addClassMappings(
+        [MouseMoveEvent.EVENT_TYPE_ID], {'MouseMoveEvent': MouseMoveEvent})
+    settings.setdefault('multiple_sessions', False)
+    dsfile = DataStoreFile('events.hdf5', str(folder), 'w', settings)
+    dsfile.updateDataStoreStructure(
+        MouseMoveEvent.PARENT_DEVICE, {'MouseMoveEvent': MouseMoveEvent})
+    dsfile.active_experiment_id = 1
+    dsfile.active_session_id = 1
+    return dsfile
+
+
+def makeEvent(event_id, time):
+    """A mouse move event, as a list of values in field order."""
+    event = [0] * len(MouseMoveEvent.NUMPY_DTYPE.names)
+    event[MouseMoveEvent.EVENT_ID_INDEX] = event_id
+    event[MouseMoveEvent.EVENT_TYPE_ID_INDEX] = MouseMoveEvent.EVENT_TYPE_ID
+    event[MouseMoveEvent.EVENT_HUB_TIME_INDEX] = time
+    return event
+
+
+def getTable(dsfile):
+    return dsfile.TABLES[MouseMoveEvent.IOHUB_DATA_TABLE]
+
+
+def test_buffered_events(tmp_path):
+    dsfile = makeDataStore(tmp_path, buffer_rows=10, buffer_interval=60.0)
+    tablePath = getTable(dsfile)._v_pathname
+    try:
+        for i in range(25):
+            dsfile._handleEvent(makeEvent(i, i * 0.001))
+        # only complete blocks of events should have been written...
+        assert getTable(dsfile).nrows == 20
+        # ...the rest once flushed
+        dsfile.flush()
+        table = getTable(dsfile)
+        assert table.nrows == 25
+        assert list(table.col('event_id')) == list(range(25))
+        assert set(table.col('experiment_id')) == {1}
+        dsfile._handleEvents([makeEvent(i, i * 0.001) for i in range(25, 30)])
+        assert getTable(dsfile).nrows == 25
+    finally:
+        dsfile.close()
+    # closing should write everything still staged
+    with tables.open_file(str(tmp_path / 'events.hdf5')) as f:
+        table = f.get_node(tablePath)
+        assert list(table.col('event_id')) == list(range(30))
+
+
+def test_buffer_interval(tmp_path):
+    dsfile = makeDataStore(tmp_path, buffer_rows=100, buffer_interval=0.0)
+    try:
+        # events which have waited long enough should be written straight away
+        dsfile._handleEvent(makeEvent(0, 0.0))
+        assert getTable(dsfile).nrows == 1
+        dsfile.bufferInterval = 60.0
+        dsfile._eventBuffers.clear()
+        dsfile._handleEvent(makeEvent(1, 0.1))
+        assert dsfile.writeEventBuffers(force=False) == 0
+        assert dsfile.writeEventBuffers(force=True) == 1
+    finally:
+        dsfile.close()
+
+
+def test_unbuffered_and_time_order(tmp_path):
+    dsfile = makeDataStore(tmp_path, buffer_rows=0)
+    try:
+        dsfile._handleEvent(makeEvent(0, 0.0))
+        assert getTable(dsfile).nrows == 1
+    finally:
+        dsfile.close()
+
+    dsfile = makeDataStore(tmp_path, buffer_rows=10, buffer_order='time')
+    try:
+        times = [0.3, 0.1, 0.2]
+        for i, t in enumerate(times):
+            dsfile._handleEvent(makeEvent(i, t))
+        dsfile.flush()
+        assert list(getTable(dsfile).col('event_id')) == [1, 2, 0]
+    finally:
+        dsfile.close()
+    with pytest.raises(ioHubError):
+        makeDataStore(tmp_path, buffer_order='random')
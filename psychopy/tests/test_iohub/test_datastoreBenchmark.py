@@ -0,0 +1,48 @@
+"""Check the ioHub DataStore saves every event of a long stream, with events
+staged and appended in blocks or appended as they arrive. Run this file as a
+script to benchmark the number of events per second each can save.
+"""
+import tempfile
+import time
+
+import pytest
+
+pytest.importorskip("tables")
+
+from psychopy.tests.test_iohub.test_datastore import (
+    makeDataStore, makeEvent, getTable)
+
+
+def _eventsPerSecond(folder, nEvents, **settings):
+    dsfile = makeDataStore(folder, **settings)
+    try:
+        events = [makeEvent(i, i * 0.001) for i in range(nEvents)]
+        t0 = time.perf_counter()
+        for event in events:
+            dsfile._handleEvent(event)
+        dsfile.flush()
+        duration = time.perf_counter() - t0
+        assert getTable(dsfile).nrows == nEvents
+    finally:
+        dsfile.close()
+    return nEvents / duration
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("bufferRows", [0, 64, 256, 1024])
+def test_datastoreEvents(tmp_path, bufferRows):
+    # every event is saved, whole blocks or not
+    _eventsPerSecond(tmp_path, 20000, buffer_rows=bufferRows,
+                     buffer_interval=60.0)
+
+
+if __name__ == '__main__':
+    # run as a script to report the events per second sustained
+    nEvents = 20000
+    print("DataStoreFile, %i mouse events:" % nEvents)
+    print("%12s %12s" % ("buffer_rows", "events/sec"))
+    for bufferRows in (0, 64, 256, 1024):
+        with tempfile.TemporaryDirectory() as folder:
+            rate = _eventsPerSecond(folder, nEvents, buffer_rows=bufferRows,
+                                    buffer_interval=60.0)
+        print("%12i %12.0f" % (bufferRows, rate))
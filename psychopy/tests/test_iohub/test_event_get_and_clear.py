@@ -4,6 +4,8 @@
 import pytest
 from psychopy.tests import skip_under_vm
 from psychopy.tests.test_iohub.testutil import startHubProcess, stopHubProcess, getTime
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices.experiment import MessageEvent
 
 @skip_under_vm
 def testGetEvents():
@@ -92,3 +94,74 @@ def testAllBuffersClear():
     assert len(exp_events) == 0
 
     stopHubProcess()
+
+@skip_under_vm
+def testGetEventsAsNumpy():
+    """
+    """
+    io = startHubProcess()
+
+    exp = io.devices.experiment
+    for i in range(100):
+        io.sendMessageEvent("Message %d" % i, category="NUMPY")
+
+    events = io.getEvents(as_type='numpy')
+    assert list(events.keys()) == [EventConstants.MESSAGE]
+    messages = events[EventConstants.MESSAGE]
+    assert len(messages) == 100
+    assert messages.dtype == MessageEvent.NUMPY_DTYPE
+    assert messages['text'][0] == b"Message 0"
+    assert messages['text'][-1] == b"Message 99"
+    assert set(messages['category']) == {b"NUMPY"}
+
+    assert io.getEvents(as_type='numpy') == {}
+
+    messages = exp.getEvents(as_type='numpy')[EventConstants.MESSAGE]
+    assert len(messages) == 100
+    assert list(messages['event_id']) == sorted(messages['event_id'])
+
+    stopHubProcess()
+
+@skip_under_vm
+def testGetEventsAsNumpyNonAscii():
+    """
+    """
+    io = startHubProcess()
+
+    exp = io.devices.experiment
+    texts = ["Größe", "Message 1", "日本語" * 50]
+    for text in texts:
+        io.sendMessageEvent(text, category="Ä")
+
+    # none of the events are lost
+    messages = io.getEvents(as_type='numpy')[EventConstants.MESSAGE]
+    assert len(messages) == 3
+    decoded = [t.decode('utf-8') for t in messages['text']]
+    assert decoded[:2] == texts[:2]
+    # long text is cut to the field, at a whole character
+    assert texts[2].startswith(decoded[2])
+    assert len(decoded[2].encode('utf-8')) > 120
+    assert messages['category'][0].decode('utf-8') == "Ä"
+
+    messages = exp.getEvents(as_type='numpy')[EventConstants.MESSAGE]
+    assert messages['text'][0].decode('utf-8') == "Größe"
+
+    stopHubProcess()
+
+
+def testLogEventArray(monkeypatch):
+    # logged text is str, as for events in list form, not bytes
+    from psychopy.iohub import client
+    from psychopy.iohub.devices.experiment import LogEvent
+    EventConstants.addClassMappings(
+        [LogEvent.EVENT_TYPE_ID], {'LogEvent': LogEvent})
+    event = [0] * len(LogEvent.CLASS_ATTRIBUTE_NAMES)
+    event[LogEvent.CLASS_ATTRIBUTE_NAMES.index('time')] = 1.5
+    event[-2:] = [LogEvent.WARNING, "Größe"]
+    logEvents = LogEvent.createEventsAsArray([event])
+    logged = []
+    monkeypatch.setattr(client.psycho_logging, 'log',
+                        lambda *args: logged.append(args))
+    client._logEventArray(logEvents)
+    assert logged == [("Größe", LogEvent.WARNING, 1.5)]
+    assert [type(value) for value in logged[0]] == [str, int, float]
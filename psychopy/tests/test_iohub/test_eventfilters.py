@@ -0,0 +1,128 @@
+""" Test the ioHub event field filters, adding events one at a time and in
+blocks.
+"""
+import copy
+
+import numpy as np
+import pytest
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import eventfilters
+from psychopy.iohub.devices.eyetracker.eye_events import MonocularEyeSampleEvent
+from psychopy.iohub.util import NumPyRingBuffer
+
+filterSettings = [
+    (eventfilters.PassThroughFilter, {}),
+    (eventfilters.MovingWindowFilter, {'length': 5, 'knot_pos': 'center'}),
+    (eventfilters.MovingWindowFilter, {'length': 4, 'knot_pos': 'latest'}),
+    (eventfilters.MedianFilter, {'length': 3, 'knot_pos': 0}),
+    (eventfilters.MedianFilter, {'length': 5, 'knot_pos': 'oldest'}),
+    (eventfilters.WeightedAverageFilter, {'weights': (25, 50, 25),
+                                          'knot_pos': 'center'}),
+    (eventfilters.StampFilter, {'level': 1}),
+    (eventfilters.StampFilter, {}),
+    (eventfilters.StampFilter, {'level': 3}),
+]
+
+
+def makeEvents(n):
+    EventConstants.addClassMappings(
+        [MonocularEyeSampleEvent.EVENT_TYPE_ID],
+        {'MonocularEyeSampleEvent': MonocularEyeSampleEvent})
+    fieldIndex = MonocularEyeSampleEvent.CLASS_ATTRIBUTE_NAMES.index('gaze_x')
+    rng = np.random.RandomState(seed=7)
+    events = []
+    for i in range(n):
+        event = [0] * len(MonocularEyeSampleEvent.CLASS_ATTRIBUTE_NAMES)
+        event[3] = i
+        event[fieldIndex] = float(rng.randint(0, 5)) + rng.rand()
+        events.append(event)
+    return events, fieldIndex
+
+
+def test_ring_buffer_extend():
+    appended = NumPyRingBuffer(5)
+    extended = NumPyRingBuffer(5)
+    for values in ([1, 2], [3], [4, 5, 6, 7], list(range(8, 20))):
+        for v in values:
+            appended.append(v)
+        extended.extend(values)
+        assert len(extended) == len(appended)
+        assert list(extended.copy()) == list(appended.copy())
+
+
+def test_stampe_filter():
+    stampe = eventfilters.StampFilter(level=1)
+    results = [stampe.add(v) for v in (1.0, 2.0, 3.0, 1.0, 2.0)]
+    # monotonic values are left alone, others replaced by their neighbours'
+    # average
+    assert results[:2] == [None, None]
+    assert [value for _, value in results[2:]] == [2.0, 1.5, 2.5]
+    # the level defaults to 1
+    assert eventfilters.StampFilter()._level == 1
+
+
+def test_stampe_filter_levels():
+    # each level filters the output of the level below
+    values = [1.0, 3.0, 2.0, 5.0, 4.0, 4.0, 6.0]
+    stampe = eventfilters.StampFilter(level=2)
+    results = [stampe.add(v) for v in values]
+    # level 1 gives 1.5, 4.0, 3.0, 4.5, 5.0
+    assert results[:4] == [None] * 4
+    assert [value for _, value in results[4:]] == [2.25, 4.25, 4.5]
+    # clearing clears every level, so the windows fill from scratch
+    stampe.clear()
+    assert [stampe.add(v) for v in values[:4]] == [None] * 4
+
+
+def test_weighted_average_filter():
+    weighted = eventfilters.WeightedAverageFilter(weights=(1, 2, 1),
+                                                  knot_pos='center')
+    results = [weighted.add(v) for v in (1.0, 2.0, 10.0, 11.0)]
+    # a value for each window rather than a one element array
+    assert [value for _, value in results[2:]] == [3.75, 8.25]
+    assert np.ndim(results[-1][1]) == 0
+
+
+@pytest.mark.parametrize("filterClass, kwargs", filterSettings)
+def test_add_many(filterClass, kwargs):
+    events, fieldIndex = makeEvents(200)
+    for inplace in (True, False):
+        single = filterClass(event_type=MonocularEyeSampleEvent.EVENT_TYPE_ID,
+                             event_field_name='gaze_x', inplace=inplace,
+                             **kwargs)
+        batch = filterClass(event_type=MonocularEyeSampleEvent.EVENT_TYPE_ID,
+                            event_field_name='gaze_x', inplace=inplace,
+                            **kwargs)
+        singleEvents = copy.deepcopy(events)
+        batchEvents = copy.deepcopy(events)
+
+        singleResults = [single.add(e) for e in singleEvents]
+        singleResults = [r for r in singleResults if r]
+        batchResults = []
+        # blocks of various sizes, including ones smaller than the window
+        start = 0
+        for size in (1, 2, 0, 7, 1, 50, 3, 200):
+            batchResults.extend(batch.addMany(batchEvents[start:start + size]))
+            start += size
+
+        assert len(batchResults) == len(singleResults)
+        for (singleEvent, singleValue), (batchEvent, batchValue) in zip(
+                singleResults, batchResults):
+            assert singleEvent[3] == batchEvent[3]
+            assert singleValue == batchValue
+        assert singleEvents == batchEvents
+        # carrying on one at a time should give the same results
+        event = [0] * len(events[0])
+        event[fieldIndex] = 2.5
+        assert single.add(list(event))[1] == batch.add(list(event))[1]
+
+    # values rather than events
+    values = [e[fieldIndex] for e in events]
+    single = filterClass(**kwargs)
+    batch = filterClass(**kwargs)
+    singleValues = [single.add(v) for v in values]
+    singleValues = [r[1] for r in singleValues if r]
+    batchValues = [r[1] for r in batch.addMany(values[:10])]
+    batchValues += [r[1] for r in batch.addMany(np.asarray(values[10:]))]
+    assert singleValues == batchValues
@@ -0,0 +1,182 @@
+""" Test parsing eye events from samples saved to an ioHub DataStore file,
+without starting the ioHub server.
+"""
+import numpy as np
+import pytest
+
+tables = pytest.importorskip("tables")
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import eventfilters
+from psychopy.iohub.devices.eyetracker import eye_events
+from psychopy.iohub.devices.eyetracker.filters.parser import (
+    EyeSampleBatchParser, adaptiveVelocityThreshold, filterArray)
+from psychopy.iohub.datastore import DataStoreFile
+from psychopy.iohub.datastore.util import ExperimentDataAccessUtility
+
+SampleEvent = eye_events.BinocularEyeSampleEvent
+
+
+def makeSamples(rate=1000.0):
+    """Binocular samples of fixations on a row of targets, with a saccade
+    between each one and a blink part way through.
+
+    Gives samples of FIX SAC FIX SAC FIX MIS FIX SAC FIX.
+    """
+    x = []
+    blink = []
+    for target in range(4):
+        fixation = [target * 300.0] * 500
+        if target == 2:
+            blink.append((len(x) + 250, len(x) + 350))
+        x.extend(fixation)
+        if target < 3:
+            x.extend(np.linspace(target * 300.0, (target + 1) * 300.0, 32)[1:-1])
+    n = len(x)
+    t = np.arange(n) / rate
+    # a little movement during fixations, without outliers which would
+    # look like saccades
+    x = np.array(x) + 0.05 * np.sin(2 * np.pi * 37 * t)
+    y = 100.0 + 0.05 * np.sin(2 * np.pi * 23 * t)
+
+    samples = np.zeros(n, dtype=SampleEvent.NUMPY_DTYPE)
+    samples['experiment_id'] = 1
+    samples['session_id'] = 1
+    samples['event_id'] = np.arange(1, n + 1)
+    samples['type'] = SampleEvent.EVENT_TYPE_ID
+    samples['time'] = samples['device_time'] = samples['logged_time'] = t
+    for eye in ('left', 'right'):
+        samples[eye + '_gaze_x'] = x
+        samples[eye + '_gaze_y'] = y
+        samples[eye + '_pupil_measure1'] = 5.0
+    # only the left eye is valid for some samples
+    samples['status'][100:200] = 2
+    samples['right_gaze_x'][100:200] = 0.0
+    for start, stop in blink:
+        samples['status'][start:stop] = 22
+        for eye in ('left', 'right'):
+            samples[eye + '_gaze_x'][start:stop] = 0.0
+            samples[eye + '_gaze_y'][start:stop] = 0.0
+    return samples
+
+
+def makeHubFile(folder, samples):
+    eventClasses = {cls.__name__: cls for cls in (
+        SampleEvent, eye_events.FixationStartEvent,
+        eye_events.FixationEndEvent, eye_events.SaccadeStartEvent,
+        eye_events.SaccadeEndEvent, eye_events.BlinkStartEvent,
+        eye_events.BlinkEndEvent)}
+    EventConstants.addClassMappings(
+        [cls.EVENT_TYPE_ID for cls in eventClasses.values()], eventClasses)
+    dsfile = DataStoreFile('eyes.hdf5', str(folder), 'w',
+                           {'multiple_sessions': False})
+    dsfile.updateDataStoreStructure(SampleEvent.PARENT_DEVICE, eventClasses)
+    dsfile.TABLES[SampleEvent.IOHUB_DATA_TABLE].append(samples)
+    dsfile.close()
+
+
+def test_filters():
+    values = np.array([0.0, 1.0, 0.0, 1.0, 2.0, 3.0, 10.0, 3.0])
+    assert list(filterArray(values, {'name': 'StampFilter', 'level': 1})) == [
+        0.0, 0.0, 1.0, 1.0, 2.0, 3.0, 3.0, 3.0]
+    assert list(filterArray(values, {'name': 'MedianFilter', 'length': 3})) == [
+        0.0, 0.0, 1.0, 1.0, 2.0, 3.0, 3.0, 3.0]
+    assert np.allclose(
+        filterArray(values, {'name': 'WeightedAverageFilter',
+                             'weights': (25, 50, 25)})[1:3], [0.5, 0.5])
+    assert filterArray(values, {'name': 'PassThroughFilter'}) is values
+    with pytest.raises(ValueError):
+        filterArray(values, {'name': 'KalmanFilter'})
+
+
+@pytest.mark.parametrize("filterSettings", [
+    {'name': 'PassThroughFilter'},
+    {'name': 'MovingWindowFilter', 'length': 4, 'knot_pos': 'latest'},
+    {'name': 'MedianFilter', 'length': 3, 'knot_pos': 'center'},
+    {'name': 'MedianFilter', 'length': 5, 'knot_pos': 0},
+    {'name': 'WeightedAverageFilter', 'weights': (25, 50, 25), 'knot_pos': 1},
+    {'name': 'StampFilter', 'level': 1},
+    {'name': 'StampFilter', 'level': 2},
+])
+def test_filters_online(filterSettings):
+    # filtering offline should give the same values as the online parser's
+    # filters, which filter samples in place as they're added
+    MonocularSampleEvent = eye_events.MonocularEyeSampleEvent
+    EventConstants.addClassMappings(
+        [MonocularSampleEvent.EVENT_TYPE_ID],
+        {'MonocularEyeSampleEvent': MonocularSampleEvent})
+    fieldIndex = MonocularSampleEvent.CLASS_ATTRIBUTE_NAMES.index('angle_x')
+    rng = np.random.RandomState(seed=3)
+    # include plateaus, where neighbouring values are equal
+    values = np.repeat(rng.randint(0, 5, 100), rng.randint(1, 3, 100))
+    values = values.astype(np.float64)
+
+    kwargs = dict(filterSettings)
+    filterClass = getattr(eventfilters, kwargs.pop('name'))
+    online = filterClass(event_type=MonocularSampleEvent.EVENT_TYPE_ID,
+                         event_field_name='angle_x', inplace=True, **kwargs)
+    samples = []
+    for value in values:
+        sample = [0] * len(MonocularSampleEvent.CLASS_ATTRIBUTE_NAMES)
+        sample[fieldIndex] = value
+        samples.append(sample)
+        online.add(sample)
+    onlineValues = [sample[fieldIndex] for sample in samples]
+
+    assert list(filterArray(values, filterSettings)) == onlineValues
+
+
+def test_velocity_threshold():
+    velocity = np.abs(np.sin(np.arange(3000) * 0.1)) * 10.0
+    velocity[1000:1010] = 500.0
+    thresh = adaptiveVelocityThreshold(velocity, 1000)
+    assert thresh.shape == velocity.shape
+    assert np.all(thresh > 10.0)
+    assert np.all(thresh < 500.0)
+    # no usable velocities gives a threshold nothing can reach
+    assert np.all(adaptiveVelocityThreshold(np.zeros(10), 5) == np.inf)
+
+
+def test_parse_file(tmp_path):
+    samples = makeSamples()
+    makeHubFile(tmp_path, samples)
+
+    parser = EyeSampleBatchParser(position_filter={'name': 'StampFilter',
+                                                   'level': 1})
+    parsed = parser.parseFile(str(tmp_path), 'eyes.hdf5')
+    fixations = parsed[eye_events.FixationEndEvent]
+    saccades = parsed[eye_events.SaccadeEndEvent]
+    blinks = parsed[eye_events.BlinkEndEvent]
+    # the first and last fixations are incomplete
+    assert len(fixations) == 3
+    assert len(saccades) == 3
+    assert len(blinks) == 1
+    assert len(parsed[eye_events.FixationStartEvent]) == 3
+
+    assert np.allclose(fixations['average_gaze_x'], [300.0, 600.0, 600.0],
+                       atol=1.0)
+    assert np.allclose(saccades['amplitude_x'], 300.0, atol=20.0)
+    assert np.all(saccades['peak_velocity_x'] > fixations['peak_velocity_x'].max())
+    assert blinks['duration'][0] == pytest.approx(0.099)
+    assert np.all(fixations['filter_id'] == EyeSampleBatchParser.filter_id)
+    # events get new ids, which aren't used by any samples
+    eventIDs = np.concatenate([events['event_id'] for events in parsed.values()])
+    assert len(np.unique(eventIDs)) == len(eventIDs)
+    assert eventIDs.min() > samples['event_id'].max()
+
+    # events should have been saved to the file
+    dataAccess = ExperimentDataAccessUtility(str(tmp_path), 'eyes.hdf5')
+    try:
+        table = dataAccess.getEventTable('FixationEndEvent')
+        assert table.nrows == 3
+        assert list(table.col('event_id')) == list(fixations['event_id'])
+    finally:
+        dataAccess.close()
+
+    # parsing again replaces them
+    parser.parseFile(str(tmp_path), 'eyes.hdf5', replace=True)
+    dataAccess = ExperimentDataAccessUtility(str(tmp_path), 'eyes.hdf5')
+    try:
+        assert dataAccess.getEventTable('SaccadeEndEvent').nrows == 3
+    finally:
+        dataAccess.close()
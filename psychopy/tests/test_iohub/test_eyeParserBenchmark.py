@@ -0,0 +1,64 @@
+"""Check parsing eye events offline from a long recording of samples saved to
+an ioHub DataStore file. Run this file as a script to benchmark how long it
+takes.
+"""
+import tempfile
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tables")
+
+from psychopy.iohub.devices.eyetracker import eye_events
+from psychopy.iohub.devices.eyetracker.filters.parser import (
+    EyeSampleBatchParser)
+from psychopy.tests.test_iohub.test_eyeParser import makeSamples, makeHubFile
+
+
+def _parseRecording(folder, minutes, rate=1000.0):
+    """Parse a recording made of repeats of the test samples, returning the
+    number of repeats, the parsed events and how long parsing took.
+    """
+    block = makeSamples(rate)
+    nBlocks = int(np.ceil(minutes * 60 * rate / len(block)))
+    samples = np.concatenate([block] * nBlocks)
+    samples['time'] = samples['device_time'] = samples['logged_time'] = \
+        np.arange(len(samples)) / rate
+    samples['event_id'] = np.arange(1, len(samples) + 1)
+    makeHubFile(folder, samples)
+
+    parser = EyeSampleBatchParser(
+        position_filter={'name': 'MedianFilter', 'length': 3})
+    t0 = time.perf_counter()
+    parsed = parser.parseFile(str(folder), 'eyes.hdf5')
+    duration = time.perf_counter() - t0
+
+    return nBlocks, parsed, duration
+
+
+@pytest.mark.slow
+def test_eyeParserLongRecording(tmp_path):
+    nBlocks, parsed, _ = _parseRecording(tmp_path, minutes=10)
+    # each repeat has a blink and at least three saccades between fixations
+    assert len(parsed[eye_events.BlinkEndEvent]) == nBlocks
+    assert len(parsed[eye_events.SaccadeEndEvent]) >= 3 * nBlocks
+    assert len(parsed[eye_events.FixationEndEvent]) >= 3 * nBlocks
+    for startCls, endCls in (
+            (eye_events.FixationStartEvent, eye_events.FixationEndEvent),
+            (eye_events.SaccadeStartEvent, eye_events.SaccadeEndEvent),
+            (eye_events.BlinkStartEvent, eye_events.BlinkEndEvent)):
+        assert abs(len(parsed[startCls]) - len(parsed[endCls])) <= 1
+
+
+if __name__ == '__main__':
+    # run as a script to report how long parsing takes
+    minutes = 10
+    with tempfile.TemporaryDirectory() as folder:
+        nBlocks, parsed, duration = _parseRecording(folder, minutes)
+    print("EyeSampleBatchParser, %g minutes of binocular samples at 1000 Hz:"
+          % minutes)
+    for eventCls, events in parsed.items():
+        print("%20s %8i" % (eventCls.__name__, len(events)))
+    print("parsed in %.2fs, %.1fs per hour of data" % (
+        duration, duration * 60.0 / minutes))
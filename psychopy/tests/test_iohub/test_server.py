@@ -0,0 +1,42 @@
+""" Test the ioHub Server's device stats, and processing events as soon as
+devices report them.
+"""
+import pytest
+
+from psychopy.iohub.server import DeviceStats
+from psychopy.tests import skip_under_vm
+from psychopy.tests.test_iohub.testutil import startHubProcess, stopHubProcess
+
+
+def test_device_stats():
+    stats = DeviceStats()
+    stats.addPoll(0.002, 0.001)
+    stats.addPoll(0.004, 0.001)
+    for latency in (0.001, 0.003, 0.002):
+        stats.addEvent(latency)
+    d = stats.asDict()
+    assert d['polls'] == 2
+    assert d['poll_time'] == pytest.approx(0.006)
+    assert d['events'] == 3
+    assert d['latency_mean'] == pytest.approx(0.002)
+    assert d['latency_max'] == 0.003
+    stats.reset()
+    assert stats.asDict()['latency_mean'] == 0.0
+
+
+@skip_under_vm
+@pytest.mark.parametrize("eventDriven", [False, True])
+def testDeviceStats(eventDriven):
+    io = startHubProcess(event_driven=eventDriven)
+
+    for i in range(10):
+        io.sendMessageEvent("Message %d" % i)
+    assert len(io.getEvents()) == 10
+
+    status, deviceStats = io.getStatus()
+    assert status == 'RUNNING'
+    stats = deviceStats['experiment']
+    assert stats['events'] == 10
+    assert 0 <= stats['latency_mean'] <= stats['latency_max']
+
+    stopHubProcess()
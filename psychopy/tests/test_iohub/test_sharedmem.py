@@ -0,0 +1,92 @@
+""" Test the shared memory event rings, written by the ioHub Server and read
+directly by the experiment process.
+"""
+import pytest
+
+from psychopy.iohub import sharedmem
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import DeviceEvent
+from psychopy.iohub.devices.experiment import MessageEvent, LogEvent
+from psychopy.tests import skip_under_vm
+from psychopy.tests.test_iohub.testutil import startHubProcess, stopHubProcess
+
+pytestmark = pytest.mark.skipif(not sharedmem.isAvailable(),
+                                reason="Needs multiprocessing.shared_memory")
+
+
+def makeMessage(i, text):
+    EventConstants.addClassMappings(
+        [MessageEvent.EVENT_TYPE_ID, LogEvent.EVENT_TYPE_ID],
+        {'MessageEvent': MessageEvent, 'LogEvent': LogEvent})
+    event = [0] * len(MessageEvent.CLASS_ATTRIBUTE_NAMES)
+    event[DeviceEvent.EVENT_ID_INDEX] = i
+    event[DeviceEvent.EVENT_TYPE_ID_INDEX] = MessageEvent.EVENT_TYPE_ID
+    event[DeviceEvent.EVENT_HUB_TIME_INDEX] = float(i)
+    event[-3:] = [0.0, 'TEST', text]
+    return event
+
+
+def test_event_ring():
+    writer = sharedmem.EventRing.create(8, [MessageEvent, LogEvent])
+    reader = sharedmem.EventRing(writer.name)
+    try:
+        assert reader.capacity == 8
+        assert reader.record_size == writer.record_size
+        assert len(reader.read()) == 0
+
+        for i in range(5):
+            writer._handleEvent(makeMessage(i, 'Message %d' % i))
+        assert len(reader) == 5
+        records = reader.read()
+        assert len(reader) == 0
+        messages = sharedmem.recordsToArrays(records)[MessageEvent.EVENT_TYPE_ID]
+        assert list(messages['event_id']) == list(range(5))
+        assert messages['text'][4] == b'Message 4'
+        events = sharedmem.recordsToLists(records)
+        assert events[1] == makeMessage(1, 'Message 1')
+
+        # wraps around, dropping events once full
+        for i in range(5, 20):
+            writer._handleEvent(makeMessage(i, 'Message %d' % i))
+        assert writer.getDroppedCount() == 7
+        fields = sharedmem.recordFields(reader.read())
+        assert list(fields['event_id']) == list(range(5, 13))
+        writer._handleEvent(makeMessage(20, 'Message 20'))
+        assert list(sharedmem.recordFields(reader.read())['event_id']) == [20]
+
+        # non-ASCII text is written as UTF-8
+        writer._handleEvent(makeMessage(21, 'Größe'))
+        assert writer.getDroppedCount() == 7
+        events = sharedmem.recordsToLists(reader.read())
+        assert events == [makeMessage(21, 'Größe')]
+    finally:
+        reader.close()
+        writer.close()
+
+
+@skip_under_vm
+def testGetRingEvents():
+    io = startHubProcess(shared_memory_events=256)
+
+    exp = io.devices.experiment
+    assert exp._event_ring is not None
+    for i in range(10):
+        io.sendMessageEvent("Message %d" % i, category="RING")
+    io.wait(0.1)
+
+    messages = exp.getEvents(event_type_id=EventConstants.MESSAGE,
+                             clearEvents=False)
+    assert [m.text for m in messages] == ["Message %d" % i for i in range(10)]
+    assert all(m.category == "RING" for m in messages)
+
+    arrays = exp.getEvents(as_type='numpy')
+    assert list(arrays[EventConstants.MESSAGE]['event_id']) == [
+        m.event_id for m in messages]
+    assert exp.getEvents() == []
+
+    io.sendMessageEvent("Cleared")
+    io.wait(0.1)
+    exp.clearEvents()
+    assert exp.getEvents() == []
+
+    stopHubProcess()
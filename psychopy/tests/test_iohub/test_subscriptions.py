@@ -0,0 +1,84 @@
+""" Test subscribing to ioHub events, with the server queueing only the
+subscribed events for each subscriber.
+"""
+import pytest
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import DeviceEvent
+from psychopy.iohub.devices.experiment import MessageEvent
+from psychopy.iohub.errors import ioHubError
+from psychopy.iohub.server import EventSubscription
+from psychopy.tests import skip_under_vm
+from psychopy.tests.test_iohub.testutil import startHubProcess, stopHubProcess
+
+
+def makeMessage(i, text):
+    EventConstants.addClassMappings([MessageEvent.EVENT_TYPE_ID],
+                                    {'MessageEvent': MessageEvent})
+    event = [0] * len(MessageEvent.CLASS_ATTRIBUTE_NAMES)
+    event[DeviceEvent.EVENT_ID_INDEX] = i
+    event[DeviceEvent.EVENT_TYPE_ID_INDEX] = MessageEvent.EVENT_TYPE_ID
+    event[DeviceEvent.EVENT_HUB_TIME_INDEX] = float(i)
+    event[-1] = text
+    return event
+
+
+@pytest.mark.parametrize("overflow, kept", [('drop_oldest', [3, 4, 5, 6]),
+                                            ('drop_newest', [0, 1, 2, 3])])
+def test_overflow(overflow, kept):
+    sub = EventSubscription(1, max_queue=4, overflow=overflow)
+    for i in range(7):
+        sub._handleEvent(makeMessage(i, 'Message %d' % i))
+    events, dropped = sub.getEvents()
+    assert dropped == 3
+    assert [e[DeviceEvent.EVENT_ID_INDEX] for e in events] == kept
+    assert sub.getEvents() == ([], 0)
+
+    with pytest.raises(ValueError):
+        EventSubscription(2, overflow='block')
+
+
+def test_fields():
+    sub = EventSubscription(1, fields=['time', 'text', 'x'])
+    for i in (2, 0, 1):
+        sub._handleEvent(makeMessage(i, 'Message %d' % i))
+    events, _ = sub.getEvents()
+    # sorted by time, with only the subscribed fields
+    assert events == [[0.0, 'Message 0', None], [1.0, 'Message 1', None],
+                      [2.0, 'Message 2', None]]
+
+
+@skip_under_vm
+def testSubscribeEvents():
+    io = startHubProcess()
+
+    messages = io.subscribeEvents(event_types=[EventConstants.MESSAGE],
+                                  fields=['text', 'category'], max_queue=5,
+                                  overflow='drop_newest')
+    everything = io.subscribeEvents(devices=['experiment'])
+    with pytest.raises(ioHubError):
+        io.subscribeEvents(devices=['nosuchdevice'])
+
+    for i in range(8):
+        io.sendMessageEvent("Message %d" % i, category="SUB")
+
+    events = messages.getEvents()
+    assert [e.text for e in events] == ["Message %d" % i for i in range(5)]
+    assert events[0].category == "SUB"
+    assert messages.dropped == 3
+    assert messages.getEvents() == []
+
+    events = everything.getEvents(as_type='dict')
+    assert [e['text'] for e in events] == ["Message %d" % i for i in range(8)]
+
+    # subscriptions don't take events from the global event buffer
+    assert len(io.getEvents()) == 8
+
+    io.sendMessageEvent("Cleared")
+    everything.clearEvents()
+    assert everything.getEvents() == []
+    assert everything.unsubscribe() is True
+    io.sendMessageEvent("Not subscribed")
+    assert len(messages.getEvents()) == 2
+
+    stopHubProcess()
@@ -11,8 +11,8 @@ from psychopy.tests import skip_under_vm
 
 
 @skip_under_vm
-def startHubProcess():
-    io = launchHubServer()
+def startHubProcess(**kwargs):
+    io = launchHubServer(**kwargs)
     assert io != None
 
     io_proc = Computer.getIoHubProcess()
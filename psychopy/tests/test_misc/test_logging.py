@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import time
+from tempfile import mkdtemp
+
+import pytest
+
+from psychopy import logging
+
+
+class TestLogging:
+    def setup_method(self):
+        self.tmpDir = mkdtemp(prefix='psychopy-tests-logging')
+        self.logger = logging._Logger()
+        self.stream = io.StringIO()
+        self.target = logging.LogFile(
+            self.stream, level=logging.DEBUG, logger=self.logger)
+
+    def teardown_method(self):
+        self.logger.setRetention('none')
+        shutil.rmtree(self.tmpDir)
+
+    def _logMany(self, n, start=0):
+        for i in range(start, start + n):
+            self.logger.log("message %i" % i, level=logging.EXP, t=i)
+        self.logger.flush()
+
+    def test_entry_slots(self):
+        entry = logging._LogEntry(logging.EXP, "hello", t=1.5)
+        # no dict per entry...
+        assert not hasattr(entry, '__dict__')
+        # ...but can still be used to format a message
+        assert self.logger.format.format(**entry) == "1.5000 \tEXP \thello"
+        assert dict(entry)['t_ms'] == 1500
+
+    def test_retention_ring(self):
+        self.logger.setRetention('ring', size=10)
+        self._logMany(25)
+        assert len(self.logger.flushed) == 10
+        assert self.logger.flushed[0].message == "message 15"
+        assert self.logger.flushed[-1].message == "message 24"
+        # everything should still have been written to the target
+        assert self.stream.getvalue().count("\n") == 25
+
+    def test_retention_none(self):
+        self.logger.setRetention('none')
+        self._logMany(5)
+        assert len(self.logger.flushed) == 0
+        assert self.stream.getvalue().count("\n") == 5
+
+    def test_retention_all(self):
+        self.logger.setRetention('all')
+        self._logMany(2000)
+        assert len(self.logger.flushed) == 2000
+
+    def test_retention_disk(self):
+        fileName = os.path.join(self.tmpDir, 'spilled.log')
+        self.logger.setRetention('disk', size=10, fileName=fileName)
+        self._logMany(7)
+        self._logMany(8, start=7)
+        assert len(self.logger.flushed) == 10
+        assert self.logger.flushed[0].message == "message 5"
+        # entries dropped from memory should be on disk, in order
+        with io.open(fileName, encoding='utf8') as f:
+            lines = f.read().splitlines()
+        assert [line.split("\t")[-1] for line in lines] == [
+            "message %i" % i for i in range(5)
+        ]
+
+    def test_retention_invalid(self):
+        with pytest.raises(ValueError):
+            self.logger.setRetention('sometimes')
+        with pytest.raises(ValueError):
+            self.logger.setRetention('disk')
+
+    def test_async(self):
+        self.logger.setAsync(True, interval=10)
+        try:
+            self._logMany(100)
+            # entries are written in the background...
+            self.logger.flush(block=True)
+            # ...but should all be there once a blocking flush returns
+            lines = self.stream.getvalue().splitlines()
+            assert [line.split("\t")[-1] for line in lines] == [
+                "message %i" % i for i in range(100)
+            ]
+            # a non-blocking flush should wake the writer thread
+            self.logger.log("woken", level=logging.EXP, t=0)
+            self.logger.flush()
+            for i in range(100):
+                if "woken" in self.stream.getvalue():
+                    break
+                time.sleep(0.01)
+            assert "woken" in self.stream.getvalue()
+        finally:
+            self.logger.setAsync(False)
+        assert not self.logger.isAsync
+
+    def test_binary_log(self):
+        fileName = os.path.join(self.tmpDir, 'binary.psylog')
+        target = logging.BinaryLogFile(
+            fileName, level=logging.EXP, filemode='w', logger=self.logger)
+        self._logMany(50)
+        self.logger.log("ignored", level=logging.DEBUG, t=50)
+        self.logger.log("message 0", level=logging.DATA, t=51, obj='stim')
+        self.logger.flush()
+        target.stream.close()
+        self.logger.removeTarget(target)
+        # reopening to append should carry on using the same strings
+        target = logging.BinaryLogFile(fileName, logger=self.logger)
+        assert target.strings['message 0'] == 1
+        target.write("direct\n")
+        target.stream.close()
+        self.logger.removeTarget(target)
+
+        df = logging.readBinaryLog(fileName)
+        assert len(df) == 52
+        assert df['message'].tolist()[:50] == ["message %i" % i for i in range(50)]
+        assert df['t'].tolist()[:50] == list(range(50))
+        assert (df['levelname'][:50] == 'EXP').all()
+        assert df.iloc[50].tolist() == [51, logging.DATA, 'DATA', 'message 0', 'stim']
+        assert df['obj'][:50].isna().all()
+        assert df.iloc[51]['message'] == "direct"
+        # each unique string should only be stored once
+        assert os.path.getsize(fileName) < 52 * 18 + 60 * 20
@@ -147,7 +147,7 @@ class TestSession:
             sess.logFile.logger.flush()
             fmtStr = sess.logFile.logger.format
             msg = fmtStr.format(
-                **sess.logFile.logger.flushed[-1].__dict__
+                **sess.logFile.logger.flushed[-1]
             )
             tLastLog = msg.split("\t")[0].strip()
             # make sure last logged time fits format
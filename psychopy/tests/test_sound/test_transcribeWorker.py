@@ -0,0 +1,140 @@
+"""Test transcribing audio clips in a worker process, using a stub transcriber
+so no speech-to-text engine is needed.
+"""
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from psychopy import data
+from psychopy.sound import transcribe
+from psychopy.sound.audioclip import AudioClip
+from psychopy.sound.transcribe import (
+    BaseTranscriber, TranscriptionResult, TranscriptionWorker)
+
+STUB_ENGINE = __name__ + ':StubTranscriber'
+
+# changed by tests, a worker which was forked rather than started fresh
+# would see the change
+processState = 'imported'
+
+
+class StubTranscriber(BaseTranscriber):
+    """Transcriber which "hears" the duration of the clip, the process it ran
+    in, how many times it was set up in that process and `processState` in
+    that process.
+    """
+    _engine = u'stub'
+    _longName = u"Stub"
+    nSetup = 0
+
+    def __init__(self, initConfig=None):
+        super(StubTranscriber, self).__init__(initConfig)
+        StubTranscriber.nSetup += 1
+
+    def transcribe(self, audioClip, language='en-US', expectedWords=None,
+                   config=None):
+        words = [str(round(audioClip.duration, 3)), str(os.getpid()),
+                 str(StubTranscriber.nSetup), language, processState]
+        self._lastResult = TranscriptionResult(
+            words=words, unknownValue=False, requestFailed=False,
+            engine=self._engine, language=language)
+
+        return self._lastResult
+
+
+def makeClip(secs):
+    return AudioClip(np.zeros((int(secs * 1000), 1)), sampleRateHz=1000)
+
+
+@pytest.fixture
+def worker():
+    worker = TranscriptionWorker(STUB_ENGINE)
+    yield worker
+    worker.shutdown()
+
+
+def test_transcriptionWorker(worker):
+    arrived = []
+    done = threading.Event()
+
+    def callback(result):
+        arrived.append(result)
+        if len(arrived) == 3:
+            done.set()
+
+    futures = [worker.submit(makeClip(secs), callback=callback,
+                             language='fr') for secs in (0.1, 0.2, 0.3)]
+    results = [future.result(timeout=30) for future in futures]
+    assert done.wait(timeout=30)
+
+    # clips are transcribed in order in another process, set up once
+    assert [result.words[0] for result in results] == ['0.1', '0.2', '0.3']
+    assert len({result.words[1] for result in results}) == 1
+    assert results[0].words[1] != str(os.getpid())
+    assert all(result.words[2] == '1' for result in results)
+    assert all(result.words[3] == 'fr' for result in results)
+    assert sorted(result.words[0] for result in arrived) == ['0.1', '0.2', '0.3']
+    assert worker.pending == 0
+
+    worker.shutdown()
+    with pytest.raises(RuntimeError):
+        worker.submit(makeClip(0.1))
+
+
+def test_workerSpawned():
+    # the worker is started fresh, not forked from the experiment
+    global processState
+    processState = 'changed'
+    worker = TranscriptionWorker(STUB_ENGINE)
+    try:
+        result = worker.submit(makeClip(0.1)).result(timeout=30)
+    finally:
+        worker.shutdown()
+        processState = 'imported'
+    assert result.words[4] == 'imported'
+
+
+def test_shutdownNoWait(worker):
+    # clips still waiting are cancelled, those already started are finished
+    futures = [worker.submit(makeClip(0.1)) for n in range(20)]
+    worker.shutdown(wait=False)
+    assert any(future.cancelled() for future in futures)
+    for future in futures:
+        if not future.cancelled():
+            assert future.result(timeout=30).words[0] == '0.1'
+    assert worker.pending == 0
+
+
+def test_noTranscriber():
+    transcribe.stopTranscriptionWorker()
+    assert transcribe.getActiveTranscriber() is None
+    with pytest.raises(transcribe.TranscriberNotSetupError):
+        TranscriptionWorker()
+    with pytest.raises(transcribe.TranscriberNotSetupError):
+        transcribe.submitAsync(makeClip(0.1))
+
+
+def test_experimentHandler(tmp_path):
+    # results are filled in to the data file when they arrive
+    exp = data.ExperimentHandler(
+        name='testExp', savePickle=False, saveWideText=True,
+        dataFileName=str(tmp_path / 'transcribed'))
+    try:
+        for secs in (0.1, 0.2):
+            future = makeClip(secs).transcribe(
+                engine=STUB_ENGINE, language='en', wait=False)
+            exp.addData('mic.script', future)
+            exp.nextEntry()
+        exp.close()
+    finally:
+        transcribe.stopTranscriptionWorker()
+
+    with open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+        rows = f.read().splitlines()[1:]
+    assert [row.split(',')[2].split()[0] for row in rows] == ['0.1', '0.2']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
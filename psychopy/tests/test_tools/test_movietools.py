@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for psychopy.tools.movietools
+
+"""
+import os
+import numpy as np
+import pytest
+
+from psychopy.tools.movietools import MovieFileWriter
+
+
+def test_queuePolicy():
+    with pytest.raises(ValueError):
+        MovieFileWriter('test.mp4', (64, 48), 30, queuePolicy='roll')
+
+    writer = MovieFileWriter('test.mp4', (64, 48), 30, maxQueueSize=4,
+                             queuePolicy='drop')
+    assert writer.maxQueueSize == 4
+    assert writer.queuePolicy == 'drop'
+    assert writer.framesDropped == 0
+
+    # unbounded by default
+    assert MovieFileWriter('test.mp4', (64, 48), 30).maxQueueSize == 0
+
+
+@pytest.mark.parametrize("queuePolicy", ['block', 'drop'])
+def test_boundedQueue(tmp_path, queuePolicy):
+    pytest.importorskip("ffpyplayer")
+
+    filename = str(tmp_path / 'test.mp4')
+    writer = MovieFileWriter(filename, (64, 48), 30, maxQueueSize=2,
+                             queuePolicy=queuePolicy)
+    writer.open()
+    nFrames = 120
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    for i in range(nFrames):
+        frame[:] = i
+        pts = writer.addFrame(frame, pts=i / 30.0)
+        assert pts is None or pts == i / 30.0
+        assert writer.framesWaiting <= 2
+    writer.close()
+
+    # every frame is either written or dropped
+    assert writer.framesOut + writer.framesDropped == nFrames
+    if queuePolicy == 'block':
+        assert writer.framesDropped == 0
+    assert os.path.exists(filename)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
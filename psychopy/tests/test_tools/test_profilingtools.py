@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+from psychopy.tools.profilingtools import FrameProfiler, GPUTimerPool
+
+
+class _FakeClock:
+    """Clock which moves on by a fixed step whenever it's read."""
+    def __init__(self, step=0.001):
+        self.t = 0
+        self.step = step
+
+    def __call__(self):
+        self.t += self.step
+        return self.t
+
+
+class _FakeStim:
+    def __init__(self, name):
+        self.name = name
+        self.nDraws = 0
+
+    def draw(self):
+        self.nDraws += 1
+
+
+def test_ring_buffer():
+    profiler = FrameProfiler(nFrames=4, clock=_FakeClock())
+    for frameN in range(6):
+        profiler.startFrame()
+        for phase in FrameProfiler.phases[:3]:
+            profiler.lap(phase)
+        profiler.endFrame(frameTime=frameN / 60)
+    timings = profiler.getTimings()
+    # only the most recent frames should be kept, oldest first
+    assert timings['frameN'].tolist() == [2, 3, 4, 5]
+    assert np.allclose(timings['t'], np.arange(2, 6) / 60)
+    # each lap is one tick of the clock, total is from start to end
+    assert np.allclose(timings['autoDraw'], 0.001)
+    assert np.allclose(timings['total'], 0.004)
+    # phases which weren't timed are empty
+    assert timings['swapBuffers'].isna().all()
+    # as an array
+    array = profiler.getTimings(asDataFrame=False)
+    assert array.shape == (4, len(FrameProfiler.phases) + 1)
+    # reset
+    profiler.reset()
+    assert len(profiler.getTimings()) == 0
+
+
+def test_stimulus_histograms():
+    profiler = FrameProfiler(
+        nFrames=4, perStimulus=True, histBins=[0, 0.001, 0.002, 0.003],
+        clock=_FakeClock(step=0.0015))
+    stims = [_FakeStim("a"), _FakeStim("b")]
+    for frameN in range(3):
+        for stim in stims:
+            profiler.drawStimulus(stim)
+    # stims should have actually been drawn
+    assert [stim.nDraws for stim in stims] == [3, 3]
+    # each draw takes one clock step, so is in the second bin
+    hists = profiler.getStimulusHistograms()
+    assert hists['a'].tolist() == [0, 3, 0]
+    # times over the last bin edge go in the last bin
+    profiler.addStimulusTime("a", 1.0)
+    assert profiler.getStimulusHistograms()['a'].tolist() == [0, 3, 1]
+    summary = profiler.getStimulusSummary()
+    assert summary['b']['n'] == 3
+    assert np.isclose(summary['b']['mean'], 0.0015)
+
+
+class _FakeTimerPool(GPUTimerPool):
+    """Timer pool which doesn't need an OpenGL context, results become
+    available when `finish` is called, and each takes 1ms.
+    """
+    def __init__(self):
+        GPUTimerPool.__init__(self)
+        self.nCreated = 0
+        self.finished = set()
+
+    def _createQuery(self):
+        self.nCreated += 1
+        return self.nCreated
+
+    def _beginQuery(self, query):
+        self.finished.discard(query)
+
+    def _endQuery(self, query):
+        pass
+
+    def _isAvailable(self, query):
+        return query in self.finished
+
+    def _getResult(self, query):
+        return 1000000
+
+    def _deleteQuery(self, query):
+        self.nCreated -= 1
+
+    def finish(self):
+        self.finished.update(query for tag, query in self._pending)
+
+
+def test_gpu_timings():
+    pool = _FakeTimerPool()
+    profiler = FrameProfiler(
+        nFrames=4, perStimulus=True, histBins=[0, 0.0005, 0.0015],
+        clock=_FakeClock(), gpu=pool)
+    stims = [_FakeStim("a"), _FakeStim("b")]
+    for frameN in range(3):
+        profiler.startFrame()
+        for stim in stims:
+            profiler.drawStimulus(stim)
+        profiler.lap('autoDraw')
+        profiler.endFrame()
+        # results from this frame aren't read until next frame
+        assert pool.nPending == 2
+        pool.finish()
+    timings = profiler.getTimings()
+    # last frame hasn't been collected yet
+    assert np.allclose(timings['gpuAutoDraw'][:2], 0.002)
+    assert np.isnan(timings['gpuAutoDraw'][2])
+    profiler.collectGPUTimes()
+    assert np.allclose(profiler.getTimings()['gpuAutoDraw'], 0.002)
+    # queries should be reused rather than created every frame
+    assert pool.nCreated == 2
+    assert profiler.getStimulusHistograms(gpu=True)['a'].tolist() == [0, 3]
+    summary = profiler.getStimulusSummary()
+    assert summary['b']['gpuN'] == 3
+    assert np.isclose(summary['b']['gpuMean'], 0.001)
+    pool.release()
+    assert pool.nCreated == 0
+
+
+def test_gpu_timer_ended_on_error():
+    class BrokenStim(_FakeStim):
+        def draw(self):
+            raise RuntimeError("Failed to draw")
+
+    pool = _FakeTimerPool()
+    profiler = FrameProfiler(
+        nFrames=4, perStimulus=True, clock=_FakeClock(), gpu=pool)
+    with pytest.raises(RuntimeError):
+        profiler.drawStimulus(BrokenStim("a"))
+    # the timer should still be stopped, so the next can start
+    assert pool.nPending == 1
+    profiler.drawStimulus(_FakeStim("b"))
+    assert pool.nPending == 2
@@ -423,6 +423,34 @@ class _baseVisualTest():
         utils.compareScreenshot('elarray1_%s.png' %(self.contextName), win)
         win.flip()
 
+    def test_element_array_vbo(self):
+        win = self.win
+        if not win._haveShaders:
+            pytest.skip("ElementArray requires shaders, which aren't available")
+        thetas = numpy.arange(0,360,10)
+        N=len(thetas)
+
+        radii = numpy.linspace(0,1.0,N)*self.scaleFactor
+        x, y = pol2cart(theta=thetas, radius=radii)
+        xys = numpy.array([x,y]).transpose()
+        spiral = visual.ElementArrayStim(
+                win, opacities = 0, nElements=N, sizes=0.5*self.scaleFactor,
+                sfs=1.0, xys=xys, oris=-thetas, useVBO=True)
+        spiral.draw()
+        if not spiral.useVBO:
+            pytest.skip("Instanced ElementArrayStim needs OpenGL 3.3")
+        # only the attributes which changed should need uploading
+        spiral.opacities = 1.0
+        spiral.sfs = 3.0
+        assert spiral._dirtyAttribs == {'color', 'texCoords'}
+        spiral.draw()
+        assert not spiral._dirtyAttribs
+        win.flip()
+        spiral.draw()
+        # should look the same as the legacy path
+        utils.compareScreenshot('elarray1_%s.png' %(self.contextName), win)
+        win.flip()
+
     def test_aperture(self):
         win = self.win
         if not win.allowStencil:
@@ -152,4 +152,35 @@ class TestDots:
         # If dots have moved, then there should be more white on the compound screen than on either original
         assert compound.mean() > screen1.mean() and compound.mean() > screen2.mean(), (
             "Dot stimulus does not appear to have moved across two frames."
-        )
\ No newline at end of file
+        )
+
+    def test_batched_update(self):
+        """
+        Check that the batched (useVBO) update moves dots exactly as the regular update does, given the same random
+        numbers, and that its pixel transform matches the regular vertex conversion.
+        """
+        for fieldShape in ('sqr', 'circle'):
+            for noiseDots in ('direction', 'position', 'walk'):
+                for signalDots in ('same', 'different'):
+                    dots = []
+                    for useVBO in (False, True):
+                        np.random.seed(12345)
+                        dots.append(visual.DotStim(
+                            self.win, nDots=200, units='height', fieldShape=fieldShape,
+                            fieldPos=(0.1, -0.1), fieldSize=(0.8, 0.6), dotLife=5, dir=30, speed=0.05,
+                            coherence=0.5, noiseDots=noiseDots, signalDots=signalDots, useVBO=useVBO))
+                    legacy, batched = dots
+                    assert batched._verticesBase.dtype == np.float32
+                    for frameN in range(20):
+                        for obj in dots:
+                            np.random.seed(frameN)
+                            obj._update_dotsXY()
+                        assert np.allclose(legacy._verticesBase, batched._verticesBase, atol=1e-5)
+                    # conversion to pix done by the GL transform should match
+                    transform = batched._getPixTransform()
+                    pix = batched._verticesBase.dot(transform[:2, :2]) + transform[3, :2]
+                    assert np.allclose(pix, legacy.verticesPix, atol=1e-2)
+                    # and verticesPix should still be available on request
+                    assert np.allclose(batched.verticesPix, legacy.verticesPix, atol=1e-2)
+                    batched.draw()
+        self.win.flip()
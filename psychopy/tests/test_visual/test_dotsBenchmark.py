@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Check DotStim's batched (useVBO) path against the regular path for large
+numbers of dots. Run this file as a script to benchmark the two, reporting the
+time taken per frame for increasing numbers of dots.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from psychopy import visual
+
+
+def _makeDots(win, nDots, useVBO):
+    np.random.seed(0)
+    return visual.DotStim(
+        win, nDots=nDots, fieldShape='circle', fieldSize=(1, 1),
+        dotLife=100, speed=0.002, coherence=0.5, autoLog=False,
+        useVBO=useVBO)
+
+
+def _timePerFrame(dots, nFrames):
+    """Time drawing some frames of dots, in microseconds per frame. Doesn't
+    flip, so isn't limited by the refresh rate.
+    """
+    win = dots.win
+    dots.draw()  # first draw creates any buffers
+    win.flip()
+    t0 = time.perf_counter()
+    for frameN in range(nFrames):
+        dots.draw()
+    win.backend.GL.glFinish()
+    return (time.perf_counter() - t0) / nFrames * 1e6
+
+
+@pytest.mark.slow
+def test_largeField():
+    # 50k dots should stay in the field, frame after frame (test_dots checks
+    # both paths move dots identically)
+    win = visual.Window([256, 256], units='height', allowGUI=False,
+                        autoLog=False)
+    try:
+        dots = [_makeDots(win, 50000, useVBO) for useVBO in (False, True)]
+        for frameN in range(60):
+            for obj in dots:
+                np.random.seed(frameN)
+                obj._update_dotsXY()
+            for obj in dots:
+                assert obj._verticesBase.shape == (50000, 2)
+                assert np.all(np.hypot(*obj._verticesBase.T) <= 0.5 + 1e-5)
+            assert dots[1]._verticesBase.dtype == np.float32
+        for obj in dots:
+            obj.draw()
+        win.flip()
+    finally:
+        win.close()
+
+
+if __name__ == '__main__':
+    # run as a script to report the time per frame
+    win = visual.Window([256, 256], units='height', allowGUI=False,
+                        autoLog=False)
+    try:
+        print("DotStim, us/frame:")
+        print("%8s %10s %10s" % ("nDots", "regular", "useVBO"))
+        for nDots in (1000, 10000, 50000):
+            times = [_timePerFrame(_makeDots(win, nDots, useVBO), nFrames=60)
+                     for useVBO in (False, True)]
+            print("%8i %10.1f %10.1f" % (nDots, times[0], times[1]))
+    finally:
+        win.close()
@@ -490,6 +490,61 @@ class Test_textbox(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin, _Tes
             self.win.getMovieFrame(buffer='back').save(filename)
             utils.compareScreenshot(filename, self.win, crit=20)
 
+    def test_incremental_layout(self):
+        def getLayout():
+            return (self.obj._vertices.pix.copy(), self.obj._colors.copy(),
+                    self.obj._texcoords.copy(), self.obj._lineNs.copy(),
+                    list(self.obj._lineLenChars))
+
+        self.obj.text = ("A first paragraph which is long enough to wrap\n"
+                         "a second paragraph to into\n\nand a third")
+        self.obj.caret.index = self.obj.text.index("into")
+        for char in "typo":
+            self.obj._onText(char)
+        self.obj._onCursorKeys('MOTION_BACKSPACE')
+        self.obj._onText("e")
+        self.obj._onText(" ")
+        incremental = getLayout()
+        # laying out everything from scratch should give the same result
+        self.obj._paragraphLayouts.clear()
+        self.obj._layout()
+        for a, b in zip(incremental, getLayout()):
+            assert np.allclose(a, b)
+        if self.obj._lineBreaking == 'default':
+            # typing should only lay out the paragraph being typed into
+            laidOut = []
+            original = self.obj._layoutParagraph
+
+            def _layoutParagraph(start, stop, *args):
+                laidOut.append(self.obj._text[start:stop])
+                return original(start, stop, *args)
+            self.obj._layoutParagraph = _layoutParagraph
+            self.obj._onText("!")
+            del self.obj._layoutParagraph
+            assert laidOut == ["a second paragraph to type !into\n"]
+
+    def test_vbo(self):
+        self.obj.text = "Some <b>bold</b> and <c=red>red</c> text\nover two lines"
+        self.win.flip()
+        self.obj.draw()
+        expected = np.asarray(self.win._getFrame(buffer='back'))
+        self.win.flip()
+        self.obj.useVBO = True
+        self.obj.draw()
+        assert self.obj._glyphVBO is not None
+        assert np.array_equal(
+            np.asarray(self.win._getFrame(buffer='back')), expected)
+        # typing should update the buffer in place
+        vbo = self.obj._glyphVBO.name
+        self.obj.caret.index = 4
+        self.obj._onText("!")
+        self.obj.draw()
+        assert self.obj._glyphVBO.name == vbo
+        assert np.array_equal(
+            self.obj._glyphData[:len(self.obj.verticesPix), :2],
+            self.obj.verticesPix.astype(np.float32))
+        self.win.flip()
+
 
 def test_font_manager():
         # Create a font manager
@@ -504,6 +559,101 @@ def test_font_manager():
         assert bool(mgr.getFontNamesSimilar("Hanalei"))
 
 
+def test_font_index(monkeypatch, tmp_path):
+    from psychopy import prefs
+    from psychopy.tools import fontmanager
+    # use an empty index, and start from no fonts
+    monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path))
+    monkeypatch.setattr(FontManager, '_fontInfos', {})
+    monkeypatch.setattr(FontManager, '_fontInfosByPath', {})
+    monkeypatch.setattr(FontManager, 'fontStyles', [])
+    mgr = FontManager()
+    assert mgr.getFontFamilyNames()
+    assert (tmp_path / 'fontIndex.json').is_file()
+    # a new font manager should find fonts from the index, without opening
+    # any font files or searching the system font folders
+    FontManager._fontInfos.clear()
+    FontManager._fontInfosByPath.clear()
+    del FontManager.fontStyles[:]
+
+    def _noFreeType(*args, **kwargs):
+        raise AssertionError("font file was opened")
+    monkeypatch.setattr(fontmanager.ft, 'Face', _noFreeType)
+    mgr = FontManager()
+    assert mgr.getFontsMatching("Open Sans", fallback=False)
+    assert not mgr._searched
+    # fonts which have changed should be opened again
+    fontPath = Path(mgr.getFontsMatching("Open Sans")[0].path)
+    assert mgr._index.get(fontPath) is not None
+    stat = fontPath.stat()
+    monkeypatch.setattr(
+        fontmanager._FontIndex, '_stat',
+        staticmethod(lambda path: (stat.st_mtime_ns + 1, stat.st_size)))
+    assert mgr._index.get(fontPath) is None
+
+
+def test_added_fonts_kept(monkeypatch, tmp_path):
+    import shutil
+    from psychopy import prefs
+    from psychopy.tools import fontmanager
+    fontPath = FontManager().getFontsMatching("Open Sans")[0].path
+    fontDir = tmp_path / 'myfonts'
+    fontDir.mkdir()
+    shutil.copy(fontPath, fontDir)
+    # no system fonts, so the only fonts are those added
+    monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path))
+    monkeypatch.setattr(FontManager, '_fontInfos', {})
+    monkeypatch.setattr(FontManager, '_fontInfosByPath', {})
+    monkeypatch.setattr(FontManager, '_addedFontFiles', {})
+    monkeypatch.setattr(FontManager, 'fontStyles', [])
+    findFontFiles = fontmanager.findFontFiles
+    monkeypatch.setattr(
+        fontmanager, 'findFontFiles',
+        lambda folders=(), recursive=True: (
+            findFontFiles(folders, recursive) if folders else []))
+    mgr = FontManager()
+    mgr.addFontDirectory(str(fontDir))
+    assert mgr.getFontsMatching("Open Sans", fallback=False)
+    # searching the system fonts for a missing font shouldn't lose it
+    assert not mgr.getFontsMatching("Some Missing Font", fallback=False)
+    assert mgr._searched
+    assert mgr.getFontsMatching("Open Sans", fallback=False)
+    assert b"Open Sans" in mgr.getFontFamilyNames()
+
+
+def test_glyph_cache(monkeypatch, tmp_path):
+    from psychopy import prefs
+    from psychopy.tools import fontmanager
+    monkeypatch.setitem(prefs.paths, 'userCacheDir', str(tmp_path))
+    fontPath = FontManager().getFontsMatching("Open Sans")[0].path
+    font = fontmanager.GLFont(fontPath, 24)
+    assert not font.glyphs
+    font.preload("Hello, wörld 你")
+    assert font.cacheFile.with_suffix('.npy').is_file()
+    assert font.cacheFile.with_suffix('.json').is_file()
+    # a new font should have the same glyphs straight away, without having
+    # to rasterise any of them
+    monkeypatch.setattr(
+        fontmanager.GLFont, 'fetch',
+        lambda *args, **kwargs: pytest.fail("glyph was rasterised"))
+    cached = fontmanager.GLFont(fontPath, 24)
+    assert set(cached.glyphs) == set(font.glyphs)
+    for charcode, glyph in font.glyphs.items():
+        assert cached[charcode].size == tuple(glyph.size)
+        assert cached[charcode].offset == tuple(glyph.offset)
+        assert cached[charcode].advance == tuple(glyph.advance)
+        assert cached[charcode].texcoords == tuple(glyph.texcoords)
+    assert (cached.atlas.data == font.atlas.data).all()
+    assert cached.atlas.nodes == [tuple(n) for n in font.atlas.nodes]
+    # a bitmap saved by another session shouldn't be used with these metrics
+    del cached
+    other = np.zeros_like(font.atlas.data)
+    np.save(str(font.cacheFile.with_suffix('.npy')), other)
+    assert not fontmanager.GLFont(fontPath, 24).glyphs
+    # a different size shouldn't use the same cache
+    assert not fontmanager.GLFont(fontPath, 25).glyphs
+
+
 @pytest.mark.uax14
 class Test_uax14_textbox(Test_textbox):
     """Runs the same tests as for Test_textbox, but with the textbox set to uax14 line breaking"""
@@ -6,6 +6,7 @@ from psychopy import visual, colors
 from psychopy.tests import utils
 from psychopy.tests.test_visual.test_basevisual import _TestColorMixin
 from psychopy.tools.stimulustools import serialize
+from psychopy.tools.profilingtools import FrameProfiler
 from psychopy import colors
 
 class TestWindow:
@@ -122,3 +123,46 @@ class TestWindow:
                     coord=(0, 0),
                     context=f"win_{color}_{colorSpace}")
 
+    def test_frame_profiler(self):
+        win = visual.Window(size=(200, 200), autoLog=False)
+        stims = [
+            visual.GratingStim(win, name="grating"),
+            visual.TextStim(win, name="text"),
+        ]
+        for stim in stims:
+            stim.autoDraw = True
+        calls = []
+        win.frameProfiler = FrameProfiler(nFrames=5, perStimulus=True)
+        for frameN in range(8):
+            win.callOnFlip(calls.append, frameN)
+            win.flip()
+        win.close()
+        # should have kept the last 5 frames, oldest first
+        timings = win.frameProfiler.getTimings()
+        assert timings['frameN'].tolist() == [3, 4, 5, 6, 7]
+        # every phase should have been timed on every frame
+        for phase in FrameProfiler.phases:
+            assert (timings[phase] >= 0).all()
+        assert (timings['total'] >= timings['autoDraw']).all()
+        # each stimulus should have been drawn (and timed) every frame
+        hists = win.frameProfiler.getStimulusHistograms()
+        assert sorted(hists) == ["grating", "text"]
+        for hist in hists.values():
+            assert hist.sum() == 8
+
+    def test_frame_profiler_gpu(self):
+        win = visual.Window(size=(200, 200), autoLog=False)
+        stim = visual.GratingStim(win, name="grating", autoDraw=True)
+        win.frameProfiler = FrameProfiler(nFrames=5, perStimulus=True, gpu=True)
+        for frameN in range(8):
+            win.flip()
+        win.frameProfiler.collectGPUTimes()
+        win.close()
+        # closing the window deletes the timer queries
+        gpuTimers = win.frameProfiler.gpuTimers
+        assert gpuTimers.nPending == 0 and gpuTimers._free == []
+        # GPU times should have arrived for (at least) the earlier frames
+        timings = win.frameProfiler.getTimings()
+        assert (timings['gpuAutoDraw'][:3] >= 0).all()
+        summary = win.frameProfiler.getStimulusSummary()
+        assert summary['grating']['gpuN'] >= 5
@@ -0,0 +1,60 @@
+"""Test streaming window frames to a movie file through pixel pack buffers.
+"""
+import os
+
+import pytest
+
+from psychopy import visual
+from psychopy.visual.windowcapture import MovieFrameCapture
+
+
+def test_numBuffers():
+    win = visual.Window([64, 48], allowGUI=False, autoLog=False)
+    try:
+        with pytest.raises(ValueError):
+            MovieFrameCapture(win, 'test.mp4', numBuffers=1)
+        with pytest.raises(ValueError):
+            MovieFrameCapture(win, 'test.mp4', buffer='side')
+        # nothing to stop
+        assert win.stopMovieCapture() is None
+    finally:
+        win.close()
+
+
+@pytest.mark.parametrize("buffer", ['front', 'back'])
+def test_movieCapture(tmp_path, buffer):
+    pytest.importorskip("ffpyplayer")
+
+    filename = str(tmp_path / 'test.mp4')
+    win = visual.Window([64, 48], allowGUI=False, autoLog=False)
+    try:
+        rect = visual.Rect(win, width=0.5, height=0.5, fillColor='red')
+        win.startMovieCapture(filename, fps=60, buffer=buffer)
+        with pytest.raises(RuntimeError):
+            win.startMovieCapture(filename)
+        capture = win._movieCapture
+
+        nFrames = 30
+        for frameN in range(nFrames):
+            rect.pos = (frameN / nFrames - 0.5, 0)
+            rect.draw()
+            if buffer == 'back':
+                assert win.getMovieFrame(buffer='back') is None
+                win.flip()
+            else:
+                win.flip()
+                assert win.getMovieFrame() is None
+            # frames are passed on a couple of captures later
+            assert capture.framesWaiting >= min(frameN + 1, 2)
+        # frames are not kept in memory
+        assert win.movieFrames == []
+
+        assert win.stopMovieCapture() == filename
+        assert capture.framesOut == nFrames
+        assert os.path.getsize(filename) > 0
+    finally:
+        win.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -16,6 +16,8 @@
 #
 import re
 import sys, os
+import json
+import hashlib
 import math
 import numpy as np
 import ctypes
@@ -66,6 +68,24 @@ _weightMap = {
 
 supportedExtensions = ['ttf', 'otf', 'ttc', 'dfont', 'truetype']
 
+# hashes of font file contents, keyed by path, modification time and size
+_fontFileHashes = {}
+
+
+def _hashFontFile(path):
+    """Get a hash of the contents of a font file, so that cached data can
+    be matched to the font it came from regardless of where it's installed.
+    """
+    info = os.stat(path)
+    key = (str(path), info.st_mtime_ns, info.st_size)
+    if key not in _fontFileHashes:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        _fontFileHashes[key] = sha.hexdigest()
+    return _fontFileHashes[key]
+
 
 def unicode(s, fmt='utf-8'):
     """Force to unicode if bytes"""
@@ -345,7 +365,11 @@ class GLFont:
             Position of the tops of the next line's ascenders relative to this line's baseline
     """
 
-    def __init__(self, filename, size, lineSpacing=1, textureSize=2048):
+    # version of the on-disk glyph atlas cache, change if its layout does
+    cacheVersion = 2
+
+    def __init__(self, filename, size, lineSpacing=1, textureSize=2048,
+                 useCache=True):
         """
         Initialize font
 
@@ -363,6 +387,11 @@ class GLFont:
 
         lineSpacing : float
             Leading between lines, proportional to font size
+
+        useCache : bool
+            Start from the glyphs saved by :meth:`saveToCache` for this font
+            file, size and texture format (if there are any), rather than
+            rasterising every glyph again.
         """
         self.scale = 64.0
         self.atlas = _TextureAtlas(textureSize, textureSize, format='alpha')
@@ -380,6 +409,10 @@ class GLFont:
         self.height = metrics.height / self.scale
         # Set spacing
         self.lineSpacing = lineSpacing
+        # have glyphs been added since the cache was loaded or saved?
+        self._unsaved = False
+        if useCache:
+            self.loadFromCache()
 
     def __getitem__(self, charcode):
         """
@@ -461,23 +494,39 @@ class GLFont:
         self._dirty = False
         return self.atlas.textureID
 
-    def preload(self, nMax=None):
-        """
-        :return:
+    def preload(self, charset=None, nMax=None, save=True):
+        """Rasterise a set of glyphs in advance, e.g. at the start of an
+        experiment, so that laying out text never has to during a trial.
+
+        Parameters
+        ----------
+        charset : str, iterable of str, int or None
+            Characters to load. If None, load the entire glyph set of the font
+            (or the first `nMax` glyphs). An int is taken as `nMax`, as this
+            used to be the only argument.
+        nMax : int or None
+            Maximum number of glyphs to load when loading the font's whole
+            glyph set.
+        save : bool
+            Save the atlas to the cache afterwards (if any glyphs were added),
+            so later sessions can load it rather than rasterising again.
         """
-        if nMax is None:
-            note = "entire glyph set"
+        if isinstance(charset, int):
+            charset, nMax = None, charset
+        if charset is None:
+            face = ft.Face(str(self.filename))  # ft.Face doesn't support Pathlib
+            chrs = (list(face.get_chars()))[:nMax]
+            charcodes = [chr(c[1]) for c in chrs]
         else:
-            note = "{} glyphs".format(nMax)
-        logging.debug("Preloading {} for Texture Font {}"
-                      .format(note, self.name))
-        face = ft.Face(str(self.filename))  # ft.Face doesn't support Pathlib
-
-        chrs = (list(face.get_chars()))[:nMax]
-        charcodes = [chr(c[1]) for c in chrs]
+            face = None
+            charcodes = list(dict.fromkeys(charset))
+        logging.debug("Preloading {} glyphs for Texture Font {}"
+                      .format(len(charcodes), self.name))
         self.fetch(charcodes, face=face)
         logging.debug("Preloading of glyph set for Texture Font {} complete"
                       .format(self.name))
+        if save:
+            self.saveToCache()
 
     def fetch(self, charcodes='', face=None):
         """
@@ -554,6 +603,7 @@ class GLFont:
             texcoords = (u0, v0, u1, v1)
             glyph = TextureGlyph(charcode, size, offset, advance, texcoords)
             self.glyphs[charcode] = glyph
+            self._unsaved = True
 
             # Generate kerning
             # for g in self.glyphs.values():
@@ -570,19 +620,127 @@ class GLFont:
         logging.debug("TextBox2 loaded {} chars with {} blanks and {} valid"
                      .format(len(charcodes), nBlanks, len(charcodes) - nBlanks))
 
-    def saveToCache(self):
-        """Store the current font texture as an image file.
-
-        As yet we aren't storing the offset, advance and texcoords as needed to
-        retrieve the necessary chars, but it's a start!
-            (see  TextureGlyph(charcode, size, offset, advance, texcoords) )
+    @property
+    def cacheFile(self):
+        """Path of the cached glyph atlas for this font, as a
+        :class:`~pathlib.Path` without an extension. The atlas bitmap is kept
+        in a `.npy` file and the glyph metrics in a `.json` file.
+
+        Cache files are named by a hash of the font file's contents, the font
+        size and the atlas size and format, so different copies of the same
+        font share one cache.
+        """
+        key = "{}_{:g}_{}_{}x{}".format(
+            _hashFontFile(self.filename), self.size, self.format,
+            self.atlas.width, self.atlas.height)
+        return Path(prefs.paths['userCacheDir']) / 'fontAtlases' / key
 
+    def saveToCache(self):
+        """Store the glyph atlas and the metrics of each glyph in it, so the
+        same glyphs can be loaded by :meth:`loadFromCache` in later sessions
+        rather than being rasterised again.
+
+        Returns
+        -------
+        bool
+            True if the cache was saved (or was already up to date).
+        """
+        if not self._unsaved:
+            return True
+        try:
+            cacheFile = self.cacheFile
+        except OSError as err:
+            logging.warning("Couldn't save font cache for {}: {}"
+                            .format(self.name, err))
+            return False
+        info = {
+            'version': self.cacheVersion,
+            'width': self.atlas.width,
+            'height': self.atlas.height,
+            'format': self.format,
+            'nodes': self.atlas.nodes,
+            'used': self.atlas.used,
+            'glyphs': [
+                [g.charcode, g.size, g.offset, g.advance, g.texcoords]
+                for g in self.glyphs.values()
+            ],
+        }
+        # the atlas may be mapped from the file being replaced, so take a
+        # copy of it first
+        if isinstance(self.atlas.data, np.memmap):
+            self.atlas.data = np.array(self.atlas.data)
+        # the metrics are only valid for the bitmap saved with them, and
+        # another session may replace one file between us replacing the two
+        info['atlasHash'] = self._hashAtlas(self.atlas.data)
+        # write to temporary files then move them into place, so other
+        # sessions never see a partly written file
+        tmpSuffix = ".{}.tmp".format(os.getpid())
+        try:
+            cacheFile.parent.mkdir(parents=True, exist_ok=True)
+            npyFile = cacheFile.with_suffix('.npy')
+            jsonFile = cacheFile.with_suffix('.json')
+            with open(str(npyFile) + tmpSuffix, 'wb') as f:
+                np.save(f, self.atlas.data)
+            with open(str(jsonFile) + tmpSuffix, 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+            os.replace(str(npyFile) + tmpSuffix, npyFile)
+            os.replace(str(jsonFile) + tmpSuffix, jsonFile)
+        except OSError as err:
+            logging.warning("Couldn't save font cache for {} to {}: {}"
+                            .format(self.name, cacheFile, err))
+            return False
+        self._unsaved = False
+        logging.debug("Saved {} glyphs for Texture Font {} to {}"
+                      .format(len(self.glyphs), self.name, cacheFile))
+        return True
+
+    def loadFromCache(self):
+        """Load glyphs stored by :meth:`saveToCache`, replacing any glyphs
+        already fetched.
+
+        The atlas bitmap is memory mapped (copy on write), so it's shared
+        with other sessions until glyphs are added to it. A cache whose
+        bitmap doesn't match its metrics (e.g. because another session saved
+        it at the same time) isn't loaded.
+
+        Returns
+        -------
+        bool
+            True if a valid cache was found and loaded.
+        """
+        try:
+            cacheFile = self.cacheFile
+            with open(cacheFile.with_suffix('.json'), 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            data = np.load(cacheFile.with_suffix('.npy'), mmap_mode='c')
+        except (OSError, ValueError):
+            return False
+        if (info.get('version') != self.cacheVersion
+                or info.get('format') != self.format
+                or data.shape != self.atlas.data.shape
+                or data.dtype != self.atlas.data.dtype
+                or info.get('atlasHash') != self._hashAtlas(data)):
+            return False
+        self.atlas.data = data
+        self.atlas.nodes = [tuple(node) for node in info['nodes']]
+        self.atlas.used = info['used']
+        self.glyphs = {}
+        for charcode, size, offset, advance, texcoords in info['glyphs']:
+            self.glyphs[charcode] = TextureGlyph(
+                charcode, tuple(size), tuple(offset), tuple(advance),
+                tuple(texcoords))
+        self._dirty = True
+        self._unsaved = False
+        logging.debug("Loaded {} glyphs for Texture Font {} from {}"
+                      .format(len(self.glyphs), self.name, cacheFile))
+        return True
+
+    @staticmethod
+    def _hashAtlas(data):
+        """Get a hash of the atlas bitmap, to check it against the metrics
+        saved with it.
         """
-        from PIL import Image
-        im = Image.fromarray(self.atlas.data)
-        fname = "{}/.psychopy3/{}_{}_texture.png".format(
-            os.path.expanduser("~"), self.name, self.size)
-        im.save(fname)
+        return hashlib.sha1(np.ascontiguousarray(data)).hexdigest()
 
     def upload(self):
         """Upload the font data into graphics card memory.
@@ -691,6 +849,117 @@ def findFontFiles(folders=(), recursive=True):
     return fontPaths
 
 
+class _FontIndex:
+    """Record of the faces found in each font file, kept in the user's cache
+    folder so that font files only need opening with FreeType when they're
+    new or have changed.
+
+    Files are keyed by path, and an entry is only used while the file's
+    modification time and size still match those recorded. The paths found
+    by the last search of the system font folders are also kept, so fonts
+    can be looked up without searching again.
+    """
+    version = 1
+
+    def __init__(self, fileName=None):
+        if fileName is None:
+            fileName = Path(prefs.paths['userCacheDir']) / 'fontIndex.json'
+        self.fileName = Path(fileName)
+        self.files = {}
+        self.systemFonts = []
+        self.changed = False
+        self.load()
+
+    def load(self):
+        """Load the index from its file, if there is a valid one.
+        """
+        try:
+            with open(self.fileName, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != self.version:
+            return
+        self.files = data.get('files', {})
+        self.systemFonts = data.get('systemFonts', [])
+
+    def save(self):
+        """Save the index to its file, if anything has changed.
+        """
+        if not self.changed:
+            return
+        data = {
+            'version': self.version,
+            'files': self.files,
+            'systemFonts': self.systemFonts,
+        }
+        # write to a temporary file first, so other sessions never see a
+        # partly written index
+        tmpName = self.fileName.with_name(
+            "{}.{}.tmp".format(self.fileName.name, os.getpid()))
+        try:
+            self.fileName.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmpName, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmpName, self.fileName)
+        except OSError as err:
+            logging.warning("Couldn't save font index to {}: {}"
+                            .format(self.fileName, err))
+            return
+        self.changed = False
+
+    @staticmethod
+    def _stat(path):
+        info = os.stat(path)
+        return info.st_mtime_ns, info.st_size
+
+    def get(self, path):
+        """Get the faces recorded for a font file.
+
+        Returns
+        -------
+        list of dict or None
+            Records of each face in the file, or None if the file isn't in
+            the index or has changed since it was added.
+        """
+        entry = self.files.get(str(path))
+        if entry is None:
+            return None
+        try:
+            mtime, size = self._stat(path)
+        except OSError:
+            return None
+        if entry['mtime'] != mtime or entry['size'] != size:
+            return None
+        return entry['faces']
+
+    def set(self, path, faces):
+        """Record the faces in a font file.
+        """
+        try:
+            mtime, size = self._stat(path)
+        except OSError:
+            return
+        self.files[str(path)] = {'mtime': mtime, 'size': size, 'faces': faces}
+        self.changed = True
+
+    def setSystemFonts(self, paths):
+        """Record the font files found in the system font folders.
+        """
+        paths = [str(path) for path in paths]
+        if paths != self.systemFonts:
+            self.systemFonts = paths
+            self.changed = True
+
+    def prune(self):
+        """Remove any files which no longer exist from the index.
+        """
+        for path in list(self.files):
+            if not os.path.isfile(path):
+                del self.files[path]
+                self.changed = True
+
+
 class FontManager():
     """FontManager provides a simple API for finding and loading font files
     (.ttf) via the FreeType lib
@@ -716,21 +985,29 @@ class FontManager():
     FontManager and can be used by all TextBox instances created within the
     experiment.
 
+    Information about each font file is kept in an index in the user's cache
+    folder, so only new or changed font files need to be opened. The system
+    font folders aren't searched until a font is needed which isn't in the
+    index (or a list of all fonts is requested).
+
     """
     freetype_import_error = None
     _glFonts = {}
     fontStyles = []
     _fontInfos = {}  # JWP: dict of name:FontInfo objects
+    _fontInfosByPath = {}
+    _addedFontFiles = {}  # path:monospaceOnly of fonts not found by searching
 
     def __init__(self, monospaceOnly=False):
+        self._index = _FontIndex()
+        self._indexLoaded = False  # fonts from the index have been added
+        self._searched = False  # system font folders have been searched
+        self.monospaceOnly = monospaceOnly
         self.addFontDirectory(prefs.paths['resources'])
         # if FontManager.freetype_import_error:
         #    raise Exception('Appears the freetype library could not load.
         #       Error: %s'%(str(FontManager.freetype_import_error)))
 
-        self.monospaceOnly = monospaceOnly
-        self.updateFontInfo(monospaceOnly)
-
     def __str__(self):
         S = "Loaded:\n"
         if len(self._glFonts):
@@ -758,15 +1035,33 @@ class FontManager():
                                "Existing fonts: {}"
                                .format(list(self._fontInfos)))
 
+    def _loadFontInfo(self, search=False):
+        """Make sure the fonts from the system font folders have been added,
+        from the index if they haven't been added yet, and by searching the
+        folders if `search` is True (only the first time).
+        """
+        if not self._indexLoaded:
+            self._indexLoaded = True
+            for path in self._index.systemFonts:
+                for record in self._index.get(path) or ():
+                    if self.monospaceOnly and not record['monospace']:
+                        continue
+                    self._addFontRecord(record)
+            self.fontStyles.sort()
+        if search and not self._searched:
+            self.updateFontInfo(self.monospaceOnly)
+
     def getFontFamilyNames(self):
         """Returns a list of the available font family names.
         """
+        self._loadFontInfo(search=True)
         return list(self._fontInfos.keys())
 
     def getFontStylesForFamily(self, family_name):
         """For the given family, a list of style names supported is
         returned.
         """
+        self._loadFontInfo(search=family_name not in self._fontInfos)
         style_dict = self._fontInfos.get(family_name)
         if style_dict:
             return list(style_dict.keys())
@@ -775,6 +1070,7 @@ class FontManager():
         """Returns a list where each element of the list is a itself a
         two element list of [fontName,[fontStyle_names_list]]
         """
+        self._loadFontInfo(search=True)
         return self.fontStyles
 
     def getFontsMatching(self, fontName, bold=False, italic=False,
@@ -791,6 +1087,10 @@ class FontManager():
             bold = _weightMap[bold]
         else:
             bold = _weightMap[False] # Default to regular
+        # only search the system font folders if the index doesn't have it
+        self._loadFontInfo()
+        if fontName not in self._fontInfos:
+            self._loadFontInfo(search=True)
         style_dict = self._fontInfos.get(fontName)
         if not style_dict:
             if not fallback:
@@ -817,11 +1117,17 @@ class FontManager():
             b, i = self.booleansFromStyleName(style)
             if b == bold and i == italic:
                 return fonts
+        if not self._searched:
+            # style may be in a font file which isn't in the index yet
+            self._loadFontInfo(search=True)
+            return self.getFontsMatching(fontName, bold, italic, fontStyle,
+                                         fallback)
         return None
 
     def getFontNamesSimilar(self, fontName):
         if type(fontName) != bytes:
             fontName = bytes(fontName, sys.getfilesystemencoding())
+        self._loadFontInfo(search=True)
         allNames = list(self._fontInfos)
         similar = [this for this in allNames if
                    (fontName.lower() in this.lower())]
@@ -864,25 +1170,45 @@ class FontManager():
         the script, so any extra font paths need to be added each time the
         script starts.
         """
+        # remember the font so it's kept when the system fonts are searched
+        self._addedFontFiles[str(fontPath)] = monospaceOnly
+        return self._addFontFile(fontPath, monospaceOnly)
+
+    def _addFontFile(self, fontPath, monospaceOnly=False):
         fi_list = set()
         if os.path.isfile(fontPath) and os.path.exists(fontPath):
-            try:
-                face = ft.Face(str(fontPath))
-            except Exception:
-                logging.warning("Font Manager failed to load file {}"
-                                .format(fontPath))
-                return
-            if face.family_name is None:
-                logging.warning("{} doesn't have valid font family name"
-                                .format(fontPath))
-                return
-            if monospaceOnly:
-                if face.is_fixed_width:
-                    fi_list.add(self._createFontInfo(fontPath, face))
-            else:
-                fi_list.add(self._createFontInfo(fontPath, face))
+            faces = self._index.get(fontPath)
+            if faces is None:
+                # new or changed, so need to open it
+                faces = self._readFontFile(fontPath)
+                self._index.set(fontPath, faces)
+            for record in faces:
+                if monospaceOnly and not record['monospace']:
+                    continue
+                fi_list.add(self._addFontRecord(record))
         return fi_list
 
+    def _readFontFile(self, fontPath):
+        """Open a font file with FreeType to get a record of its face for
+        the font index (an empty list if it isn't a valid font).
+        """
+        try:
+            face = ft.Face(str(fontPath))
+        except Exception:
+            logging.warning("Font Manager failed to load file {}"
+                            .format(fontPath))
+            return []
+        if face.family_name is None:
+            logging.warning("{} doesn't have valid font family name"
+                            .format(fontPath))
+            return []
+        record = FontInfo(fontPath, face).asdict()
+        record['path'] = str(fontPath)
+        # names as given by FreeType (bytes), which fonts are looked up by
+        record['familyName'] = face.family_name.decode('utf-8', 'surrogateescape')
+        record['styleName'] = face.style_name.decode('utf-8', 'surrogateescape')
+        return [record]
+
     def addFontFiles(self, fontPaths, monospaceOnly=False):
         """ Add a list of font files to the FontManger font search space.
         Each element of the fontPaths list must be a valid path including
@@ -901,6 +1227,7 @@ class FontManager():
         for fp in fontPaths:
             self.addFontFile(fp, monospaceOnly)
         self.fontStyles.sort()
+        self._index.save()
 
         return fi_list
 
@@ -956,10 +1283,23 @@ class FontManager():
         return glFont
 
     def updateFontInfo(self, monospaceOnly=False):
+        """Search the system font folders for fonts. Only fonts which are new
+        or have changed since they were last found need to be opened. Fonts
+        added with `addFontFile` (or `addFontDirectory` etc.) are kept.
+        """
         self._fontInfos.clear()
+        self._fontInfosByPath.clear()
         del self.fontStyles[:]
         fonts_found = findFontFiles()
-        self.addFontFiles(fonts_found, monospaceOnly)
+        self._index.prune()
+        self._index.setSystemFonts(fonts_found)
+        for fp in fonts_found:
+            self._addFontFile(fp, monospaceOnly)
+        for fp, fpMonospaceOnly in list(self._addedFontFiles.items()):
+            self._addFontFile(fp, fpMonospaceOnly)
+        self.fontStyles.sort()
+        self._index.save()
+        self._indexLoaded = self._searched = True
 
     def booleansFromStyleName(self, style):
         """
@@ -985,18 +1325,33 @@ class FontManager():
 
     def _createFontInfo(self, fp, fface):
         """"""
-        fns = (fface.family_name, fface.style_name)
+        return self._addFontInfo(
+            FontInfo(fp, fface), fface.family_name, fface.style_name)
+
+    def _addFontRecord(self, record):
+        """Add a font from its record in the font index, without opening
+        the font file.
+        """
+        fi = self._fontInfosByPath.get(record['path'])
+        if fi is not None:
+            return fi  # already added
+        return self._addFontInfo(
+            FontInfo.fromDict(record),
+            record['familyName'].encode('utf-8', 'surrogateescape'),
+            record['styleName'].encode('utf-8', 'surrogateescape'))
+
+    def _addFontInfo(self, fi, familyName, styleName):
+        fns = (familyName, styleName)
         if fns in self.fontStyles:
             pass
         else:
-            self.fontStyles.append(
-                (fface.family_name, fface.style_name))
+            self.fontStyles.append(fns)
 
         styles_for_font_dict = FontManager._fontInfos.setdefault(
-            fface.family_name, {})
-        fonts_for_style = styles_for_font_dict.setdefault(fface.style_name, [])
-        fi = FontInfo(fp, fface)
+            familyName, {})
+        fonts_for_style = styles_for_font_dict.setdefault(styleName, [])
         fonts_for_style.append(fi)
+        self._fontInfosByPath[str(fi.path)] = fi
         return fi
 
     def __del__(self):
@@ -1007,6 +1362,9 @@ class FontManager():
         if self._fontInfos:
             self._fontInfos.clear()
             self._fontInfos = None
+        if self._fontInfosByPath:
+            self._fontInfosByPath.clear()
+            self._fontInfosByPath = None
 
 
 class FontInfo():
@@ -1025,6 +1383,19 @@ class FontInfo():
         self.charmap_id = face.charmap.index
         self.label = "%s_%s" % (face.family_name, face.style_name)
 
+    @classmethod
+    def fromDict(cls, d):
+        """Create a FontInfo from the values given by :meth:`asdict`,
+        without opening the font file.
+        """
+        fi = cls.__new__(cls)
+        for k, v in d.items():
+            if k in ('familyName', 'styleName'):
+                continue
+            setattr(fi, k, v)
+        fi.path = Path(fi.path)
+        return fi
+
     def __str__(self):
         """Generate a string identifier for this font name_style
         """
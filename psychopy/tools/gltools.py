@@ -34,6 +34,8 @@ __all__ = [
     'beginQuery',
     'endQuery',
     'getQuery',
+    'isQueryAvailable',
+    'deleteQueryObject',
     'getAbsTimeGPU',
     'createFBO',
     'attach',
@@ -1084,6 +1086,52 @@ def getQuery(query):
         raise TypeError('Argument `query` must be `QueryObjectInfo` instance.')
 
 
+def isQueryAvailable(query):
+    """Check if the result of a query is ready, without waiting for it.
+
+    Calling :func:`getQuery` before the result is ready stalls until the GPU
+    has caught up, so use this to only read results which are ready (e.g.
+    on the next frame).
+
+    Parameters
+    ----------
+    query : QueryObjectInfo
+        Query object descriptor returned by :func:`createQueryObject`,
+        previously passed to :func:`endQuery`.
+
+    Returns
+    -------
+    bool
+        `True` if the result can be read without waiting.
+
+    """
+    params = GL.GLuint(0)
+    if isinstance(query, QueryObjectInfo):
+        GL.glGetQueryObjectuiv(
+            query.name,
+            GL.GL_QUERY_RESULT_AVAILABLE,
+            ctypes.byref(params))
+
+        return params.value == GL.GL_TRUE
+    else:
+        raise TypeError('Argument `query` must be `QueryObjectInfo` instance.')
+
+
+def deleteQueryObject(query):
+    """Delete a query object.
+
+    Parameters
+    ----------
+    query : QueryObjectInfo
+        Query object descriptor returned by :func:`createQueryObject`.
+
+    """
+    if isinstance(query, QueryObjectInfo):
+        GL.glDeleteQueries(1, ctypes.byref(query.name))
+    else:
+        raise TypeError('Argument `query` must be `QueryObjectInfo` instance.')
+
+
 def getAbsTimeGPU():
     """Get the absolute GPU time in nanoseconds.
 
@@ -105,6 +105,18 @@ class MovieFileWriter:
         to control the quality of the movie, for example. The options depend on
         the `encoderLib` in use. If `None`, the writer will use the default
         options for the backend.
+    maxQueueSize : int
+        Maximum number of frames which can be waiting to be written to disk. If
+        `0` (the default), the queue is unbounded and frames are never dropped,
+        however memory use will grow if frames are added faster than they can
+        be encoded. Set this to a positive value to limit memory use when
+        streaming frames to disk over long periods.
+    queuePolicy : str
+        What to do when `addFrame()` is called and the queue is full (only used
+        if `maxQueueSize > 0`). Use `'block'` to wait until the writer thread
+        makes room for the frame (backpressure), or `'drop'` to discard the
+        frame and return immediately. The number of discarded frames is given
+        by `framesDropped`.
 
     Examples
     --------
@@ -162,12 +174,24 @@ class MovieFileWriter:
     PIXEL_FORMAT_RGB24 = 'rgb24'
     PIXEL_FORMAT_RGBA32 = 'rgb32'
 
+    # policies for handling frames when the queue is full
+    QUEUE_POLICY_BLOCK = 'block'
+    QUEUE_POLICY_DROP = 'drop'
+
     def __init__(self, filename, size, fps, codec=None, pixelFormat='rgb24',
-                 encoderLib='ffpyplayer', encoderOpts=None):
+                 encoderLib='ffpyplayer', encoderOpts=None, maxQueueSize=0,
+                 queuePolicy='block'):
+
+        if queuePolicy not in (self.QUEUE_POLICY_BLOCK, self.QUEUE_POLICY_DROP):
+            raise ValueError(
+                "Invalid value for `queuePolicy`, expected 'block' or "
+                "'drop'.")
         
         # objects needed to build up the asynchronous movie writer interface
         self._writerThread = None  # thread for writing the movie file
-        self._frameQueue = queue.Queue()  # queue for frames to be written
+        # queue for frames to be written, unbounded if `maxQueueSize` is zero
+        self._frameQueue = queue.Queue(maxsize=max(int(maxQueueSize), 0))
+        self._queuePolicy = queuePolicy
         self._dataLock = threading.Lock()  # lock for accessing shared data
         self._lastVideoFile = None  # last video file we wrote to
 
@@ -203,6 +227,7 @@ class MovieFileWriter:
         self._pts = 0.0  # most recent presentation timestamp
         self._bytesOut = 0
         self._framesOut = 0
+        self._framesDropped = 0
 
     def __hash__(self):
         """Use the absolute file path as the hash value since we only allow one 
@@ -449,6 +474,32 @@ class MovieFileWriter:
         """
         return self._frameQueue.qsize()
     
+    @property
+    def maxQueueSize(self):
+        """Maximum number of frames which can be waiting to be written to disk
+        (`int`). A value of `0` means the queue is unbounded.
+        """
+        return self._frameQueue.maxsize
+
+    @property
+    def queuePolicy(self):
+        """Policy used by `addFrame()` when the queue is full (`str`). Either
+        `'block'` or `'drop'`.
+        """
+        return self._queuePolicy
+
+    @property
+    def framesDropped(self):
+        """Number of frames discarded by `addFrame()` because the queue was 
+        full (`int`). 
+        
+        This is only ever non-zero if `queuePolicy` is `'drop'`. The value is 
+        retained after the movie file is closed and cleared when a new movie 
+        file is opened.
+
+        """
+        return self._framesDropped
+
     @property
     def totalFrames(self):
         """The total number of frames that will be written to the movie file
@@ -735,7 +786,7 @@ class MovieFileWriter:
         logging.debug('Creating movie file for writing %s', self._filename)
 
         # reset counters
-        self._bytesOut = self._framesOut = 0
+        self._bytesOut = self._framesOut = self._framesDropped = 0
         self._pts = 0.0
 
         # eventually we'll want to support other encoder libraries, for now
@@ -877,7 +928,9 @@ class MovieFileWriter:
 
         This adds a frame to the movie. The frame will be added to a queue and
         written to disk by a background thread. This method will block until the
-        frame is added to the queue. 
+        frame is added to the queue. If the queue is bounded (`maxQueueSize`)
+        and full, the frame is discarded instead when `queuePolicy` is 
+        `'drop'`.
         
         Any color space conversion or resizing will be performed in the caller's 
         thread. This may be threaded too in the future.
@@ -898,10 +951,10 @@ class MovieFileWriter:
 
         Returns
         -------
-        float
+        float or None
             Presentation timestamp assigned to the frame. Should match the value 
             passed in as `pts` if provided, otherwise it will be the computed
-            presentation timestamp.
+            presentation timestamp. Returns `None` if the frame was dropped.
 
         """
         if not self.isOpen:
@@ -916,12 +969,20 @@ class MovieFileWriter:
         # get computed presentation timestamp if not provided
         pts = self._pts if pts is None else pts
 
-        # pass the image data to the writer thread
-        self._frameQueue.put((colorData, pts))
-
-        # update the presentation timestamp after adding the frame
+        # update the presentation timestamp after adding the frame, dropped 
+        # frames still advance the timestamp so following frames keep time
         self._pts += self._frameInterval
 
+        # pass the image data to the writer thread
+        if self._queuePolicy == self.QUEUE_POLICY_DROP:
+            try:
+                self._frameQueue.put_nowait((colorData, pts))
+            except queue.Full:
+                self._framesDropped += 1
+                return None
+        else:
+            self._frameQueue.put((colorData, pts))
+
         return pts
 
     def __del__(self):
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tools for measuring how long each part of drawing a frame takes.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['FrameProfiler', 'GPUTimerPool']
+
+import time
+import numpy as np
+
+
+class GPUTimerPool:
+    """A pool of reusable OpenGL timer queries, used to measure how long the
+    GPU spends on drawing each stimulus.
+
+    Results are never waited for: a query is only read once its result is
+    available (usually by the next frame), so timing doesn't stall the
+    pipeline. Queries are returned to the pool once read, so only as many
+    are created as are in flight at once. Requires an OpenGL context with
+    timer queries (OpenGL 3.3 or ARB_timer_query).
+    """
+
+    def __init__(self):
+        self._free = []
+        # (tag, query) pairs in the order they were ended
+        self._pending = []
+        self._active = None
+
+    def _createQuery(self):
+        from psychopy.tools import gltools
+        return gltools.createQueryObject(gltools.GL.GL_TIME_ELAPSED)
+
+    def _beginQuery(self, query):
+        from psychopy.tools import gltools
+        gltools.beginQuery(query)
+
+    def _endQuery(self, query):
+        from psychopy.tools import gltools
+        gltools.endQuery(query)
+
+    def _isAvailable(self, query):
+        from psychopy.tools import gltools
+        return gltools.isQueryAvailable(query)
+
+    def _getResult(self, query):
+        from psychopy.tools import gltools
+        return gltools.getQuery(query)
+
+    def _deleteQuery(self, query):
+        from psychopy.tools import gltools
+        gltools.deleteQueryObject(query)
+
+    def begin(self, tag):
+        """Start timing GL commands, only one timer can be running at once.
+
+        Parameters
+        ----------
+        tag : object
+            Anything to identify this timing by when its result is read.
+        """
+        if self._free:
+            query = self._free.pop()
+        else:
+            query = self._createQuery()
+        self._beginQuery(query)
+        self._active = (tag, query)
+
+    def end(self):
+        """Stop timing GL commands, the result will be available from
+        :meth:`collect` once the GPU has finished them.
+        """
+        tag, query = self._active
+        self._endQuery(query)
+        self._pending.append(self._active)
+        self._active = None
+
+    def collect(self):
+        """Get the results of any timers which have finished, without
+        waiting for the others.
+
+        Returns
+        -------
+        list of tuple
+            (tag, seconds) for each finished timer, in the order they were
+            started.
+        """
+        results = []
+        nDone = 0
+        for tag, query in self._pending:
+            # queries finish in order, so stop at the first one that hasn't
+            if not self._isAvailable(query):
+                break
+            results.append((tag, self._getResult(query) * 1e-9))
+            self._free.append(query)
+            nDone += 1
+        del self._pending[:nDone]
+        return results
+
+    @property
+    def nPending(self):
+        """Number of timers whose results haven't been collected yet.
+        """
+        return len(self._pending)
+
+    def release(self):
+        """Delete all queries in the pool, discarding any pending results.
+        Must be called while the context which created them is current.
+        """
+        for tag, query in self._pending:
+            self._free.append(query)
+        self._pending = []
+        for query in self._free:
+            self._deleteQuery(query)
+        self._free = []
+
+
+class FrameProfiler:
+    """Records how long each phase of :meth:`~psychopy.visual.Window.flip`
+    takes on every frame, to find out what is using up the frame budget.
+
+    Timings are kept in a preallocated ring buffer, so only the last
+    `nFrames` frames are kept and recording doesn't allocate anything once
+    started. Attach a profiler to a window to start recording::
+
+        win.frameProfiler = FrameProfiler(nFrames=3600, perStimulus=True)
+        ...
+        timings = win.frameProfiler.getTimings()
+
+    Parameters
+    ----------
+    nFrames : int
+        Number of frames to keep timings for.
+    perStimulus : bool
+        Also time the drawing of each stimulus which is being auto-drawn,
+        and keep a histogram of those times for each stimulus.
+    histBins : array_like or None
+        Edges of the bins (s) to use for per-stimulus histograms, times
+        beyond the last edge are counted in the last bin. Default is 0-20ms
+        in steps of 0.1ms.
+    clock : callable
+        Function giving the current time in seconds.
+    gpu : bool or GPUTimerPool
+        If True (and `perStimulus` is True), also measure the time the GPU
+        spends drawing each stimulus, using a :class:`GPUTimerPool`. Results
+        are read on a later frame rather than waited for, so the GPU times
+        for the last frame or two may not be available yet.
+
+    """
+    # phases of a flip, in the order they happen
+    phases = (
+        'autoDraw',  # drawing stimuli with autoDraw set
+        'editables',  # checking which editable stimulus has focus
+        'fbo',  # drawing the framebuffer to the back buffer
+        'swapBuffers',  # swapping the front and back buffers
+        'transform',  # resetting the view and buffer for the next frame
+        'waitBlanking',  # waiting for the swap to complete (glFinish)
+        'callOnFlip',  # functions scheduled with callOnFlip
+        'logReplay',  # frame interval bookkeeping and logOnFlip messages
+        'nextFrame',  # anything drawn ready for the next frame
+    )
+
+    def __init__(self, nFrames=3600, perStimulus=False, histBins=None,
+                 clock=time.perf_counter, gpu=False):
+        self.nFrames = int(nFrames)
+        self.perStimulus = perStimulus
+        self.clock = clock
+        # ring buffer of phase durations, with the total as the last column
+        self._timings = np.full(
+            (self.nFrames, len(self.phases) + 1), np.nan, dtype=np.float64)
+        self._frameTimes = np.full(self.nFrames, np.nan, dtype=np.float64)
+        self._phaseIndex = {name: i for i, name in enumerate(self.phases)}
+        self.frameN = 0  # number of frames recorded so far
+        self._frameStart = self._lastLap = None
+        # per-stimulus histograms of draw times
+        if histBins is None:
+            histBins = np.arange(0, 0.0201, 0.0001)
+        self.histBins = np.asarray(histBins, dtype=np.float64)
+        self._stimHists = {}
+        self._stimTimes = {}
+        # GPU timings, filled in as results arrive
+        if gpu is True:
+            gpu = GPUTimerPool()
+        self.gpuTimers = gpu or None
+        self._gpuTimings = np.full(self.nFrames, np.nan, dtype=np.float64)
+        self._gpuStimHists = {}
+        self._gpuStimTimes = {}
+
+    def startFrame(self):
+        """Mark the start of a flip.
+        """
+        self._frameStart = self._lastLap = self.clock()
+        self._timings[self.frameN % self.nFrames] = np.nan
+        self._gpuTimings[self.frameN % self.nFrames] = np.nan
+        # pick up any GPU timings from previous frames
+        if self.gpuTimers is not None:
+            self.collectGPUTimes()
+
+    def lap(self, phase):
+        """Record the time since the last lap (or the start of the frame) as
+        the duration of the given phase.
+
+        Parameters
+        ----------
+        phase : str
+            One of the names in `FrameProfiler.phases`.
+        """
+        now = self.clock()
+        self._timings[self.frameN % self.nFrames, self._phaseIndex[phase]] = \
+            now - self._lastLap
+        self._lastLap = now
+
+    def endFrame(self, frameTime=None):
+        """Mark the end of a flip, recording its total duration.
+
+        Parameters
+        ----------
+        frameTime : float or None
+            Time the flip completed, as given by the window.
+        """
+        row = self.frameN % self.nFrames
+        self._timings[row, -1] = self.clock() - self._frameStart
+        self._frameTimes[row] = np.nan if frameTime is None else frameTime
+        self.frameN += 1
+
+    def drawStimulus(self, stim):
+        """Draw a stimulus, recording how long it took.
+
+        Parameters
+        ----------
+        stim : object
+            Stimulus to draw.
+        """
+        name = self._stimName(stim)
+        if self.gpuTimers is not None:
+            self.gpuTimers.begin((self.frameN, name))
+        t0 = self.clock()
+        try:
+            stim.draw()
+        finally:
+            # always end the query, else later queries would fail to begin
+            if self.gpuTimers is not None:
+                self.gpuTimers.end()
+        t1 = self.clock()
+        self.addStimulusTime(name, t1 - t0)
+
+    def collectGPUTimes(self):
+        """Read any GPU timings which have finished since this was last
+        called (this is done at the start of each frame anyway).
+        """
+        for (frameN, name), duration in self.gpuTimers.collect():
+            self.addStimulusTime(name, duration, gpu=True)
+            # add to the frame total, if it's still in the buffer
+            if self.frameN - frameN < self.nFrames:
+                row = frameN % self.nFrames
+                if np.isnan(self._gpuTimings[row]):
+                    self._gpuTimings[row] = 0
+                self._gpuTimings[row] += duration
+
+    @staticmethod
+    def _stimName(stim):
+        return getattr(stim, 'name', None) or repr(stim)
+
+    def addStimulusTime(self, name, duration, gpu=False):
+        """Count a stimulus draw time into its histogram.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stimulus.
+        duration : float
+            Time taken to draw it (s).
+        gpu : bool
+            Is this the time taken by the GPU, rather than the CPU?
+        """
+        if gpu:
+            hists, times = self._gpuStimHists, self._gpuStimTimes
+        else:
+            hists, times = self._stimHists, self._stimTimes
+        hist = hists.get(name)
+        if hist is None:
+            hist = hists[name] = np.zeros(
+                max(self.histBins.size - 1, 1), dtype=np.int64)
+            times[name] = [0.0, 0]  # total time, number of draws
+        index = np.searchsorted(self.histBins, duration, side='right') - 1
+        hist[min(max(index, 0), hist.size - 1)] += 1
+        times[name][0] += duration
+        times[name][1] += 1
+
+    def _ordered(self, array):
+        """Get the rows of a ring buffer from oldest to newest.
+        """
+        if self.frameN <= self.nFrames:
+            return array[:self.frameN].copy()
+        start = self.frameN % self.nFrames
+        return np.concatenate((array[start:], array[:start]))
+
+    def getTimings(self, asDataFrame=True):
+        """Get the timings of the frames recorded so far (up to the last
+        `nFrames`), from oldest to newest.
+
+        Parameters
+        ----------
+        asDataFrame : bool
+            If True, return a DataFrame with columns `frameN`, `t` (the time
+            each flip completed), each phase and `total` (plus `gpuAutoDraw`,
+            the GPU time spent drawing stimuli, if timing the GPU).
+            Otherwise return a NumPy array of the phase durations, with
+            total as the last column.
+
+        Returns
+        -------
+        pandas.DataFrame or numpy.ndarray
+            Durations are in seconds, phases which didn't happen on a given
+            frame are NaN.
+        """
+        timings = self._ordered(self._timings)
+        if not asDataFrame:
+            return timings
+        import pandas as pd
+        df = pd.DataFrame(timings, columns=list(self.phases) + ['total'])
+        df.insert(0, 't', self._ordered(self._frameTimes))
+        df.insert(0, 'frameN', np.arange(self.frameN - len(df), self.frameN))
+        if self.gpuTimers is not None:
+            df['gpuAutoDraw'] = self._ordered(self._gpuTimings)
+        return df
+
+    def getStimulusHistograms(self, gpu=False):
+        """Get the histogram of draw times for each stimulus.
+
+        Parameters
+        ----------
+        gpu : bool
+            Get histograms of GPU times rather than CPU times.
+
+        Returns
+        -------
+        dict
+            Stimulus names mapped to an array of counts, one per bin
+            defined by `histBins`.
+        """
+        hists = self._gpuStimHists if gpu else self._stimHists
+        return {name: hist.copy() for name, hist in hists.items()}
+
+    def getStimulusSummary(self):
+        """Get the mean draw time and number of draws for each stimulus.
+
+        Returns
+        -------
+        dict
+            Stimulus names mapped to a dict with keys `mean` and `n` (plus
+            `gpuMean` and `gpuN` if timing the GPU).
+        """
+        summary = {
+            name: {'mean': total / n, 'n': n}
+            for name, (total, n) in self._stimTimes.items()
+        }
+        for name, (total, n) in self._gpuStimTimes.items():
+            summary.setdefault(name, {}).update({'gpuMean': total / n, 'gpuN': n})
+        return summary
+
+    def reset(self):
+        """Clear all timings recorded so far.
+        """
+        self._timings[:] = np.nan
+        self._frameTimes[:] = np.nan
+        self._gpuTimings[:] = np.nan
+        self.frameN = 0
+        self._stimHists.clear()
+        self._stimTimes.clear()
+        self._gpuStimHists.clear()
+        self._gpuStimTimes.clear()
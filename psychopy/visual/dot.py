@@ -35,9 +35,10 @@ from psychopy import logging
 # (JWP has no idea why!)
 from psychopy.tools.attributetools import attributeSetter, setAttribute
 from psychopy.tools.arraytools import val2array
+import psychopy.tools.gltools as gltools
 from psychopy.visual.basevisual import (BaseVisualStim, ColorMixin,
                                         ContainerMixin, WindowMixin)
-from psychopy.layout import Size
+from psychopy.layout import Size, Vertices
 
 import numpy as np
 
@@ -73,7 +74,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
     and its _update_dotsXY and _newDotsXY methods overridden.
 
     The maximum number of dots that can be drawn is limited by system
-    performance.
+    performance. For very large numbers of dots, use `useVBO=True`: dot
+    positions are then updated in place in a float32 array and drawn from a
+    single vertex buffer, with the conversion to pixels done by the graphics
+    card rather than for every dot on every frame.
 
     Attributes
     ----------
@@ -147,7 +151,8 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
                  signalDots='same',
                  noiseDots='direction',
                  name=None,
-                 autoLog=None):
+                 autoLog=None,
+                 useVBO=False):
         """
         Parameters
         ----------
@@ -226,6 +231,11 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             Optional name to use for logging.
         autoLog : bool
             Enable automatic logging.
+        useVBO : bool
+            Update dots in place and draw them from a vertex buffer, which is
+            much faster for large numbers of dots. `vertices` and
+            `verticesPix` are then only calculated when they're accessed.
+            Has no effect if `element` is set or units are 'degFlat'.
 
         """
         # what local vars are defined (these are the init params) for use by
@@ -237,6 +247,11 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
                                       autoLog=False)  # set at end of init
 
         self.nDots = nDots
+        # batched updating and drawing, buffers are made when first needed
+        self.useVBO = useVBO
+        self._batchBuffers = None
+        self._dotsVBO = None
+        self._needVelocityUpdate = True
         # pos and size are ambiguous for dots so DotStim explicitly has
         # fieldPos = pos, fieldSize=size and then dotSize as additional param
         self.fieldPos = fieldPos  # self.pos is also set here
@@ -447,6 +462,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         if self.noiseDots in ('direction', 'position', 'walk'):
             self._dotsDir = np.random.rand(self.nDots) * _2pi
             self._dotsDir[self._signalDots] = self.dir * _piOver180
+        self._needVelocityUpdate = True
 
     def setFieldCoherence(self, val, op='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead, but use 
@@ -466,6 +482,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         # dots currently moving in the signal direction also need to update
         # their direction
         self._dotsDir[signalDots] = self.dir * _piOver180
+        self._needVelocityUpdate = True
 
     def setDir(self, val, op='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead, but use 
@@ -479,6 +496,7 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         <attrib-operations>` are supported.
         """
         self.__dict__['speed'] = speed
+        self._needVelocityUpdate = True
 
     def setSpeed(self, val, op='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead, but use 
@@ -505,6 +523,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
 
         self._update_dotsXY()
 
+        if self._isBatched():
+            self._drawBatched(win)
+            return
+
         GL.glPushMatrix()  # push before drawing, pop after
 
         # draw the dots
@@ -587,6 +609,9 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
     def _update_dotsXY(self):
         """The user shouldn't call this - its gets done within draw().
         """
+        if self._isBatched():
+            self._updateDotsBatched()
+            return
         # Find dead dots, update positions, get new positions for
         # dead and out-of-bounds
         # renew dead dots
@@ -666,3 +691,169 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
 
         # update the pixel XY coordinates in pixels (using _BaseVisual class)
         self._updateVertices()
+
+    def _isBatched(self):
+        """Whether dots are being updated and drawn using the batched
+        (`useVBO`) path.
+        """
+        return self.useVBO and self.element is None and self.units != 'degFlat'
+
+    def _updateVertices(self):
+        # when batched, vertices are only worked out when asked for
+        if self._isBatched():
+            self.vertices = self._verticesBase / self.fieldSize
+        ContainerMixin._updateVertices(self)
+
+    def _updateDotsBatched(self):
+        """Does the same as `_update_dotsXY`, but in place on float32 arrays
+        which persist between frames, so only new random values are
+        allocated. The velocity of each dot is only recalculated when
+        directions or speed change.
+        """
+        if (self._verticesBase.dtype != np.float32
+                or not self._verticesBase.flags.c_contiguous):
+            # e.g. after refreshDots
+            self._verticesBase = np.ascontiguousarray(
+                self._verticesBase, dtype=np.float32)
+        if (self._batchBuffers is None
+                or len(self._batchBuffers['noise']) != self.nDots):
+            self._batchBuffers = {
+                'velocity': np.zeros((self.nDots, 2), dtype=np.float32),
+                'scratch': np.zeros((self.nDots, 2), dtype=np.float32),
+                'outXY': np.zeros((self.nDots, 2), dtype=bool),
+                'dist': np.zeros(self.nDots, dtype=np.float32),
+                'noise': np.zeros(self.nDots, dtype=bool),
+                'outOfBounds': np.zeros(self.nDots, dtype=bool),
+            }
+            self._needVelocityUpdate = True
+        xy = self._verticesBase
+        buffers = self._batchBuffers
+        velocity = buffers['velocity']
+        noise = buffers['noise']
+        dead = self._deadDots
+        if len(dead) != self.nDots:
+            dead = self._deadDots = np.zeros(self.nDots, dtype=bool)
+
+        # renew dead dots
+        if self.dotLife > 0:
+            np.subtract(self._dotsLife, 1, out=self._dotsLife)
+            np.less_equal(self._dotsLife, 0, out=dead)
+            np.copyto(self._dotsLife, self.dotLife, where=dead)
+        else:
+            dead[:] = False
+
+        # update which are the noise/signal dots
+        if self.signalDots == 'different':
+            np.random.shuffle(self._dotsDir)
+            np.equal(self._dotsDir, self.dir * _piOver180, out=self._signalDots)
+            self._needVelocityUpdate = True
+        np.logical_not(self._signalDots, out=noise)
+        if self.noiseDots == 'walk':
+            self._dotsDir[noise] = np.random.rand(np.count_nonzero(noise)) * _2pi
+            self._needVelocityUpdate = True
+
+        # update positions; 0 radians=East!
+        if self._needVelocityUpdate:
+            np.cos(self._dotsDir, out=velocity[:, 0])
+            np.sin(self._dotsDir, out=velocity[:, 1])
+            velocity *= self.speed
+            self._needVelocityUpdate = False
+        if self.noiseDots == 'position':
+            # only signal dots move, noise dots get a new position
+            np.add(xy, velocity, out=xy, where=self._signalDots[:, None])
+            np.logical_or(dead, noise, out=dead)
+        else:
+            np.add(xy, velocity, out=xy)
+
+        # handle boundaries of the field
+        outOfBounds = buffers['outOfBounds']
+        if self.fieldShape in (None, 'square', 'sqr'):
+            np.abs(xy, out=buffers['scratch'])
+            np.greater(buffers['scratch'], .5 * self.fieldSize,
+                       out=buffers['outXY'])
+            np.logical_or(buffers['outXY'][:, 0], buffers['outXY'][:, 1],
+                          out=outOfBounds)
+        else:
+            normXY = np.divide(xy, .5 * self.fieldSize, out=buffers['scratch'])
+            np.hypot(normXY[:, 0], normXY[:, 1], out=buffers['dist'])
+            np.greater(buffers['dist'], 1., out=outOfBounds)
+
+        # replace dead and out-of-bounds dots, in the same order as
+        # _update_dotsXY so the same random numbers are used
+        nDead = np.count_nonzero(dead)
+        if nDead:
+            xy[dead, :] = self._newDotsXY(nDead)
+        nOutOfBounds = np.count_nonzero(outOfBounds)
+        if nOutOfBounds:
+            xy[outOfBounds, :] = self._newDotsXY(nOutOfBounds)
+
+        self._needVertexUpdate = True
+
+    def _getPixTransform(self):
+        """Get the transformation from dot positions (in field units) to
+        pixels, as a 4x4 matrix in the order expected by `glMultMatrixf`.
+        Found by transforming a few reference points the same way as
+        `_updateVertices`, so costs the same however many dots there are.
+        """
+        verts = Vertices(np.array([[0., 0.], [1., 0.], [0., 1.]]), obj=self)
+        if hasattr(self, "flip"):
+            verts.flip = self.flip
+        if hasattr(self, "anchor"):
+            verts.anchor = self.anchor
+        verts._size = self._size
+        verts._pos = self._pos
+        posPix = self._pos.pix
+        pix = (verts.pix - posPix).dot(self._rotationMatrix) + posPix
+
+        transform = np.zeros((4, 4), dtype=np.float32)
+        # rows are where the x and y axes end up, scaled from field units
+        transform[0, :2] = (pix[1] - pix[0]) / self.fieldSize[0]
+        transform[1, :2] = (pix[2] - pix[0]) / self.fieldSize[1]
+        transform[2, 2] = 1.
+        transform[3, :2] = pix[0]
+        transform[3, 3] = 1.
+        return transform
+
+    def _drawBatched(self, win):
+        """Draw all dots from a single vertex buffer.
+        """
+        xy = self._verticesBase
+        if self._dotsVBO is None:
+            self._dotsVBO = gltools.createVBO(xy, usage=GL.GL_STREAM_DRAW)
+        else:
+            # replace (rather than overwrite) the buffer's storage so we don't
+            # wait for the GPU to finish with last frame's positions
+            gltools.bindVBO(self._dotsVBO)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, xy.nbytes,
+                            xy.ctypes.data_as(ctypes.c_void_p),
+                            GL.GL_STREAM_DRAW)
+            gltools.unbindVBO(self._dotsVBO)
+
+        GL.glPushMatrix()  # push before drawing, pop after
+        win.setScale('pix')
+        transform = self._getPixTransform()
+        GL.glMultMatrixf(transform.ctypes.data_as(ctypes.POINTER(GL.GLfloat)))
+        GL.glPointSize(self.dotSize)
+
+        # load Null textures into multitexteureARB - they modulate with
+        # glColor
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        GL.glColor4f(*self._foreColor.render('rgba1'))
+        gltools.setVertexAttribPointer(
+            GL.GL_VERTEX_ARRAY, self._dotsVBO, legacy=True)
+        GL.glDrawArrays(GL.GL_POINTS, 0, len(xy))
+        gltools.disableVertexAttribArray(GL.GL_VERTEX_ARRAY, legacy=True)
+        GL.glPopMatrix()
+
+    def __del__(self):
+        try:
+            if self._dotsVBO is not None:
+                gltools.deleteVBO(self._dotsVBO)
+        except Exception:
+            pass  # window has probably been closed already
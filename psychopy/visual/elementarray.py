@@ -19,6 +19,7 @@ from ..colors import Color
 
 pyglet.options['debug_gl'] = False
 import ctypes
+import warnings
 GL = pyglet.gl
 
 import psychopy  # so we can get the __path__
@@ -30,8 +31,10 @@ from psychopy.visual import Window
 from psychopy.tools.arraytools import val2array
 from psychopy.tools.attributetools import attributeSetter, logAttrib, setAttribute
 from psychopy.tools.monitorunittools import convertToPix
+import psychopy.tools.gltools as gltools
 from psychopy.visual.helpers import setColor
 from psychopy.visual.basevisual import MinimalStim, TextureMixin, ColorMixin
+from psychopy.visual import shaders as _shaders
 from . import globalVars
 
 import numpy
@@ -49,8 +52,28 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
     but in order to achieve this performance, uses several OpenGL extensions
     only available on modern graphics cards (supporting OpenGL2.0).
     See the ElementArray demo.
+
+    With `useVBO=True` (requires OpenGL 3.3), the elements are instead drawn
+    as instances of a single quad, with the attributes of each element kept
+    in buffers on the graphics card. Only the buffers for attributes which
+    have changed are uploaded before drawing, so changing e.g. `oris` every
+    frame doesn't mean recalculating the vertices, colors and texture
+    coordinates of every element too.
     """
 
+    # per-element attributes of the instanced rendering path, and the vertex
+    # attribute location each is bound to (0 is the corners of the quad)
+    _elementAttribs = {
+        'pos': (b'elementPos', 1),
+        'size': (b'elementSize', 2),
+        'ori': (b'elementOri', 3),
+        'color': (b'elementColor', 4),
+        'texCoords': (b'elementTexCoords', 5),
+    }
+    # corners of the unit quad, in the same order as the legacy vertices
+    _quadCorners = numpy.array(
+        [[0.5, -0.5], [-0.5, -0.5], [-0.5, 0.5], [0.5, 0.5]], numpy.float32)
+
     def __init__(self,
                  win,
                  units=None,
@@ -76,7 +99,8 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
                  interpolate=True,
                  name=None,
                  autoLog=None,
-                 maskParams=None):
+                 maskParams=None,
+                 useVBO=False):
         """
         :Parameters:
 
@@ -90,6 +114,12 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
 
             nElements :
                 number of elements in the array.
+
+            useVBO : bool
+                Draw the elements from vertex buffers using instancing,
+                uploading only the attributes which have changed. Falls back
+                to the legacy path if OpenGL 3.3 isn't available or units
+                are 'degFlat'.
         """
         # what local vars are defined (these are the init params) for use by
         # __repr__
@@ -117,6 +147,12 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         self._needVertexUpdate = True
         self._needColorUpdate = True
         self._RGBAs = None
+        # buffers for the instanced path, created on first draw
+        self.useVBO = useVBO
+        self._vbos = None
+        self._vao = None
+        self._dirtyAttribs = set(self._elementAttribs)
+        self._uniformLocs = {}
         self.interpolate = interpolate
         self.__dict__['fieldDepth'] = fieldDepth
         self.__dict__['depths'] = depths
@@ -261,6 +297,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         # to keep a record if we are to alter things later.
         self._xysAsNone = value is None
         self._needVertexUpdate = True
+        self._dirtyAttribs.add('pos')
 
     def setXYs(self, value=None, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -290,6 +327,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['oris'] = self._makeNx1(value)  # set self.oris
         self._needVertexUpdate = True
+        self._dirtyAttribs.add('ori')
 
     def setOris(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -315,6 +353,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['sfs'] = self._makeNx2(value)  # set self.sfs
         self._needTexCoordUpdate = True
+        self._dirtyAttribs.add('texCoords')
 
     def setSfs(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -334,6 +373,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['opacities'] = self._makeNx1(value)
         self._needColorUpdate = True
+        self._dirtyAttribs.add('color')
 
     def setOpacities(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -355,6 +395,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         self.__dict__['sizes'] = self._makeNx2(value)
         self._needVertexUpdate = True
         self._needTexCoordUpdate = True
+        self._dirtyAttribs.update(('size', 'texCoords'))
 
     def setSizes(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -377,6 +418,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['phases'] = self._makeNx2(value)
         self._needTexCoordUpdate = True
+        self._dirtyAttribs.add('texCoords')
 
     def setPhases(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -414,6 +456,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         # Create blank array of colors
         self._colors = Color(value, self.colorSpace, self.contrast)
         self._needColorUpdate = True
+        self._dirtyAttribs.add('color')
 
     def setColors(self, colors, colorSpace=None, operation='', log=None):
         """See ``color`` for more info on the color parameter  and
@@ -452,6 +495,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         # Store value and update
         self.__dict__['contrs'] = value
         self._needColorUpdate = True
+        self._dirtyAttribs.add('color')
 
     def setContrs(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -468,6 +512,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['fieldPos'] = val2array(value, False, False)
         self._needVertexUpdate = True
+        self._dirtyAttribs.add('pos')
 
     def setFieldPos(self, value, operation='', log=None):
         """Usually you can use 'stim.attribute = value' syntax instead,
@@ -509,6 +554,10 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
             win = self.win
         self._selectWindow(win)
 
+        if self.useVBO and self._canUseVBO():
+            self._drawInstanced()
+            return
+
         if self._needVertexUpdate:
             self._updateVertices()
         if self._needColorUpdate:
@@ -533,10 +582,11 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         # setup the shaderprogram
         _prog = self.win._progSignedTexMask
         GL.glUseProgram(_prog)
+        uniforms = self._getUniformLocations(_prog)
         # set the texture to be texture unit 0
-        GL.glUniform1i(GL.glGetUniformLocation(_prog, b"texture"), 0)
+        GL.glUniform1i(uniforms[b"texture"], 0)
         # mask is texture unit 1
-        GL.glUniform1i(GL.glGetUniformLocation(_prog, b"mask"), 1)
+        GL.glUniform1i(uniforms[b"mask"], 1)
 
         # bind textures
         GL.glActiveTexture(GL.GL_TEXTURE1)
@@ -575,6 +625,173 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         GL.glPopClientAttrib()
         GL.glPopMatrix()
 
+    def _getUniformLocations(self, program):
+        """Get the locations of the uniforms of a shader program, looking
+        them up only the first time.
+        """
+        if program not in self._uniformLocs:
+            self._uniformLocs[program] = gltools.getUniformLocations(program)
+        return self._uniformLocs[program]
+
+    def _canUseVBO(self):
+        """Check whether the instanced path can be used, warning (once) and
+        reverting to the legacy path if not.
+        """
+        if self._vbos is not None:
+            return True
+        if self.units == 'degFlat':
+            # vertices aren't a linear function of size, so can't be scaled
+            # in the shader
+            reason = "units='degFlat'"
+        elif not GL.gl_info.have_version(3, 3):
+            reason = "OpenGL 3.3 is required"
+        else:
+            return True
+        logging.warning("%s can't use useVBO (%s), using legacy rendering "
+                        "instead" % (self.name, reason))
+        self.useVBO = False
+        return False
+
+    def _getElementAttrib(self, name):
+        """Get the per-element values of one attribute of the instanced
+        path, as a float32 array with a row per element.
+        """
+        N = self.nElements
+        if name == 'pos':
+            # centres in pix, plus depth
+            data = numpy.empty((N, 3), numpy.float32)
+            data[:, :2] = convertToPix(
+                vertices=numpy.zeros((N, 2)), pos=self.xys + self.fieldPos,
+                units=self.units, win=self.win)
+            data[:, 2] = self.depths + self.fieldDepth
+        elif name == 'size':
+            data = self.sizes
+        elif name == 'ori':
+            data = self.oris.reshape((N, 1))
+        elif name == 'color':
+            data = numpy.empty((N, 4), numpy.float32)
+            data[:, :] = self._colors.render('rgba1')
+            data[:, 3] = self.opacities.reshape((N,))
+        elif name == 'texCoords':
+            # left, bottom, right, top of the texture on each element
+            if self.units in ['norm', 'pix', 'height']:
+                halfSfs = self.sfs / 2
+            else:
+                halfSfs = self.sfs * self.sizes / 2
+            offset = 0.5 - self.phases
+            data = numpy.hstack((offset - halfSfs, offset + halfSfs))
+        else:
+            raise KeyError(name)
+        return numpy.ascontiguousarray(data, dtype=numpy.float32)
+
+    def _createBuffers(self):
+        """Create a buffer for each per-element attribute, and a VAO using
+        them to draw each element as an instance of the unit quad.
+        """
+        self._vbos = {'corner': gltools.createVBO(self._quadCorners)}
+        attribBuffers = {0: self._vbos['corner']}
+        attribDivisors = {}
+        for name, (attribName, index) in self._elementAttribs.items():
+            vbo = gltools.createVBO(
+                self._getElementAttrib(name), usage=GL.GL_DYNAMIC_DRAW)
+            self._vbos[name] = attribBuffers[index] = vbo
+            attribDivisors[index] = 1
+        with warnings.catch_warnings():
+            # corners and per-element attributes have different numbers of
+            # rows, which is expected when instancing
+            warnings.simplefilter('ignore')
+            self._vao = gltools.createVAO(
+                attribBuffers, attribDivisors=attribDivisors)
+        self._vao.count = len(self._quadCorners)
+        self._dirtyAttribs.clear()
+
+    def _uploadElementAttribs(self):
+        """Upload the attributes which have changed since the last draw,
+        leaving the others as they are.
+        """
+        if self._vbos is None:
+            self._createBuffers()
+            return
+        for name in self._dirtyAttribs:
+            vbo = self._vbos[name]
+            buffer = gltools.mapBuffer(vbo, read=False)
+            buffer[:] = self._getElementAttrib(name)
+            gltools.unmapBuffer(vbo)
+            gltools.unbindVBO(vbo)
+        self._dirtyAttribs.clear()
+
+    def _getInstancedProgram(self):
+        """Get the shader program for the instanced path, matching the
+        window's current blend mode.
+        """
+        adding = self.win._progSignedTexMask == \
+            self.win._shaders.get('signedTexMask_adding')
+        key = 'elementArray_adding' if adding else 'elementArray'
+        if key not in self.win._shaders:
+            if adding:
+                frag = _shaders.fragSignedColorTexMask_adding
+            else:
+                frag = _shaders.fragSignedColorTexMask
+            attribs = {'corner': 0}
+            attribs.update(self._elementAttribs.values())
+            self.win._shaders[key] = _shaders.compileProgram(
+                _shaders.vertElementArray, frag, attribs=attribs)
+        return self.win._shaders[key]
+
+    def _drawInstanced(self):
+        """Draw the elements as instances of a single quad.
+        """
+        if self._dirtyAttribs or self._vbos is None:
+            self._uploadElementAttribs()
+
+        GL.glPushMatrix()
+        self.win.setScale('pix')
+
+        _prog = self._getInstancedProgram()
+        GL.glUseProgram(_prog)
+        uniforms = self._getUniformLocations(_prog)
+        GL.glUniform1i(uniforms[b"texture"], 0)
+        GL.glUniform1i(uniforms[b"mask"], 1)
+        # pix per unit in x and y, sizes are scaled by this in the shader
+        unitScale = convertToPix(
+            vertices=numpy.ones(2), pos=numpy.zeros(2), units=self.units,
+            win=self.win)
+        GL.glUniform2f(uniforms[b"unitScale"], *unitScale)
+
+        # bind textures
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._maskID)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self._texID)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+
+        gltools.drawVAO(self._vao, GL.GL_TRIANGLE_FAN,
+                        instanceCount=self.nElements)
+
+        # unbind the textures
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glDisable(GL.GL_TEXTURE_2D)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glDisable(GL.GL_TEXTURE_2D)
+
+        GL.glUseProgram(0)
+        GL.glPopMatrix()
+
+    def _deleteBuffers(self):
+        """Remove the buffers of the instanced path from the graphics card.
+        """
+        if getattr(self, '_vao', None) is not None:
+            gltools.deleteVAO(self._vao)
+            self._vao = None
+        if getattr(self, '_vbos', None) is not None:
+            for vbo in self._vbos.values():
+                gltools.deleteVBO(vbo)
+            self._vbos = None
+            self._dirtyAttribs.update(self._elementAttribs)
+
     def _updateVertices(self):
         """Sets Stim.verticesPix from fieldPos.
         """
@@ -700,6 +917,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['depth'] = value
         self._updateVertices()
+        self._dirtyAttribs.add('pos')
 
     @attributeSetter
     def fieldDepth(self, value):
@@ -710,6 +928,7 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         """
         self.__dict__['fieldDepth'] = value
         self._updateVertices()
+        self._dirtyAttribs.add('pos')
 
     @attributeSetter
     def elementMask(self, value):
@@ -724,5 +943,6 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         # remove textures from graphics card to prevent OpenGl memory leak
         try:
             self.clearTextures()
+            self._deleteBuffers()
         except (ImportError, ModuleNotFoundError, TypeError):
             pass  # has probably been garbage-collected already
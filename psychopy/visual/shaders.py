@@ -103,13 +103,16 @@ class Shader:
                              .format(name, len(value)))
 
 
-def compileProgram(vertexSource=None, fragmentSource=None):
+def compileProgram(vertexSource=None, fragmentSource=None, attribs=None):
     """Create and compile a vertex and fragment shader pair from their sources.
 
     Parameters
     ----------
     vertexSource, fragmentSource : str or list of str
         Vertex and fragment shader GLSL sources.
+    attribs : dict or None
+        Vertex attribute names mapped to the locations to bind them to before
+        linking, otherwise the driver picks their locations.
 
     Returns
     -------
@@ -129,6 +132,12 @@ def compileProgram(vertexSource=None, fragmentSource=None):
             fragmentSource, GL.GL_FRAGMENT_SHADER_ARB)
         gltools.attachObjectARB(program, fragmentShader)
 
+    if attribs:
+        for name, index in attribs.items():
+            if type(name) != bytes:
+                name = name.encode()
+            GL.glBindAttribLocationARB(program, index, name)
+
     gltools.linkProgramObjectARB(program)
     # gltools.validateProgramARB(program)
 
@@ -282,6 +291,34 @@ vertSimple = """
     }
     """
 
+# for ElementArrayStim, drawing each element as an instance of a unit quad
+# whose corners are given by `corner`, all other attributes are per-element
+vertElementArray = """
+    attribute vec2 corner;
+    attribute vec3 elementPos;
+    attribute vec2 elementSize;
+    attribute float elementOri;
+    attribute vec4 elementColor;
+    attribute vec4 elementTexCoords;
+    uniform vec2 unitScale;
+    void main() {
+            vec2 local = corner * elementSize;
+            float theta = radians(elementOri);
+            float c = cos(theta);
+            float s = sin(theta);
+            vec2 rotated = vec2(local.x * c + local.y * s,
+                                local.y * c - local.x * s);
+            vec4 vertex = vec4(elementPos.xy + rotated * unitScale,
+                               elementPos.z, 1.0);
+            vec2 uv = corner + 0.5;
+            gl_FrontColor = elementColor;
+            gl_TexCoord[0] = vec4(
+                mix(elementTexCoords.xy, elementTexCoords.zw, uv), 0.0, 1.0);
+            gl_TexCoord[1] = vec4(uv, 0.0, 1.0);
+            gl_Position = gl_ModelViewProjectionMatrix * vertex;
+    }
+    """
+
 vertPhongLighting = """
 // Vertex shader for the Phong Shading Model
 // 
@@ -16,6 +16,7 @@ some more added:
 
 """
 from ast import literal_eval
+import ctypes
 
 import numpy as np
 from arabic_reshaper import ArabicReshaper
@@ -29,6 +30,7 @@ from ..basevisual import (
 )
 from psychopy.tools.attributetools import attributeSetter, setAttribute
 from psychopy.tools import mathtools as mt
+from psychopy.tools import gltools
 from psychopy.colors import Color
 from psychopy.tools.fontmanager import FontManager, GLFont
 from .. import shaders
@@ -99,7 +101,8 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
                  autoLog=None,
                  autoDraw=False,
                  depth=0,
-                 onTextCallback=None):
+                 onTextCallback=None,
+                 useVBO=False):
         """
 
         Parameters
@@ -141,6 +144,10 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             Can this stimulus be dragged by a mouse click?
         name
         autoLog
+        useVBO : bool
+            Keep the glyph quads in a vertex buffer on the graphics card, only
+            updating the parts which change, rather than sending every
+            vertex on every frame.
         """
 
         BaseVisualStim.__init__(self, win, units=units, name=name)
@@ -220,6 +227,16 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             self.shader = alphaShader = shaders.Shader(
                     shaders.vertSimple, shaders.fragTextBox2alpha)
         self._needVertexUpdate = False  # this will be set True during layout
+        # layout of each paragraph, reused until the paragraph changes
+        self._paragraphLayouts = {}
+        self._paragraphParams = None
+        # palette last applied to the box, so it's only set when it changes
+        self._appliedPalette = None
+        # vertex buffer of glyph quads, made when first drawn
+        self.useVBO = useVBO
+        self._glyphVBO = None
+        self._glyphData = None
+        self._needGlyphUpdate = True
 
         # standard stimulus params
         self.pos = pos
@@ -296,7 +313,8 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             lineBreaking=self._lineBreaking,
             name=self.name,
             autoLog=self.autoLog,
-            onTextCallback=self.onTextCallback
+            onTextCallback=self.onTextCallback,
+            useVBO=self.useVBO
         )
 
     @property
@@ -792,7 +810,6 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         self._styles.insert(self.caret.index, cstyle)
         self.caret.index += 1
         self.text = txt
-        self._layout()
 
     def deleteCaretLeft(self):
         """Deletes 1 character to the left of the caret"""
@@ -803,7 +820,6 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             self._styles = self._styles[:ci-1]+self._styles[ci:]
             self.caret.index -= 1
             self.text = txt
-            self._layout()
 
     def deleteCaretRight(self):
         """Deletes 1 character to the right of the caret"""
@@ -813,7 +829,6 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             txt = txt[:ci] + txt[ci+1:]
             self._styles = self._styles[:ci]+self._styles[ci+1:]
             self.text = txt
-            self._layout()
         
     def _layout(self):
         """Layout the text, calculating the vertex locations
@@ -850,142 +865,56 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             alphaCorrection = 1
 
         if self._lineBreaking == 'default':
-
-            wordLen = 0
-            charsThisLine = 0
-            wordsThisLine = 0
+            # lay out each paragraph separately, so those which haven't
+            # changed since the last layout (e.g. all but the one being typed
+            # into) can be reused rather than laid out again
+            layoutParams = (font, font.size, font.height, lineMax,
+                            self.letterSpacing, alphaCorrection,
+                            tuple(rgb), showWhiteSpace)
+            if layoutParams != self._paragraphParams:
+                self._paragraphParams = layoutParams
+                self._paragraphLayouts = {}
+            paragraphLayouts = {}
             lineN = 0
-
-            for i, charcode in enumerate(self._text):
-                printable = True  # unless we decide otherwise
-                # handle formatting codes
-                fakeItalic = 0.0
-                fakeBold = 0.0
-                if self._styles.i[i]:
-                    fakeItalic = 0.1 * font.size
-                if self._styles.b[i]:
-                    fakeBold = 0.3 * font.size
-
-                # handle newline
-                if charcode == '\n':
-                    printable = False
-
-                # handle printable characters
-                if printable:
-                    glyph = font[charcode]
-                    if showWhiteSpace and charcode == " ":
-                        glyph = font[u"·"]
-                    elif charcode == " ":
-                        # glyph size of space is smaller than actual size, so use size of dot instead
-                        glyph.size = font[u"·"].size
-                    # Get top and bottom coords
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    # Get x mid point
-                    xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-                    # Get left and right corners from midpoint
-                    xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
-                    xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
-                    xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
-                    xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-                else:
-                    glyph = font[u"·"]
-                    x = current[0] + glyph.offset[0]
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    xBotL = x
-                    xTopL = x
-                    xBotR = x
-                    xTopR = x
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-
-                theseVertices = [[xTopL, yTop], [xBotL, yBot],
-                                 [xBotR, yBot], [xTopR, yTop]]
-                texcoords = [[u0, v0], [u0, v1],
-                             [u1, v1], [u1, v0]]
-
-                vertices[i * 4:i * 4 + 4] = theseVertices
-                self._texcoords[i * 4:i * 4 + 4] = texcoords
-                # handle character color
-                rgb_ = self._styles.c[i]
-                if len(rgb_) > 0:
-                    self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                else:
-                    self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                self._lineNs[i] = lineN
-                current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
-                current[1] = current[1] + glyph.advance[1]
-
-                # are we wrapping the line?
-                if charcode == "\n":
-                    # check if we have stored the top/bottom of the previous line yet
-                    if lineN + 1 > len(_lineBottoms):
-                        _lineBottoms.append(current[1])
-                    lineWPix = current[0]
-                    current[0] = 0
-                    current[1] -= font.height
-                    lineN += 1
-                    charsThisLine += 1
-                    self._lineLenChars.append(charsThisLine)
-                    _lineWidths.append(lineWPix)
-                    charsThisLine = 0
-                    wordsThisLine = 0
-                elif charcode in wordBreaks:
-                    wordLen = 0
-                    charsThisLine += 1
-                    wordsThisLine += 1
-                elif printable:
-                    wordLen += 1
-                    charsThisLine += 1
-
-                # end line with auto-wrap on space
-                if current[0] >= lineMax and wordLen > 0:
-                    # move the current word to next line
-                    lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
-                    if wordsThisLine <= 1:
-                        # if whole line is just 1 word, wrap regardless of presence of wordbreak
-                        wordLen = 0
-                        charsThisLine += 1
-                        wordsThisLine += 1
-                        # add hyphen
-                        self._renderChars.append({
-                            "i": i,
-                            "current": (current[0], current[1]),
-                            "glyph": font["-"]
-                        })
-                        # store linebreak point
-                        lineBreakPt = current[0]
-                    wordWidth = current[0] - lineBreakPt
-                    # shift all chars of the word left by wordStartX
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
-                    # update line values
-                    self._lineNs[i - wordLen + 1: i + 1] += 1
-                    self._lineLenChars.append(charsThisLine - wordLen)
-                    _lineWidths.append(lineBreakPt)
-                    lineN += 1
-                    # and set current to correct location
-                    current[0] = wordWidth
-                    current[1] -= font.height
-                    charsThisLine = wordLen
-                    wordsThisLine = 1
-
-                # have we stored the top/bottom of this line yet
-                if lineN + 1 > len(_lineBottoms):
-                    _lineBottoms.append(current[1])
-
-            # add length of this (unfinished) line
-            _lineWidths.append(current[0])
-            self._lineLenChars.append(charsThisLine)
-
+            start = 0
+            pendingBottom = None
+            for stop in self._paragraphStops():
+                key = self._paragraphKey(start, stop)
+                para = paragraphLayouts.get(key)
+                if para is None:
+                    para = self._paragraphLayouts.get(key)
+                if para is None:
+                    para = self._layoutParagraph(
+                        start, stop, font, lineMax, alphaCorrection, rgb)
+                paragraphLayouts[key] = para
+                # paragraphs are laid out from (0, 0), so move into place
+                vertices[start * 4:stop * 4] = para['vertices']
+                vertices[start * 4:stop * 4, 1] += current[1]
+                self._texcoords[start * 4:stop * 4] = para['texcoords']
+                self._colors[start * 4:stop * 4] = para['colors']
+                self._lineNs[start:stop] = para['lineNs'] + lineN
+                for rend in para['renderChars']:
+                    self._renderChars.append({
+                        "i": rend['i'] + start,
+                        "current": (rend['current'][0],
+                                    rend['current'][1] + current[1]),
+                        "glyph": rend['glyph']
+                    })
+                bottoms = [y + current[1] for y in para['lineBottoms']]
+                if stop > start and self._text[stop - 1] == "\n":
+                    # bottom of the line after this paragraph, which the
+                    # next paragraph will store if it has any characters
+                    pendingBottom = bottoms.pop()
+                elif not bottoms and pendingBottom is not None:
+                    bottoms.append(pendingBottom)
+                _lineBottoms.extend(bottoms)
+                self._lineLenChars.extend(para['lineLenChars'])
+                _lineWidths.extend(para['lineWidths'])
+                lineN += para['nLines']
+                current = [para['end'][0], para['end'][1] + current[1]]
+                start = stop
+            # only keep layouts for the paragraphs in the current text
+            self._paragraphLayouts = paragraphLayouts
         elif self._lineBreaking == 'uax14':
 
             # get a list of line-breakable points according to UAX#14
@@ -1195,6 +1124,195 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
             self.glFont.upload()
             self.glFont._dirty = False
         self._needVertexUpdate = True
+        self._needGlyphUpdate = True
+
+    def _paragraphStops(self):
+        """Indices in the text at which each paragraph ends, i.e. just after
+        each newline, and the end of the text.
+        """
+        stops = [m.end() for m in re.finditer("\n", self._text)]
+        stops.append(len(self._text))
+        return stops
+
+    def _paragraphKey(self, start, stop):
+        """Everything about the characters from `start` to `stop` which
+        affects how they are laid out.
+        """
+        return (
+            self._text[start:stop],
+            tuple(self._styles.i[start:stop]),
+            tuple(self._styles.b[start:stop]),
+            tuple(tuple(c) for c in self._styles.c[start:stop]),
+        )
+
+    def _layoutParagraph(self, start, stop, font, lineMax, alphaCorrection,
+                         rgb):
+        """Lay out the characters from `start` to `stop` (one paragraph,
+        ending with a newline unless it is the last), relative to a first line
+        starting at (0, 0), wrapping lines with the 'default' line breaking.
+
+        Returns a dict of the arrays and line info which `_layout` combines
+        for all paragraphs.
+        """
+        nChars = stop - start
+        vertices = np.zeros((nChars * 4, 2), dtype=np.float32)
+        texcoordsAll = np.zeros((nChars * 4, 2), dtype=np.double)
+        colors = np.zeros((nChars * 4, 4), dtype=np.double)
+        lineNs = np.zeros(nChars, dtype=int)
+        renderChars = []
+        lineBottoms = []
+        lineLenChars = []
+        lineWidths = []
+
+        current = [0, 0]
+        wordLen = 0
+        charsThisLine = 0
+        wordsThisLine = 0
+        lineN = 0
+
+        for i, charcode in enumerate(self._text[start:stop]):
+            printable = True  # unless we decide otherwise
+            # handle formatting codes
+            fakeItalic = 0.0
+            fakeBold = 0.0
+            if self._styles.i[start + i]:
+                fakeItalic = 0.1 * font.size
+            if self._styles.b[start + i]:
+                fakeBold = 0.3 * font.size
+
+            # handle newline
+            if charcode == '\n':
+                printable = False
+
+            # handle printable characters
+            if printable:
+                glyph = font[charcode]
+                if showWhiteSpace and charcode == " ":
+                    glyph = font[u"·"]
+                elif charcode == " ":
+                    # glyph size of space is smaller than actual size, so use size of dot instead
+                    glyph.size = font[u"·"].size
+                # Get top and bottom coords
+                yTop = current[1] + glyph.offset[1]
+                yBot = yTop - glyph.size[1]
+                # Get x mid point
+                xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+                # Get left and right corners from midpoint
+                xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
+                xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
+                xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
+                xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+            else:
+                glyph = font[u"·"]
+                x = current[0] + glyph.offset[0]
+                yTop = current[1] + glyph.offset[1]
+                yBot = yTop - glyph.size[1]
+                xBotL = x
+                xTopL = x
+                xBotR = x
+                xTopR = x
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+
+            theseVertices = [[xTopL, yTop], [xBotL, yBot],
+                             [xBotR, yBot], [xTopR, yTop]]
+            texcoords = [[u0, v0], [u0, v1],
+                         [u1, v1], [u1, v0]]
+
+            vertices[i * 4:i * 4 + 4] = theseVertices
+            texcoordsAll[i * 4:i * 4 + 4] = texcoords
+            # handle character color
+            rgb_ = self._styles.c[start + i]
+            if len(rgb_) > 0:
+                colors[i*4 : i*4+4, :4] = rgb_ # set custom color
+            else:
+                colors[i*4 : i*4+4, :4] = rgb # set default color
+            lineNs[i] = lineN
+            current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
+            current[1] = current[1] + glyph.advance[1]
+
+            # are we wrapping the line?
+            if charcode == "\n":
+                # check if we have stored the top/bottom of the previous line yet
+                if lineN + 1 > len(lineBottoms):
+                    lineBottoms.append(current[1])
+                lineWPix = current[0]
+                current[0] = 0
+                current[1] -= font.height
+                lineN += 1
+                charsThisLine += 1
+                lineLenChars.append(charsThisLine)
+                lineWidths.append(lineWPix)
+                charsThisLine = 0
+                wordsThisLine = 0
+            elif charcode in wordBreaks:
+                wordLen = 0
+                charsThisLine += 1
+                wordsThisLine += 1
+            elif printable:
+                wordLen += 1
+                charsThisLine += 1
+
+            # end line with auto-wrap on space
+            if current[0] >= lineMax and wordLen > 0:
+                # move the current word to next line
+                lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
+                if wordsThisLine <= 1:
+                    # if whole line is just 1 word, wrap regardless of presence of wordbreak
+                    wordLen = 0
+                    charsThisLine += 1
+                    wordsThisLine += 1
+                    # add hyphen
+                    renderChars.append({
+                        "i": i,
+                        "current": (current[0], current[1]),
+                        "glyph": font["-"]
+                    })
+                    # store linebreak point
+                    lineBreakPt = current[0]
+                wordWidth = current[0] - lineBreakPt
+                # shift all chars of the word left by wordStartX
+                vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
+                vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
+                # update line values
+                lineNs[i - wordLen + 1: i + 1] += 1
+                lineLenChars.append(charsThisLine - wordLen)
+                lineWidths.append(lineBreakPt)
+                lineN += 1
+                # and set current to correct location
+                current[0] = wordWidth
+                current[1] -= font.height
+                charsThisLine = wordLen
+                wordsThisLine = 1
+
+            # have we stored the top/bottom of this line yet
+            if lineN + 1 > len(lineBottoms):
+                lineBottoms.append(current[1])
+
+        if not nChars or self._text[stop - 1] != "\n":
+            # add length of this (unfinished) line
+            lineWidths.append(current[0])
+            lineLenChars.append(charsThisLine)
+
+        return {
+            'vertices': vertices,
+            'texcoords': texcoordsAll,
+            'colors': colors,
+            'lineNs': lineNs,
+            'renderChars': renderChars,
+            'lineBottoms': lineBottoms,
+            'lineLenChars': lineLenChars,
+            'lineWidths': lineWidths,
+            'nLines': lineN,
+            'end': tuple(current),
+        }
 
     @attributeSetter
     def ori(self, value):
@@ -1212,15 +1330,20 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
 
     def draw(self):
         """Draw the text to the back buffer"""
-        # Border width
-        self.box.setLineWidth(self.palette['lineWidth']) # Use 1 as base if border width is none
-        #self.borderWidth = self.box.lineWidth
-        # Border colour
-        self.box.setLineColor(self.palette['lineColor'], colorSpace='rgb')
-        #self.borderColor = self.box.lineColor
-        # Background
-        self.box.setFillColor(self.palette['fillColor'], colorSpace='rgb')
-        #self.fillColor = self.box.fillColor
+        # only set the box's colours when the palette has changed
+        paletteKey = self._getPaletteKey()
+        if paletteKey != self._appliedPalette:
+            palette = self.palette
+            # Border width
+            self.box.setLineWidth(palette['lineWidth']) # Use 1 as base if border width is none
+            #self.borderWidth = self.box.lineWidth
+            # Border colour
+            self.box.setLineColor(palette['lineColor'], colorSpace='rgb')
+            #self.borderColor = self.box.lineColor
+            # Background
+            self.box.setFillColor(palette['fillColor'], colorSpace='rgb')
+            #self.fillColor = self.box.fillColor
+            self._appliedPalette = paletteKey
 
         # Inherit win
         self.box.win = self.win
@@ -1274,14 +1397,28 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         gl.glEnable(gl.GL_TEXTURE_2D)
         gl.glDisable(gl.GL_DEPTH_TEST)
 
-        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
-        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
-        gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
-        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        if self.useVBO:
+            if self._needGlyphUpdate:
+                self._updateGlyphBuffer()
+            # vertices, texture coords and colours are interleaved
+            gltools.setVertexAttribPointer(
+                gl.GL_VERTEX_ARRAY, self._glyphVBO, size=2, offset=0,
+                legacy=True)
+            gltools.setVertexAttribPointer(
+                gl.GL_TEXTURE_COORD_ARRAY, self._glyphVBO, size=2, offset=2,
+                legacy=True)
+            gltools.setVertexAttribPointer(
+                gl.GL_COLOR_ARRAY, self._glyphVBO, size=4, offset=4,
+                legacy=True)
+        else:
+            gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+            gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+            gl.glEnableClientState(gl.GL_TEXTURE_COORD_ARRAY)
+            gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
 
-        gl.glVertexPointer(2, gl.GL_DOUBLE, 0, self.verticesPix.ctypes)
-        gl.glColorPointer(4, gl.GL_DOUBLE, 0, self._colors.ctypes)
-        gl.glTexCoordPointer(2, gl.GL_DOUBLE, 0, self._texcoords.ctypes)
+            gl.glVertexPointer(2, gl.GL_DOUBLE, 0, self.verticesPix.ctypes)
+            gl.glColorPointer(4, gl.GL_DOUBLE, 0, self._colors.ctypes)
+            gl.glTexCoordPointer(2, gl.GL_DOUBLE, 0, self._texcoords.ctypes)
 
         self.shader.bind()
         self.shader.setInt('texture', 0)
@@ -1313,6 +1450,62 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         if self.container is not None:
             self.container.disable()
 
+    def _getPaletteKey(self):
+        """Everything the palette depends on, to tell when it has changed
+        without working it out.
+        """
+        key = [self.hasFocus, np.ravel(self.borderWidth).tolist()]
+        for color in (self._borderColor, self._fillColor):
+            if color is None or not color.valid:
+                key.append(None)
+            else:
+                key.append((id(color), color.rgba.tolist(),
+                            np.ravel(color.contrast).tolist()))
+        return key
+
+    def _updateGlyphBuffer(self):
+        """Copy the vertices, texture coords and colours of each glyph into
+        the vertex buffer, only uploading the range of vertices which has
+        changed since it was last updated.
+        """
+        nVerts = len(self.verticesPix)
+        data = np.empty((nVerts, 8), dtype=np.float32)
+        data[:, 0:2] = self.verticesPix
+        data[:, 2:4] = self._texcoords
+        data[:, 4:8] = self._colors
+        self._needGlyphUpdate = False
+        if self._glyphVBO is None or nVerts > len(self._glyphData):
+            # make the buffer with room to spare, so typing into the box
+            # doesn't need a new one for every character
+            self._glyphData = np.zeros((max(nVerts * 2, 256), 8),
+                                       dtype=np.float32)
+            self._glyphData[:nVerts] = data
+            if self._glyphVBO is not None:
+                gltools.deleteVBO(self._glyphVBO)
+            self._glyphVBO = gltools.createVBO(
+                self._glyphData, usage=gl.GL_DYNAMIC_DRAW)
+            return
+        changed = np.flatnonzero(
+            (data != self._glyphData[:nVerts]).any(axis=1))
+        if not changed.size:
+            return
+        first, last = changed[0], changed[-1] + 1
+        self._glyphData[first:last] = data[first:last]
+        rowBytes = self._glyphData.strides[0]
+        gltools.bindVBO(self._glyphVBO)
+        gl.glBufferSubData(
+            gl.GL_ARRAY_BUFFER, int(first * rowBytes),
+            int((last - first) * rowBytes),
+            self._glyphData[first:last].ctypes.data_as(ctypes.c_void_p))
+        gltools.unbindVBO(self._glyphVBO)
+
+    def __del__(self):
+        try:
+            if self._glyphVBO is not None:
+                gltools.deleteVBO(self._glyphVBO)
+        except Exception:
+            pass  # window has probably been closed already
+
     def reset(self):
         """Resets the TextBox2 to hold **whatever it was given on initialisation**"""
         # Reset contents
@@ -1453,6 +1646,7 @@ class TextBox2(BaseVisualStim, DraggingMixin, ContainerMixin, ColorMixin):
         self.box.size = self.size  # this might have changed from _requested
 
         self._needVertexUpdate = False
+        self._needGlyphUpdate = True
 
     def _onText(self, chr):
         """Called by the window when characters are received"""
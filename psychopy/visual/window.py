@@ -356,6 +356,8 @@ class Window():
 
         self._toLog = []
         self._toCall = []
+        # FrameProfiler to record how long each part of flip() takes (if any)
+        self.frameProfiler = None
         # settings for the monitor: local settings (if available) override
         # monitor
         # if we have a monitors.Monitor object (psychopy 0.54 onwards)
@@ -586,6 +588,7 @@ class Window():
         self.frameClock = core.Clock()  # from psycho/core
         self.frames = 0  # frames since last fps calc
         self.movieFrames = []  # list of captured frames (Image objects)
+        self._movieCapture = None  # streams frames to a file if not None
 
         self.recordFrameIntervals = False
         # Be able to omit the long timegap that follows each time turn it off
@@ -1176,6 +1179,12 @@ class Window():
             win.flip(clearBuffer=False)
 
         """
+        # time each part of the flip if profiling
+        profiler = self.frameProfiler
+        timeStims = profiler is not None and profiler.perStimulus
+        if profiler is not None:
+            profiler.startFrame()
+
         # draw message/splash if needed
         if self._showSplash:
             self._splashTextbox.draw()
@@ -1183,7 +1192,10 @@ class Window():
         if self._toDraw:
             for thisStim in self._toDraw:
                 # draw
-                thisStim.draw()
+                if timeStims:
+                    profiler.drawStimulus(thisStim)
+                else:
+                    thisStim.draw()
                 # draw validation rect if needed
                 if thisStim in self.validators:
                     self.validators[thisStim].draw()
@@ -1208,6 +1220,8 @@ class Window():
 
         # disable lighting
         self.useLights = False
+        if profiler is not None:
+            profiler.lap('autoDraw')
 
         # Check for mouse clicks on editables
         if hasattr(self, '_editableChildren'):
@@ -1231,6 +1245,8 @@ class Window():
             # If there is only one editable on screen, make sure it starts off with focus
             if sum(editablesOnScreen) == 1:
                 self.currentEditable = self._editableChildren[editablesOnScreen.index(True)]()
+        if profiler is not None:
+            profiler.lap('editables')
 
         flipThisFrame = self._startOfFlip()
         if self.useFBO and flipThisFrame:
@@ -1262,8 +1278,12 @@ class Window():
 
         # call this before flip() whether FBO was used or not
         self._afterFBOrender()
+        if profiler is not None:
+            profiler.lap('fbo')
 
         self.backend.swapBuffers(flipThisFrame)
+        if profiler is not None:
+            profiler.lap('swapBuffers')
 
         if self.useFBO and flipThisFrame:
             # set rendering back to the framebuffer object
@@ -1307,6 +1327,8 @@ class Window():
 
         # reset returned buffer for next frame
         self._endOfFlip(clearBuffer)
+        if profiler is not None:
+            profiler.lap('transform')
 
         # waitBlanking
         if self.waitBlanking and flipThisFrame:
@@ -1319,6 +1341,8 @@ class Window():
                 GL.glVertex2i(10, 10)
             GL.glEnd()
             GL.glFinish()
+        if profiler is not None:
+            profiler.lap('waitBlanking')
 
         # get timestamp
         self._frameTime = now = logging.defaultClock.getTime()
@@ -1330,6 +1354,8 @@ class Window():
             self._toCall[i]['function'](*self._toCall[i]['args'], **self._toCall[i]['kwargs'])
         # leave newly scheduled functions for next flip
         del self._toCall[:n_items]
+        if profiler is not None:
+            profiler.lap('callOnFlip')
 
         # do bookkeeping
         if self.recordFrameIntervals:
@@ -1360,6 +1386,8 @@ class Window():
                         t=now,
                         obj=logEntry['obj'])
         del self._toLog[:]
+        if profiler is not None:
+            profiler.lap('logReplay')
 
         # keep the system awake (prevent screen-saver or sleep)
         platform_specific.sendStayAwake()
@@ -1372,6 +1400,10 @@ class Window():
         if self._showPilotingIndicator:
             self._pilotingIndicator.draw()
 
+        if profiler is not None:
+            profiler.lap('nextFrame')
+            profiler.endFrame(now)
+
         #    If self.waitBlanking is True, then return the time that
         # GL.glFinish() returned, set as the 'now' variable. Otherwise
         # return None as before
@@ -2370,6 +2402,10 @@ class Window():
         command is issued. You can issue :py:attr:`~Window.getMovieFrame()` as
         often as you like and then save them all in one go when finished.
 
+        If :py:attr:`~Window.startMovieCapture()` has been called, the frame is
+        instead streamed to the movie file without waiting for the pixels to be
+        read, and `None` is returned.
+
         The back buffer will return the frame that hasn't yet been 'flipped'
         to be visible on screen but has the advantage that the mouse and any
         other overlapping windows won't get in the way.
@@ -2385,14 +2421,105 @@ class Window():
 
         Returns
         -------
-        Image
-            Buffer pixel contents as a PIL/Pillow image object.
+        Image or None
+            Buffer pixel contents as a PIL/Pillow image object. `None` when
+            streaming frames to a file.
 
         """
+        if self._movieCapture is not None:
+            if buffer != self._movieCapture.buffer:
+                raise ValueError(
+                    "Capturing the '{}' buffer to a movie file, cannot get "
+                    "frames from the '{}' buffer.".format(
+                        self._movieCapture.buffer, buffer))
+            self._movieCapture.capture()
+            return None
+
         im = self._getFrame(buffer=buffer)
         self.movieFrames.append(im)
         return im
 
+    def startMovieCapture(self, fileName, fps=None, buffer='front',
+                          numBuffers=3, encoderLib='ffpyplayer',
+                          encoderOpts=None, maxQueueSize=0,
+                          queuePolicy='block'):
+        """Stream frames from :py:attr:`~Window.getMovieFrame()` to a movie
+        file.
+
+        Rather than keeping frames in memory until
+        :py:attr:`~Window.saveMovieFrames()` is called, each frame is read into
+        a ring of pixel pack buffers without stalling and passed to a
+        :class:`~psychopy.tools.movietools.MovieFileWriter` which encodes it on
+        a background thread. Frames reach the writer `numBuffers - 1` calls to
+        :py:attr:`~Window.getMovieFrame()` after they were captured, so long
+        recordings can be made at the full frame rate. Call
+        :py:attr:`~Window.stopMovieCapture()` to finish the file.
+
+        Parameters
+        ----------
+        fileName : str
+            Movie file to write, e.g. 'stimuli.mp4'.
+        fps : float or None
+            Frame rate of the movie. If `None`, the monitor frame rate is used.
+            When capturing the front buffer, frames are timestamped by the time
+            of the last flip.
+        buffer : str
+            Buffer to capture, 'front' (after a flip) or 'back' (before it).
+        numBuffers : int
+            Number of pixel pack buffers, at least 2.
+        encoderLib : str
+            Library used to encode the movie, 'ffpyplayer' or 'opencv'.
+        encoderOpts : dict or None
+            Options to pass to the encoder.
+        maxQueueSize : int
+            Maximum number of frames waiting to be encoded, `0` for no limit.
+        queuePolicy : str
+            What to do when the queue of frames waiting to be encoded is full,
+            `'block'` to wait or `'drop'` to discard the frame.
+
+        Examples
+        --------
+        Record a stimulus movie at the full frame rate::
+
+            win.startMovieCapture('stimuli.mp4')
+            for frameN in range(600):
+                grating.phase += 0.01
+                grating.draw()
+                win.flip()
+                win.getMovieFrame()
+            win.stopMovieCapture()
+
+        """
+        if self._movieCapture is not None:
+            raise RuntimeError("Already capturing frames to movie file "
+                               "'{}'.".format(self._movieCapture.fileName))
+
+        from .windowcapture import MovieFrameCapture
+        self._movieCapture = MovieFrameCapture(
+            self, fileName, fps=fps, numBuffers=numBuffers, buffer=buffer,
+            encoderLib=encoderLib, encoderOpts=encoderOpts,
+            maxQueueSize=maxQueueSize, queuePolicy=queuePolicy)
+
+    def stopMovieCapture(self):
+        """Finish the movie file started by
+        :py:attr:`~Window.startMovieCapture()`.
+
+        This blocks until all frames have been written.
+
+        Returns
+        -------
+        str or None
+            Name of the movie file, `None` if frames were not being captured.
+
+        """
+        if self._movieCapture is None:
+            return None
+
+        capture, self._movieCapture = self._movieCapture, None
+        capture.close()
+
+        return capture.fileName
+
     def _getPixels(self, rect=None, buffer='front', includeAlpha=True,
                    makeLum=False):
         """Return an array of pixel values from the current window buffer or
@@ -2647,6 +2774,21 @@ class Window():
         """
         self._closed = True
 
+        # finish any movie being captured while we still have a GL context
+        try:
+            self.stopMovieCapture()
+        except Exception:
+            pass
+
+        # delete the profiler's GPU timer queries before the context goes
+        profiler = self.frameProfiler
+        if profiler is not None and profiler.gpuTimers is not None:
+            try:
+                self._setCurrent()
+                profiler.gpuTimers.release()
+            except Exception:
+                pass
+
         # If iohub is running, inform it to stop using this win id
         # for mouse events
         try:
@@ -2676,7 +2818,7 @@ class Window():
         except Exception:
             pass
         try:
-            logging.flush()
+            logging.flush(block=True)
         except Exception:
             pass
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Capture window frames to a movie file without stalling the GPU.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2024 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['MovieFrameCapture']
+
+import ctypes
+from collections import deque
+
+import numpy as np
+import pyglet
+
+from psychopy import logging
+from psychopy.tools.movietools import MovieFileWriter
+
+GL = pyglet.gl
+
+
+class MovieFrameCapture:
+    """Stream frames from a window to a movie file.
+
+    Pixels are read into a ring of pixel pack buffers (PBOs). Reading into a
+    PBO returns right away, the copy happens while the GPU continues rendering.
+    Each buffer is mapped and its frame passed to a
+    :class:`~psychopy.tools.movietools.MovieFileWriter` `numBuffers - 1`
+    captures later, by which time the copy has finished so the program does
+    not wait for it. Frames are encoded and written to disk by the writer's
+    thread, so only the frames waiting to be encoded are kept in memory.
+
+    You would usually use this through :py:attr:`~Window.startMovieCapture()`
+    rather than directly.
+
+    Parameters
+    ----------
+    win : :class:`~psychopy.visual.Window`
+        Window to capture frames from.
+    fileName : str
+        Movie file to write.
+    fps : float or None
+        Frame rate of the movie. If `None`, the frame rate of the monitor is
+        used.
+    numBuffers : int
+        Number of pixel pack buffers to read frames into, at least 2. Frames
+        are passed to the writer `numBuffers - 1` captures after they are read.
+    buffer : str
+        Buffer to capture, either 'front' or 'back'.
+    encoderLib : str
+        Library used to encode the movie, 'ffpyplayer' or 'opencv'.
+    encoderOpts : dict or None
+        Options to pass to the encoder.
+    maxQueueSize : int
+        Maximum number of frames waiting to be encoded, `0` for no limit.
+    queuePolicy : str
+        What to do when the queue of frames waiting to be encoded is full,
+        `'block'` or `'drop'`. See
+        :class:`~psychopy.tools.movietools.MovieFileWriter`.
+
+    """
+    def __init__(self, win, fileName, fps=None, numBuffers=3, buffer='front',
+                 encoderLib='ffpyplayer', encoderOpts=None, maxQueueSize=0,
+                 queuePolicy='block'):
+        if numBuffers < 2:
+            raise ValueError("`numBuffers` must be 2 or more.")
+        if buffer not in ('front', 'back'):
+            raise ValueError("Requested read from buffer '{}' but should be "
+                             "'front' or 'back'".format(buffer))
+
+        self.win = win
+        self.buffer = buffer
+        self.size = tuple(int(v) for v in win.size)
+        if fps is None:
+            fps = 1.0 / win.monitorFramePeriod
+
+        self._writer = MovieFileWriter(
+            fileName, self.size, fps,
+            pixelFormat='rgb24',
+            encoderLib=encoderLib,
+            encoderOpts=encoderOpts,
+            maxQueueSize=maxQueueSize,
+            queuePolicy=queuePolicy)
+
+        # pixel pack buffers, each large enough for a frame of RGBA pixels
+        width, height = self.size
+        self._numBuffers = numBuffers
+        self._pbos = (GL.GLuint * numBuffers)()
+        GL.glGenBuffers(numBuffers, self._pbos)
+        for pbo in self._pbos:
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, width * height * 4, None,
+                            GL.GL_STREAM_READ)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+        self._nextBuffer = 0
+        self._pending = deque()  # buffers being read into, oldest first
+        self._startTime = None  # time of the first frame
+        self._lastPts = -1.0
+        self.framesCaptured = 0
+
+        self._writer.open()
+
+    @property
+    def fileName(self):
+        """Movie file being written (`str`)."""
+        return self._writer.filename
+
+    @property
+    def isOpen(self):
+        """`True` until :meth:`close` is called (`bool`)."""
+        return self._pbos is not None
+
+    @property
+    def framesWaiting(self):
+        """Number of frames read but not yet encoded (`int`). This includes
+        frames still in the pixel pack buffers.
+        """
+        return len(self._pending) + self._writer.framesWaiting
+
+    @property
+    def framesOut(self):
+        """Number of frames written to the movie file so far (`int`)."""
+        return self._writer.framesOut
+
+    @property
+    def framesDropped(self):
+        """Number of frames discarded because the encoder could not keep up
+        (`int`). Only non-zero if `queuePolicy` is `'drop'`.
+        """
+        return self._writer.framesDropped
+
+    def capture(self):
+        """Start reading the window's pixels into the next pixel pack buffer,
+        passing the frame read `numBuffers - 1` captures ago to the writer.
+        """
+        if not self.isOpen:
+            raise RuntimeError("Movie frame capture is closed.")
+
+        win = self.win
+        # use the time of the last flip for the front buffer, the back buffer
+        # hasn't been shown yet so the writer's frame rate is used instead
+        pts = None
+        if self.buffer == 'front':
+            flipTime = getattr(win, '_frameTime', None)
+            if flipTime is not None:
+                if self._startTime is None:
+                    self._startTime = flipTime
+                framePts = flipTime - self._startTime
+                if framePts > self._lastPts:
+                    pts = self._lastPts = framePts
+
+        if self.buffer == 'back' and win.useFBO:
+            GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0_EXT)
+        elif self.buffer == 'back':
+            GL.glReadBuffer(GL.GL_BACK)
+        else:
+            if win.useFBO:
+                GL.glBindFramebufferEXT(GL.GL_FRAMEBUFFER_EXT, 0)
+            GL.glReadBuffer(GL.GL_FRONT)
+
+        # with a buffer bound, pixels are read into it without waiting
+        width, height = self.size
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, self._pbos[self._nextBuffer])
+        GL.glReadPixels(0, 0, width, height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, 0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+        if self.buffer == 'front' and win.useFBO:
+            GL.glBindFramebufferEXT(GL.GL_FRAMEBUFFER_EXT, win.frameBuffer)
+
+        self._pending.append((self._nextBuffer, pts))
+        self._nextBuffer = (self._nextBuffer + 1) % self._numBuffers
+        self.framesCaptured += 1
+
+        while len(self._pending) >= self._numBuffers:
+            self._readBack()
+
+    def _readBack(self):
+        """Pass the oldest frame in the pixel pack buffers to the writer.
+        """
+        index, pts = self._pending.popleft()
+        width, height = self.size
+
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, self._pbos[index])
+        ptr = GL.glMapBuffer(GL.GL_PIXEL_PACK_BUFFER, GL.GL_READ_ONLY)
+        frame = None
+        if ptr:
+            pixels = np.ctypeslib.as_array(
+                ctypes.cast(ptr, ctypes.POINTER(GL.GLubyte)),
+                shape=(height, width, 4))
+            # rows are read from the bottom up, flip and drop alpha
+            frame = np.ascontiguousarray(pixels[::-1, :, :3])
+            GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+        if frame is None:
+            logging.warning("Failed to map pixel pack buffer, frame lost.")
+            return
+
+        self._writer.addFrame(frame, pts=pts)
+
+    def flush(self):
+        """Pass all frames in the pixel pack buffers to the writer. This waits
+        for pending reads to finish.
+        """
+        while self._pending:
+            self._readBack()
+
+    def close(self):
+        """Pass the remaining frames to the writer, wait for them to be written
+        and finalize the movie file.
+        """
+        if not self.isOpen:
+            return
+
+        self.flush()
+        self._writer.close()
+
+        GL.glDeleteBuffers(self._numBuffers, self._pbos)
+        self._pbos = None
+
+        logging.info("Captured {} frame(s) to movie file '{}'.".format(
+            self.framesCaptured, self.fileName))